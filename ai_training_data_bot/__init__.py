@@ -3,36 +3,55 @@ __version__ = "3.4.0"
 __author__ = "Chase Beck"
 __email__ = "chase.b3ck@gmail.com"
 
-
-#core
-from .bot import TrainingDataBot
-from .core.config import settings
-from .core.logging import get_logger
-from .core.logging import get_logger
-from .core.exceptions import TrainingDataBotError
-
-#sources
-from .sources import PDFLoader, WebLoader, DocumentLoader, UnifiedLoader
-
-#tasks
-from .tasks import QAGenerator, ClassificationGenerator, SummarizationGenerator, TaskTemplate
-
-#service
-from .decodo import DecodoClident
-from .preprocessing import TextPreprocessor
-from .evaluation import QualityEvaluator
-from .storage.dataset_exporter import DatasetExporter
-
-__all__ = [
-    # Core
-    "TrainingDataBot", "settings", "get_logger", "TrainingDataBotError",
-
-    # Sources
-    "PDFLoader", "WebLoader", "DocumentLoader", "UnifiedLoader",
-
-    # Tasks
-    "QAGenerator", "ClassificationGenerator", "SummarizationGenerator", "TaskTemplate",
-
-    # Services
-    "DecodoClient", "TextPreprocessor", "QualityEvaluator", "DatasetExporter"
-
+from typing import TYPE_CHECKING
+
+from .core.lazy import lazy_exports
+
+#public names and the module each one lives in. Nothing is imported until a name is first
+#used, so `import ai_training_data_bot` (and every spawned pool worker, which imports the
+#package on its way to a submodule) stays cheap
+_EXPORTS = {
+    #core
+    "TrainingDataBot": ".bot",
+    "settings": ".core.config",
+    "get_logger": ".core.logging",
+    "TrainingDataBotError": ".core.exceptions",
+    "Metrics": ".core.metrics",
+
+    #sources
+    "PDFLoader": ".sources.pdf_loader",
+    "WebLoader": ".sources.web_loader",
+    "DocumentLoader": ".sources.document_loader",
+    "UnifiedLoader": ".sources.unified_loader",
+
+    #tasks
+    "QAGenerator": ".tasks.qa_generator",
+    "ClassificationGenerator": ".tasks.classification_generator",
+    "SummarizationGenerator": ".tasks.summarization_generator",
+    "TaskTemplate": ".tasks.templates",
+
+    #services
+    "DecodoClient": ".decodo",
+    "TextPreprocessor": ".preprocessing.text_preprocessor",
+    "QualityEvaluator": ".evaluation",
+    "DatasetExporter": ".storage.dataset_exporter",
+    "DatasetReader": ".storage.dataset_index",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .bot import TrainingDataBot
+    from .core.config import settings
+    from .core.logging import get_logger
+    from .core.exceptions import TrainingDataBotError
+    from .core.metrics import Metrics
+    from .sources import PDFLoader, WebLoader, DocumentLoader, UnifiedLoader
+    from .tasks import QAGenerator, ClassificationGenerator, SummarizationGenerator, TaskTemplate
+    from .decodo import DecodoClient
+    from .preprocessing import TextPreprocessor
+    from .evaluation import QualityEvaluator
+    from .storage.dataset_exporter import DatasetExporter
+    from .storage.dataset_index import DatasetReader
@@ -1,4 +1,8 @@
-from typing import Dict, List, Optional, Union, Any
+import asyncio
+import time
+from collections import deque
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union, Any
 from pathlib import Path
 from uuid import uuid4
 from datetime import datetime
@@ -6,74 +10,227 @@ from datetime import datetime
 
 from .core.logging import get_logger
 from .core.config import settings
-from .core.exceptions import TrainingDataBotError
+from .core.exceptions import ConfigurationError, TrainingDataBotError
+from .core.metrics import Metrics
 
 
 from .sources.unified_loader import UnifiedLoader
+from .sources.pdf_loader import PDFLoader
+from .sources.web_loader import WebLoader
+from .sources.document_loader import DocumentLoader
+from .sources.record_loader import RecordLoader
+from .core.http_pool import HttpClientPool
+from .storage.ingestion_cache import IngestionCache
+from .storage.response_cache import ResponseCache
+from .storage.manifest import BuildManifest, ManifestEntry, content_hash
+from .storage.chunk_store import ChunkStore, ExampleStore
+from .storage.background_writer import BackgroundWriter
+from .storage.shard_writer import encode_lines, to_record
+from .storage.sharding import ShardManifest, plan_hash, shard_name, shard_of
+from .storage.checkpoint import RunCheckpoint
+from .decodo import DecodoClient
+from .sources.scheduler import IngestionScheduler, SourceReport
 from .preprocessing.text_preprocessor import TextPreprocessor
+from .preprocessing.parallel_chunker import ParallelChunker
 
 
 from .evaluation import QualityEvaluator
+from .tasks import (
+    ClassificationGenerator, GenerationBackend, GenerationEngine, HTTPCompletionBackend,
+    QAGenerator, SummarizationGenerator, TaskGenerator, DEFAULT_TEMPLATES
+)
 from .storage.dataset_exporter import DatasetExporter
 
 
-from .models import Document, Dataset, TrainingExample, TaskType, ExportFormat
+from .pipeline import StreamingPipeline, PipelineStats
+from .models import Document, Dataset, TextChunk, TrainingExample, TaskType, ExportFormat, stable_id
 
 # Initialize logger
 logger = get_logger("training_data_bot")
 
+#task types with a dedicated generator; the rest use TaskGenerator with the default template
+GENERATORS = {
+    TaskType.QA_GENERATION: QAGenerator,
+    TaskType.CLASSIFICATION: ClassificationGenerator,
+    TaskType.SUMMARIZATION: SummarizationGenerator,
+}
+
 #main controller class 
 class TrainingDataBot:
     
 #load configuration
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, config: Optional[Dict[str, Any]] = None, backend: Optional[GenerationBackend] = None):
         #load configuration
         self.config = config or {}
 
         #core components
-        self.loader = UnifiedLoader()
-        self.preprocessor = TextPreprocessor(chunk_size=self.config.get("chunk_size", 512))
-        self.evaluator = QualityEvaluator()
-        self.exporter = DatasetExporter()
+        self.max_workers = self._setting("max_workers")
+        #per-stage timings and counters; every call is a no-op unless metrics is set
+        self.metrics = Metrics(
+            enabled=self._setting("metrics"),
+            profile_stages=self._setting("metrics_profile_stages"),
+            trace_stages=self._setting("metrics_trace_stages")
+        )
+        #one http client pool shared by every fetcher
+        self.http = HttpClientPool(
+            max_connections=self._setting("http_max_connections"),
+            max_per_host=self._setting("http_max_per_host"),
+            max_concurrency=self._setting("http_max_concurrency"),
+            http2=self._setting("http2"),
+            timeout=self._setting("http_timeout"),
+            retries=self._setting("http_retries")
+        )
+        #persistent extraction cache so re-runs only pay for changed sources
+        self.ingestion_cache = None
+        if self._setting("ingestion_cache_dir"):
+            self.ingestion_cache = IngestionCache(
+                Path(self._setting("ingestion_cache_dir")) / "ingestion.sqlite3",
+                max_bytes=self._setting("ingestion_cache_max_bytes"),
+                hash_content=self._setting("ingestion_cache_hash"),
+                bypass=self._setting("ingestion_cache_bypass")
+            )
+        self.loader = UnifiedLoader(
+            max_workers=self.max_workers,
+            pdf_loader=PDFLoader(
+                extraction_mode=self._setting("pdf_extraction_mode"),
+                process_workers=self.config.get("pdf_process_workers"),
+                pages_per_task=self._setting("pdf_pages_per_task"),
+                max_workers=self.max_workers
+            ),
+            web_loader=WebLoader(http=self.http, cache=self.ingestion_cache, max_workers=self.max_workers),
+            cache=self.ingestion_cache,
+            document_loader=DocumentLoader(mmap_min_bytes=self._setting("mmap_min_bytes"), max_workers=self.max_workers),
+            record_loader=RecordLoader(
+                text_field=self._setting("record_text_field"),
+                title_field=self._setting("record_title_field"),
+                metadata_fields=self._setting("record_metadata_fields"),
+                batch_size=self._setting("record_batch_size"),
+                formats=self._setting("record_formats"),
+                max_workers=self.max_workers
+            ),
+            metrics=self.metrics
+        )
+        self.decodo = DecodoClient(http=self.http)
+        self.preprocessor = TextPreprocessor(
+            chunk_size=self._setting("chunk_size"),
+            overlap=self._setting("chunk_overlap"),
+            boundary=self._setting("chunk_boundary")
+        )
+        #batch processing chunks in a process pool when chunk_workers is set
+        self.chunker = None
+        if self._setting("chunk_workers"):
+            self.chunker = ParallelChunker(
+                self.preprocessor,
+                workers=self._setting("chunk_workers"),
+                shard_bytes=self._setting("chunk_shard_bytes")
+            )
+        #optional near-duplicate filter between chunking and example creation
+        self.deduplicator = None
+        if self._setting("dedup"):
+            #numpy-backed, so only imported when dedup is on
+            from .preprocessing.dedup import Deduplicator, NearDuplicateIndex
+
+            #the configured threshold wins over the one saved with the index
+            index_path = self._setting("dedup_index_path")
+            if index_path and Path(index_path).exists():
+                index = NearDuplicateIndex.load(index_path, threshold=self._setting("dedup_threshold"))
+            else:
+                index = NearDuplicateIndex(threshold=self._setting("dedup_threshold"))
+            self.deduplicator = Deduplicator(index, action=self._setting("dedup_action"))
+        self.evaluator = QualityEvaluator(
+            batch_size=self._setting("evaluation_batch_size"),
+            max_workers=self._setting("evaluation_workers")
+        )
+        #task generation: a given backend, or an OpenAI-compatible endpoint from config;
+        #without either, examples keep an empty output_text
+        if backend is None and self._setting("generation_endpoint"):
+            backend = HTTPCompletionBackend(
+                self._setting("generation_endpoint"),
+                model=self._setting("generation_model"),
+                api_key=self._setting("generation_api_key"),
+                http=self.http
+            )
+        self.engine = None
+        if backend is not None:
+            self.engine = GenerationEngine(
+                backend,
+                max_concurrency=self._setting("generation_concurrency"),
+                requests_per_minute=self._setting("generation_requests_per_minute"),
+                tokens_per_minute=self._setting("generation_tokens_per_minute"),
+                retries=self._setting("generation_retries")
+            )
+        #persistent prompt/response memo so unchanged chunks and templates skip the model
+        self.response_cache = None
+        if self.engine is not None and self._setting("response_cache_dir"):
+            self.response_cache = ResponseCache(
+                Path(self._setting("response_cache_dir")) / "responses.sqlite3",
+                ttl=self._setting("response_cache_ttl"),
+                max_bytes=self._setting("response_cache_max_bytes")
+            )
+        self.generators: Dict[TaskType, TaskGenerator] = {}
+        self.exporter = DatasetExporter(
+            batch_size=self._setting("export_batch_size"),
+            shard_size=self._setting("export_shard_size"),
+            shard_bytes=self._setting("export_shard_bytes"),
+            split_ratios=self._setting("export_split_ratios"),
+            split_seed=self._setting("export_split_seed"),
+            compression=self._setting("export_compression"),
+            file_compression=self._setting("export_file_compression"),
+            queue_size=self._setting("export_queue_size"),
+            index=self._setting("export_index"),
+            metrics=self.metrics
+        )
 
         #state tracking
         self.documents: Dict[str, Document] = {}
         self.datasets: Dict[str, Dataset] = {}
+        self.ingestion_reports: Dict[str, SourceReport] = {}
 
         logger.info("TrainingDataBot initialized successfully")
 
+    #config value with the core/config.py default as fallback
+    def _setting(self, key: str) -> Any:
+        return self.config.get(key, settings.get(key))
+
     #Load documents with UnifiedLoader
     async def load_documents(self, sources: Union[str, Path, List[Union[str, Path]]]) -> List[Document]:
         
         if isinstance(sources, (str, Path)):
             sources = [sources]
 
-        documents = []
-        for source in sources:
-            docs = await self.loader.load(source)
-            for d in docs:
-                self.documents[d.id] = d
-                documents.append(d)
+        scheduler = IngestionScheduler(self.loader, max_workers=self.max_workers, metrics=self.metrics)
+        documents = await scheduler.run(list(sources))
+        for d in documents:
+            self.documents[d.id] = d
+        self.ingestion_reports.update(scheduler.reports)
 
-        logger.info(f"Loaded {len(documents)} documents")
+        failed = sum(r.failed for r in scheduler.reports.values())
+        logger.info(f"Loaded {len(documents)} documents ({failed} failures)")
         return documents
 
         #chunking logic
-    async def process_documents(self, documents: Optional[List[Document]] = None) -> Dataset:
+    async def process_documents(
+        self,
+        documents: Optional[List[Document]] = None,
+        task_types: Optional[List[TaskType]] = None
+    ) -> Dataset:
         
         documents = documents or list(self.documents.values())
-        examples = []
+        #compact mode keeps chunks and examples as offsets/columns instead of objects
+        compact = self._setting("compact_storage")
+        examples = ExampleStore(ChunkStore()) if compact else []
 
-        for doc in documents:
-            chunks = self.preprocessor.chunk_document(doc)
-            for chunk in chunks:
-                ex = TrainingExample(
-                    input_text=chunk.content,
-                    output_text="",  # Placeholder for generated output
-                    task_type=TaskType.SUMMARIZATION,  # Example task type
-                    source_document_id=doc.id
-                )
-                examples.append(ex)
+        async for doc, chunks in self._iter_chunks(documents):
+            chunks = self._dedup(chunks)
+            doc_examples = await self._generate_examples(chunks, task_types)
+            if compact:
+                examples.chunks.add_document(doc)
+                rows = dict(zip((c.id for c in chunks), examples.chunks.extend(chunks)))
+                for ex in doc_examples:
+                    examples.append(ex, chunk_row=rows.get(ex.source_chunk_id, -1))
+            else:
+                examples.extend(doc_examples)
+        self._save_dedup_index()
 
         #package all examples into a dataset
         dataset = Dataset(
@@ -87,10 +244,473 @@ class TrainingDataBot:
         logger.info(f"Processed {len(examples)} examples into dataset '{dataset.name}'")
         return dataset
 
+    def _chunk_document(self, doc: Document) -> List[TextChunk]:
+        with self.metrics.stage("chunk", bytes_in=doc.size()) as stage:
+            chunks = self.preprocessor.chunk_document(doc)
+            stage.add(items=len(chunks))
+        return self._dedup(chunks)
+
+    #streaming counterpart of _chunk_document: chunks are produced and deduped a batch at a
+    #time, so a huge (memory-mapped) document never has all its chunks in memory at once
+    def _stream_chunks(self, doc: Document) -> Iterator[TextChunk]:
+        for _, batch in self._chunk_batches(doc):
+            yield from batch
+
+    #(chunks consumed so far, deduped batch) for each generation_batch_size chunks of doc.
+    #The first `skip` chunks are consumed without being deduped or yielded, which is how a
+    #resumed run continues inside a document
+    def _chunk_batches(self, doc: Document, skip: int = 0) -> Iterator[Tuple[int, List[TextChunk]]]:
+        chunks = self.preprocessor.iter_chunks(doc)
+        batch_size = self._setting("generation_batch_size")
+        self.metrics.count("chunk", bytes_in=doc.size())
+        consumed = sum(1 for _ in islice(chunks, skip))
+        while True:
+            with self.metrics.stage("chunk") as stage:
+                batch = list(islice(chunks, batch_size))
+                stage.add(items=len(batch))
+            if not batch:
+                return
+            consumed += len(batch)
+            yield consumed, self._dedup(batch)
+
+    #(document, chunks) in document order, from the process pool when one is configured
+    async def _iter_chunks(self, documents: List[Document]) -> AsyncIterator[Tuple[Document, List[TextChunk]]]:
+        if self.chunker is not None:
+            #the work happens in pool processes, so only counts are recorded
+            async for doc, chunks in self.chunker.iter_chunks(documents):
+                self.metrics.count("chunk", items=len(chunks), bytes_in=doc.size())
+                yield doc, chunks
+            return
+        for doc in documents:
+            with self.metrics.stage("chunk", bytes_in=doc.size()) as stage:
+                chunks = self.preprocessor.chunk_document(doc)
+                stage.add(items=len(chunks))
+            yield doc, chunks
+
+    #dedup runs in the parent, in document order, so both chunking modes see the same index
+    def _dedup(self, chunks: List[TextChunk]) -> List[TextChunk]:
+        if self.deduplicator is not None:
+            with self.metrics.stage("dedup") as stage:
+                chunks = self.deduplicator.process(chunks)
+                stage.add(items=len(chunks))
+        return chunks
+
+    #persist the dedup index so later runs dedup against earlier datasets
+    def _save_dedup_index(self):
+        if self.deduplicator is not None and self._setting("dedup_index_path"):
+            self.deduplicator.index.save(self._setting("dedup_index_path"))
+
+    def _generator(self, task_type: TaskType) -> TaskGenerator:
+        if task_type not in self.generators:
+            generator_cls = GENERATORS.get(task_type, TaskGenerator)
+            template = None if task_type in GENERATORS else DEFAULT_TEMPLATES[task_type]
+            self.generators[task_type] = generator_cls(
+                self.engine,
+                template=template,
+                batch_size=self._setting("generation_request_batch"),
+                cache=self.response_cache
+            )
+        return self.generators[task_type]
+
+    #one example per chunk and task type, in chunk order; chunks whose generation
+    #request failed after retries are left out
+    async def _generate_examples(
+        self,
+        chunks: List[TextChunk],
+        task_types: Optional[List[TaskType]] = None
+    ) -> List[TrainingExample]:
+        task_types = task_types or [TaskType.SUMMARIZATION]
+        with self.metrics.stage("generate") as stage:
+            examples = await self._generate(chunks, task_types)
+            if self.metrics.enabled:
+                stage.add(
+                    items=len(examples),
+                    errors=len(chunks) * len(task_types) - len(examples),
+                    bytes_in=sum(len(c.content) for c in chunks),
+                    bytes_out=sum(len(ex.output_text) for ex in examples)
+                )
+        return examples
+
+    async def _generate(self, chunks: List[TextChunk], task_types: List[TaskType]) -> List[TrainingExample]:
+        if self.engine is None:
+            return [
+                TrainingExample(
+                    id=stable_id(chunk.id, task_type.value),
+                    input_text=chunk.content,
+                    output_text="",  # no generation backend configured
+                    task_type=task_type,
+                    source_document_id=chunk.document_id,
+                    source_chunk_id=chunk.id,
+                    metadata=chunk.example_metadata()
+                )
+                for chunk in chunks
+                for task_type in task_types
+            ]
+
+        per_task = await asyncio.gather(*(self._generator(t).generate_aligned(chunks) for t in task_types))
+        return [ex for row in zip(*per_task) for ex in row if ex is not None]
+
+    #streaming mode: load -> chunk -> generate -> export without materializing the dataset
+    async def stream_process(
+        self,
+        sources: Union[str, Path, List[Union[str, Path]]],
+        output_path: Union[str, Path],
+        task_types: Optional[List[TaskType]] = None,
+        export_format: ExportFormat = ExportFormat.JSONL
+    ) -> PipelineStats:
+        if isinstance(sources, (str, Path)):
+            sources = [sources]
+
+        scheduler = IngestionScheduler(self.loader, max_workers=self.max_workers, metrics=self.metrics)
+        pipeline = StreamingPipeline(
+            scheduler,
+            self._stream_chunks,
+            lambda chunks: self._generate_examples(chunks, task_types),
+            self.exporter,
+            queue_size=self._setting("queue_size"),
+            batch_size=self._setting("generation_batch_size"),
+            concurrency=self._setting("generation_concurrency"),
+            metrics=self.metrics
+        )
+        stats = await pipeline.run(list(sources), output_path, format=export_format)
+        self.ingestion_reports.update(scheduler.reports)
+        self._save_dedup_index()
+        return stats
+
+    #per-request mode for long-running callers such as the service: yields each batch of
+    #examples as soon as it is generated and keeps nothing on the bot, so concurrent calls
+    #can share one warm bot. Pass a scheduler to read its per-source reports
+    async def iter_examples(
+        self,
+        sources: Union[str, Path, List[Union[str, Path]]],
+        task_types: Optional[List[TaskType]] = None,
+        scheduler: Optional[IngestionScheduler] = None
+    ) -> AsyncIterator[List[TrainingExample]]:
+        if isinstance(sources, (str, Path)):
+            sources = [sources]
+        scheduler = scheduler or IngestionScheduler(self.loader, max_workers=self.max_workers, metrics=self.metrics)
+        batch_size = self._setting("generation_batch_size")
+        async for doc in scheduler.stream(list(sources)):
+            chunks = self._stream_chunks(doc)
+            while True:
+                batch = list(islice(chunks, batch_size))
+                if not batch:
+                    break
+                yield await self._generate_examples(batch, task_types)
+            #chunks hold their own text, so a mapped document is done with once chunked
+            doc.close()
+
+    #incremental mode: only new or changed sources are re-chunked and regenerated; their
+    #examples are appended to output_path and examples of changed/removed sources tombstoned
+    async def build_incremental(
+        self,
+        sources: Union[str, Path, List[Union[str, Path]]],
+        output_path: Union[str, Path],
+        manifest_path: Optional[Union[str, Path]] = None,
+        task_types: Optional[List[TaskType]] = None
+    ) -> Dict[str, int]:
+        if isinstance(sources, (str, Path)):
+            sources = [sources]
+        task_types = task_types or [TaskType.SUMMARIZATION]
+        manifest = BuildManifest.load(manifest_path or f"{output_path}.manifest.json")
+
+        build_settings = self._build_settings(task_types)
+        stats = {"added": 0, "changed": 0, "unchanged": 0, "deleted": 0, "examples": 0, "tombstones": 0}
+        tombstones: List[str] = []
+        if manifest.settings and manifest.settings != build_settings:
+            logger.info("Build settings changed; rebuilding all sources")
+            tombstones.extend(ex_id for entry in manifest.entries.values() for ex_id in entry.example_ids)
+            manifest.entries.clear()
+        manifest.settings = build_settings
+
+        documents = await self.load_documents(sources)
+        examples = []
+        for doc in documents:
+            digest = content_hash(doc.blocks())
+            previous = manifest.entries.get(doc.source)
+            if previous is not None and previous.content_hash == digest:
+                stats["unchanged"] += 1
+                continue
+
+            if previous is None:
+                stats["added"] += 1
+            else:
+                stats["changed"] += 1
+
+            #chunk ids are content-derived, so only chunks that did not exist before are regenerated
+            chunks = self._chunk_document(doc)
+            previous_chunks = previous.chunks if previous else {}
+            fresh = [c for c in chunks if str(c.id) not in previous_chunks]
+            doc_examples = await self._generate_examples(fresh, task_types)
+            examples.extend(doc_examples)
+
+            entry_chunks = {str(c.id): list(previous_chunks.get(str(c.id), [])) for c in chunks}
+            for ex in doc_examples:
+                entry_chunks[str(ex.source_chunk_id)].append(str(ex.id))
+            tombstones.extend(
+                ex_id for chunk_id, ids in previous_chunks.items() if chunk_id not in entry_chunks for ex_id in ids
+            )
+            manifest.entries[doc.source] = ManifestEntry(
+                content_hash=digest,
+                document_id=str(doc.id),
+                chunks=entry_chunks
+            )
+
+        #sources no longer produced by any root are removed; ones that merely failed to load are kept.
+        #Records of CSV/JSONL/JSON-array files are sourced "<file>#<index>": they go with their
+        #file, or when the file was read to the end this run without yielding them again. A file
+        #that failed partway says nothing about the records after the failure
+        expanded = set()
+        for source in sources:
+            expanded.update(str(t) for t in await asyncio.to_thread(self.loader.expand, source))
+        failed = {target for source in sources for target in self.ingestion_reports[str(source)].failed_targets}
+        loaded = {doc.source for doc in documents}
+        loaded_files = {source.split("#", 1)[0] for source in loaded} - failed
+
+        def removed(source: str) -> bool:
+            if source in expanded:
+                return False
+            parent = source.split("#", 1)[0]
+            return parent not in expanded or (parent in loaded_files and source not in loaded)
+
+        for source in [s for s in manifest.entries if removed(s)]:
+            stats["deleted"] += 1
+            tombstones.extend(manifest.entries.pop(source).example_ids)
+
+        #ids reused by a changed source stay live rather than being tombstoned
+        live = {str(ex.id) for ex in examples}
+        tombstones = [ex_id for ex_id in tombstones if ex_id not in live]
+
+        await self.exporter.append_jsonl(output_path, examples, tombstones)
+        manifest.save()
+        self._save_dedup_index()
+
+        stats["examples"] = len(examples)
+        stats["tombstones"] = len(tombstones)
+        logger.info(f"Incremental build: {stats}")
+        return stats
+
+    #a different chunking/task setup invalidates every derived id
+    def _build_settings(self, task_types: List[TaskType]) -> Dict[str, Any]:
+        build_settings = {
+            "chunk_size": self.preprocessor.chunk_size,
+            "chunk_overlap": self.preprocessor.overlap,
+            "chunk_boundary": self.preprocessor.boundary,
+            "task_types": sorted(t.value for t in task_types),
+        }
+        if self.engine is not None:
+            #a new prompt wording means new outputs
+            build_settings["templates"] = {
+                t.value: f"{self._generator(t).template.id}@{self._generator(t).template.version}"
+                for t in task_types
+            }
+        return build_settings
+
+    #sharded mode: the files/urls under sources are split over num_shards by a stable hash
+    #and this call processes those owned by `shard`, writing its examples as JSONL and a
+    #manifest to output_dir. Every node must be given the same sources; once all shards
+    #are done, storage.sharding.merge_shards combines them into the single-node output.
+    #Every checkpoint_interval seconds progress is checkpointed next to the partial output;
+    #after a crash, resume() (or resume=True) continues from the last checkpoint
+    async def run_shard(
+        self,
+        sources: Union[str, Path, List[Union[str, Path]]],
+        output_dir: Union[str, Path],
+        shard: int = 0,
+        num_shards: int = 1,
+        task_types: Optional[List[TaskType]] = None,
+        resume: bool = False
+    ) -> ShardManifest:
+        if isinstance(sources, (str, Path)):
+            sources = [sources]
+        task_types = task_types or [TaskType.SUMMARIZATION]
+        if self.deduplicator is not None and num_shards > 1:
+            logger.warning("Near-duplicate filtering only sees one shard; output can differ from a single-node run")
+        start = time.perf_counter()
+
+        #every node expands the full source list so plan positions agree everywhere
+        targets, errors = [], []
+        for source in sources:
+            try:
+                expanded = await asyncio.to_thread(self.loader.expand, source)
+            except Exception as e:
+                errors.append(f"{source}: {e}")
+                continue
+            targets.extend(str(t) for t in expanded)
+        targets = list(dict.fromkeys(targets))
+        ordinals = {target: i for i, target in enumerate(targets)}
+        mine = [target for target in targets if shard_of(target, num_shards) == shard]
+        positions = {target: i for i, target in enumerate(mine)}
+        if shard:
+            errors = []
+
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        manifest = ShardManifest(
+            shard=shard,
+            num_shards=num_shards,
+            plan=plan_hash(targets, self._build_settings(task_types), num_shards),
+            output=f"{shard_name(shard, num_shards)}.jsonl"
+        )
+        path = out / manifest.output
+        tmp = path.with_name(path.name + ".tmp")
+
+        state = RunCheckpoint.load(RunCheckpoint.path(out, shard, num_shards)) if resume else None
+        if state is not None:
+            if state.plan != manifest.plan:
+                raise ConfigurationError(
+                    f"Sources or settings changed since the checkpoint in {out}; start the run over without resume"
+                )
+            manifest.targets, manifest.examples, manifest.bytes = state.targets, state.examples, state.bytes
+            if self.deduplicator is not None and state.dedup_index:
+                self.deduplicator.index = await asyncio.to_thread(type(self.deduplicator.index).load, out / state.dedup_index)
+            f = await asyncio.to_thread(state.reopen, out)
+            logger.info(f"Resuming shard {shard}/{num_shards} at target {state.position} of {len(mine)}")
+        else:
+            await asyncio.to_thread(RunCheckpoint.remove, out, shard, num_shards)
+            f = await asyncio.to_thread(tmp.open, "wb")
+
+        scheduler = IngestionScheduler(self.loader, max_workers=self.max_workers, metrics=self.metrics)
+        concurrency = self._setting("generation_concurrency")
+        interval = self._setting("checkpoint_interval")
+        #(position, document, chunk) of the next chunk to write
+        cursor = (state.position, state.document, state.chunk) if state else (0, 0, 0)
+        documents = state.stats.get("documents", 0) if state else 0
+        previous_errors = state.stats.get("errors", []) if state else []
+        elapsed = state.stats.get("elapsed", 0.0) if state else 0.0
+        sequence = state.sequence if state else 0
+        last_checkpoint = time.monotonic()
+
+        #batches are generated up to `concurrency` at a time and written in stream order;
+        #each entry is (ordinal, cursor once written, generation task or None, ends a document)
+        window = deque()
+
+        async def emit(background: BackgroundWriter):
+            nonlocal cursor, documents
+            ordinal, after, task, last = window.popleft()
+            examples = await task if task is not None else None
+            if not manifest.targets or manifest.targets[-1][0] != ordinal:
+                manifest.targets.append([ordinal, 0])
+            if examples:
+                data = encode_lines([to_record(ex) for ex in examples])
+                await background.submit(f.write, data)
+                manifest.targets[-1][1] += len(examples)
+                manifest.examples += len(examples)
+                manifest.bytes += len(data)
+            cursor = after
+            documents += last
+
+        def run_errors() -> List[str]:
+            return list(dict.fromkeys(previous_errors + [e for r in scheduler.reports.values() for e in r.errors] + errors))
+
+        #the window is drained first, so the dedup index holds exactly the chunks before the
+        #cursor; the checkpoint itself is written on the writer thread behind the output
+        async def checkpoint(background: BackgroundWriter):
+            nonlocal sequence, last_checkpoint
+            with self.metrics.stage("checkpoint"):
+                while window:
+                    await emit(background)
+                sequence += 1
+                position, document, chunk = cursor
+                snapshot = RunCheckpoint(
+                    shard=shard,
+                    num_shards=num_shards,
+                    plan=manifest.plan,
+                    output=tmp.name,
+                    sources=[str(s) for s in sources],
+                    task_types=[t.value for t in task_types],
+                    position=position,
+                    document=document,
+                    chunk=chunk,
+                    bytes=manifest.bytes,
+                    examples=manifest.examples,
+                    targets=[list(t) for t in manifest.targets],
+                    sequence=sequence,
+                    stats={
+                        "documents": documents,
+                        "errors": run_errors(),
+                        "elapsed": elapsed + time.perf_counter() - start,
+                    }
+                )
+                if self.deduplicator is not None:
+                    snapshot.dedup_index = f"{shard_name(shard, num_shards)}.checkpoint-{sequence:06d}.dedup.npz"
+                    await asyncio.to_thread(self.deduplicator.index.save, out / snapshot.dedup_index)
+                await background.submit(snapshot.save, out, f)
+            last_checkpoint = time.monotonic()
+
+        resume_at = cursor
+        current = document = None
+        try:
+            async with BackgroundWriter(self._setting("export_queue_size")) as background:
+                try:
+                    async for target, doc in scheduler.stream_targets(mine[resume_at[0]:]):
+                        position = positions[str(target)]
+                        document = document + 1 if position == current else 0
+                        current = position
+                        #documents of the cursor's target written before the checkpoint
+                        if (position, document) < resume_at[:2]:
+                            doc.close()
+                            continue
+                        skip = resume_at[2] if (position, document) == resume_at[:2] else 0
+                        ordinal = ordinals[str(target)]
+                        for consumed, batch in self._chunk_batches(doc, skip):
+                            task = asyncio.ensure_future(self._generate_examples(batch, task_types)) if batch else None
+                            window.append((ordinal, (position, document, consumed), task, False))
+                            if len(window) >= concurrency:
+                                await emit(background)
+                            if interval is not None and time.monotonic() - last_checkpoint >= interval:
+                                await checkpoint(background)
+                        doc.close()
+                        window.append((ordinal, (position, document + 1, 0), None, True))
+                    while window:
+                        await emit(background)
+                finally:
+                    for _, _, task, _ in window:
+                        if task is not None:
+                            task.cancel()
+        finally:
+            await asyncio.to_thread(f.close)
+        await asyncio.to_thread(tmp.replace, path)
+        self.ingestion_reports.update(scheduler.reports)
+        self._save_dedup_index()
+
+        failures = run_errors()
+        manifest.stats = {
+            "targets": len(mine),
+            "documents": documents,
+            "failed": len(failures),
+            "errors": failures,
+            "elapsed": elapsed + time.perf_counter() - start,
+        }
+        await asyncio.to_thread(manifest.save, out)
+        await asyncio.to_thread(RunCheckpoint.remove, out, shard, num_shards)
+        logger.info(
+            f"Shard {shard}/{num_shards}: {len(mine)} of {len(targets)} targets, "
+            f"{manifest.examples} examples written to {path}"
+        )
+        return manifest
+
+    #continues the run_shard call that last checkpointed in output_dir, with the sources and
+    #task types it was started with. A shard that already finished is returned as is; one
+    #that never checkpointed raises ConfigurationError, since its sources are not known here
+    #(start it again with run_shard)
+    async def resume(self, output_dir: Union[str, Path], shard: int = 0, num_shards: int = 1) -> ShardManifest:
+        out = Path(output_dir)
+        state = RunCheckpoint.load(RunCheckpoint.path(out, shard, num_shards))
+        if state is None:
+            done = out / f"{shard_name(shard, num_shards)}.manifest.json"
+            if done.exists():
+                logger.info(f"Shard {shard}/{num_shards} in {out} already finished")
+                return ShardManifest.load(done)
+            raise ConfigurationError(f"No checkpoint for shard {shard}/{num_shards} in {out}")
+        task_types = [TaskType(t) for t in state.task_types]
+        return await self.run_shard(state.sources, out, shard, num_shards, task_types=task_types, resume=True)
+
     #evaluation of dataset
     async def evaluate_dataset(self, dataset: Dataset, detailed_report: bool = True):
         
-        report = await self.evaluator.evaluate_dataset(dataset, detailed_report=detailed_report)
+        with self.metrics.stage("evaluate", items=len(dataset.examples)):
+            report = await self.evaluator.evaluate(dataset, detailed_report=detailed_report)
         logger.info(f"Evaluation complete. Passed: {report.passed}")
         return report
 
@@ -102,7 +722,7 @@ class TrainingDataBot:
         split_data: bool = True
     ) -> Path:
         #export dataset
-        path = await self.exporter.save(dataset, output_path, format=format, split_data=split_data)
+        path = await self.exporter.export(dataset, output_path, format=format, split_data=split_data)
         logger.info(f"Dataset exported to {path}")
         return path
 
@@ -115,15 +735,42 @@ class TrainingDataBot:
     ) -> Dataset:
         
         documents = await self.load_documents([source])
-        dataset = await self.process_documents(documents)
+        dataset = await self.process_documents(documents, task_types=task_types)
         await self.export_dataset(dataset, output_path, format=export_format)
         return dataset
+
+    #same as quick_process but streams straight to output_path
+    async def quick_process_streaming(
+        self,
+        source: Union[str, Path],
+        output_path: Union[str, Path],
+        task_types: Optional[List[TaskType]] = None,
+        export_format: ExportFormat = ExportFormat.JSONL
+    ) -> PipelineStats:
+        
+        return await self.stream_process([source], output_path, task_types=task_types, export_format=export_format)
 #system cleanup
     async def cleanup(self):
         
-        await self.exporter.close()
+        #loaded documents stay readable until here; mapped ones hold a file each
+        for doc in self.documents.values():
+            doc.close()
+        await self.loader.close()
+        if self.chunker is not None:
+            await self.chunker.close()
+        if self.engine is not None:
+            await self.engine.close()
+        if self.response_cache is not None:
+            await self.response_cache.close()
+        await self.http.close()
+        if hasattr(self.exporter, "close"):
+            await self.exporter.close()
         if hasattr(self.evaluator, "close"):
             await self.evaluator.close()
+        if self.metrics.enabled and self._setting("metrics_report_path"):
+            path = self.metrics.write_report(self._setting("metrics_report_path"))
+            if self.metrics.profiles:
+                self.metrics.write_profiles(path.with_name(f"{path.stem}_profiles"))
         logger.info("TrainingDataBot cleanup completed")
 #autosetup
     async def __aenter__(self):
@@ -139,8 +786,19 @@ class TrainingDataBot:
         return {
             "documents": {
                 "total": len(self.documents),
-                "total_size": sum(doc.word_count for doc in self.documents.values())
+                "total_size": sum(doc.word_count for doc in self.documents.values()),
+                "failed": sum(r.failed for r in self.ingestion_reports.values())
+            },
+            "ingestion": {
+                source: {"files": r.files, "loaded": r.loaded, "failed": r.failed}
+                for source, r in self.ingestion_reports.items()
             },
+            "http": self.http.stats(),
+            "generation": self.engine.stats() if self.engine else None,
+            "response_cache": self.response_cache.stats() if self.response_cache else None,
+            "dedup": self.deduplicator.stats() if self.deduplicator else None,
+            "cache": self.ingestion_cache.stats() if self.ingestion_cache else None,
+            "metrics": self.metrics.report() if self.metrics.enabled else None,
             "datasets": {
                 "total": len(self.datasets),
                 "total_examples": sum(len(ds.examples) for ds in self.datasets.values())
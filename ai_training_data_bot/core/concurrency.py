@@ -0,0 +1,24 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+#run func over items with at most `limit` calls in flight
+#results keep the order of `items`; exceptions are returned in place of results
+async def bounded_map(func: Callable[[T], Awaitable[Any]], items: Sequence[T], limit: int) -> List[Any]:
+    results: List[Any] = [None] * len(items)
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < len(items):
+            i = next_index
+            next_index += 1
+            try:
+                results[i] = await func(items[i])
+            except Exception as e:
+                results[i] = e
+
+    workers = max(1, min(limit, len(items)))
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return results
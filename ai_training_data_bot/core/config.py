@@ -1,8 +1,74 @@
 DEFAULTS = {
     "chunk_size": 512,
+    "chunk_overlap": 0,
+    "chunk_boundary": None,
+    "chunk_workers": None,
+    "chunk_shard_bytes": 32 << 20,
     "max_workers": 4,
+    "mmap_min_bytes": 64 << 20,
+    "record_formats": ("csv", "jsonl", "json"),
+    "record_text_field": None,
+    "record_title_field": None,
+    "record_metadata_fields": (),
+    "record_batch_size": 1000,
+    "pdf_extraction_mode": "thread",
+    "pdf_pages_per_task": 32,
+    "queue_size": 64,
+    "generation_batch_size": 16,
+    "http_max_connections": 100,
+    "http_max_per_host": 8,
+    "http_max_concurrency": 64,
+    "http_timeout": 30.0,
+    "http_retries": 3,
+    "http2": True,
+    "ingestion_cache_dir": None,
+    "ingestion_cache_max_bytes": 1 << 30,
+    "ingestion_cache_hash": False,
+    "ingestion_cache_bypass": False,
+    "dedup": False,
+    "dedup_action": "drop",
+    "dedup_threshold": 0.8,
+    "dedup_index_path": None,
+    "evaluation_batch_size": 20_000,
+    "evaluation_workers": 1,
+    "compact_storage": False,
+    "export_batch_size": 10_000,
+    "export_shard_size": None,
+    "export_shard_bytes": None,
+    "export_split_ratios": (0.8, 0.1, 0.1),
+    "export_split_seed": "",
+    "export_compression": "zstd",
+    "export_file_compression": None,
+    "export_queue_size": 8,
+    "export_index": True,
+    "checkpoint_interval": 60.0,
+    "generation_endpoint": None,
+    "generation_model": "",
+    "generation_api_key": None,
+    "generation_request_batch": 8,
+    "generation_concurrency": 8,
+    "generation_requests_per_minute": None,
+    "generation_tokens_per_minute": None,
+    "generation_retries": 3,
+    "response_cache_dir": None,
+    "response_cache_ttl": None,
+    "response_cache_max_bytes": 1 << 30,
+    "metrics": False,
+    "metrics_profile_stages": (),
+    "metrics_trace_stages": (),
+    "metrics_report_path": None,
+    "service_workers": 4,
+    "service_queue_size": 100,
+    "service_max_jobs": 1000,
+    #local sources a service job may read; anything else needs service_allow_any_source
+    "service_source_roots": ["sources"],
+    "service_allow_any_source": False,
+    #where job results are spooled; None is a temporary directory
+    "service_job_dir": None,
 }
 
+settings = DEFAULTS
+
 def get(key, default=None):
     return DEFAULTS.get(key, default)
 
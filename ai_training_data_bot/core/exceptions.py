@@ -1,3 +1,5 @@
+from typing import Optional
+
 
 class TrainingDataBotError(Exception):
     pass
@@ -8,3 +10,10 @@ class ConfigurationError(TrainingDataBotError):
 class DocumentLoadError(TrainingDataBotError):
     pass
 
+#retryable: a later attempt may succeed (rate limit, server error), where a rejected
+#request or bad credentials will not; retry_after is the server's requested delay
+class GenerationError(TrainingDataBotError):
+    def __init__(self, message: str = "", retryable: bool = True, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
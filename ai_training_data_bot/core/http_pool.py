@@ -0,0 +1,140 @@
+import asyncio
+import importlib.util
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+from .config import settings
+from .logging import get_logger
+
+if TYPE_CHECKING:
+    import httpx
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+#one long-lived httpx client shared by every fetcher: keep-alive, optional HTTP/2,
+#a global concurrency cap and a per-host connection cap. httpx is imported with the first
+#client, so loaders that never fetch a URL never pay for it
+class HttpClientPool:
+    def __init__(
+        self,
+        max_connections: int = settings["http_max_connections"],
+        max_per_host: int = settings["http_max_per_host"],
+        max_concurrency: int = settings["http_max_concurrency"],
+        http2: bool = settings["http2"],
+        timeout: float = settings["http_timeout"],
+        retries: int = settings["http_retries"],
+        backoff: float = 0.5
+    ):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.max_concurrency = max_concurrency
+        #HTTP/2 needs the optional h2 package (httpx[http2])
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.logger = get_logger("http_pool")
+
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+        #rolling window of request latencies for stats()
+        self.latencies: Deque[float] = deque(maxlen=10_000)
+        self.requests = 0
+        self.failures = 0
+        self.retried = 0
+        self._first_request: Optional[float] = None
+        self._last_response: Optional[float] = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None, retries: Optional[int] = None) -> "httpx.Response":
+        return await self.request("GET", url, headers=headers, retries=retries)
+
+    async def post(self, url: str, json: Any = None, headers: Optional[Dict[str, str]] = None, retries: Optional[int] = None) -> "httpx.Response":
+        return await self.request("POST", url, json=json, headers=headers, retries=retries)
+
+    #transport errors and RETRY_STATUSES are retried up to `retries` times (default: the
+    #pool's); callers with their own retry policy pass 0. The concurrency slots are only
+    #held during an attempt, never while backing off
+    async def request(self, method: str, url: str, retries: Optional[int] = None, **kwargs) -> "httpx.Response":
+        import httpx
+
+        retries = self.retries if retries is None else retries
+        host = urlsplit(url).netloc
+        host_limit = self._hosts.setdefault(host, asyncio.Semaphore(self.max_per_host))
+
+        for attempt in range(retries + 1):
+            delay = self.backoff * 2 ** attempt
+            async with self._global, host_limit:
+                start = time.perf_counter()
+                if self._first_request is None:
+                    self._first_request = start
+                try:
+                    response = await self.client.request(method, url, **kwargs)
+                except httpx.TransportError as e:
+                    if attempt == retries:
+                        self.failures += 1
+                        raise
+                    self.logger.debug(f"Retrying {url} after {e!r}")
+                else:
+                    self._record(start)
+                    if response.status_code not in RETRY_STATUSES or attempt == retries:
+                        return response
+                    self.logger.debug(f"Retrying {url} after HTTP {response.status_code}")
+                    delay = retry_after(response, delay)
+
+            self.retried += 1
+            await asyncio.sleep(delay)
+
+    def _record(self, start: float):
+        now = time.perf_counter()
+        self.requests += 1
+        self.latencies.append(now - start)
+        self._last_response = now
+
+    def stats(self) -> Dict[str, float]:
+        latencies = sorted(self.latencies)
+        elapsed = (self._last_response or 0.0) - (self._first_request or 0.0)
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retried,
+            "requests_per_sec": self.requests / elapsed if elapsed > 0 else 0.0,
+            "p50_latency": percentile(0.50),
+            "p95_latency": percentile(0.95),
+        }
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+#the server's numeric Retry-After (429/503) when given, else the backoff delay
+def retry_after(response: "httpx.Response", default: Optional[float]) -> Optional[float]:
+    try:
+        return min(float(response.headers["Retry-After"]), 60.0)
+    except (KeyError, ValueError):
+        return default
@@ -0,0 +1,21 @@
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+#module-level __getattr__/__dir__ for a package that re-exports names from its submodules.
+#exports maps each public name to the submodule defining it, relative to the package; the
+#submodule is imported the first time the name is looked up and the value is cached on the
+#package, so later lookups are plain attribute reads
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
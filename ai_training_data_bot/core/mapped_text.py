@@ -0,0 +1,127 @@
+import mmap
+import os
+import weakref
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+#a UTF-8 text file mapped read-only and decoded one block at a time, so a multi-GB file
+#never becomes a single str. Undecodable bytes are dropped and newlines normalized as
+#read_text does, so the decoded text equals path.read_text(encoding="utf-8", errors="ignore").
+#The mapping and file are released by close(), or when the object is garbage collected
+class MappedText:
+    def __init__(self, path: Union[str, Path], block_bytes: int = 1 << 16):
+        self.path = Path(path)
+        self.block_bytes = block_bytes
+        self._file = open(self.path, "rb")
+        self.nbytes = os.fstat(self._file.fileno()).st_size
+        #empty files cannot be mapped
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.nbytes else None
+        self._finalizer = weakref.finalize(self, _release, self._mm, self._file)
+        #char and byte offset where each block starts, filled in by the first full pass
+        self._block_chars = array("q")
+        self._block_bytes = array("q")
+        self._length: Optional[int] = None
+        self._words: Optional[int] = None
+        #(char offset, text) of the last decoded range; neighbouring chunks usually fall in it
+        self._recent = (0, "")
+
+    #pickles as its path, so pool workers map the file themselves
+    def __reduce__(self):
+        return (MappedText, (str(self.path), self.block_bytes))
+
+    def __len__(self) -> int:
+        if self._length is None:
+            for _ in self.blocks():
+                pass
+        return self._length
+
+    def blocks(self) -> Iterator[str]:
+        index = self._length is None
+        block_chars, block_bytes = array("q"), array("q")
+        chars = start = 0
+        while start < self.nbytes:
+            end = self._block_end(start)
+            text = self._decode(start, end)
+            if index:
+                block_chars.append(chars)
+                block_bytes.append(start)
+            chars += len(text)
+            start = end
+            yield text
+        if index:
+            self._block_chars, self._block_bytes, self._length = block_chars, block_bytes, chars
+
+    #same count as len(text.split()), without holding the text
+    def word_count(self) -> int:
+        if self._words is None:
+            count, in_word = 0, False
+            for text in self.blocks():
+                if not text:
+                    continue
+                count += len(text.split())
+                #a word cut by the block boundary was counted on both sides
+                if in_word and not text[0].isspace():
+                    count -= 1
+                in_word = not text[-1].isspace()
+            self._words = count
+        return self._words
+
+    #text[start:end] in character offsets, decoding only the blocks that cover it
+    def text(self, start: int, end: int) -> str:
+        length = len(self)
+        start, end = max(0, start), min(end, length)
+        if end <= start:
+            return ""
+        base, text = self._recent
+        if base <= start and end <= base + len(text):
+            return text[start - base:end - base]
+
+        i = bisect_right(self._block_chars, start) - 1
+        base = chars = self._block_chars[i]
+        byte = self._block_bytes[i]
+        parts = []
+        while chars < end and byte < self.nbytes:
+            stop = self._block_end(byte)
+            parts.append(self._decode(byte, stop))
+            chars += len(parts[-1])
+            byte = stop
+        text = "".join(parts)
+        self._recent = (base, text)
+        return text[start - base:end - base]
+
+    def read(self) -> str:
+        return "".join(self.blocks())
+
+    def close(self):
+        self._finalizer()
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    #blocks never split a UTF-8 sequence or a \r\n pair, so each decodes on its own
+    def _block_end(self, start: int) -> int:
+        end = min(start + self.block_bytes, self.nbytes)
+        if end == self.nbytes:
+            return end
+        cut = end
+        while cut > start and self._mm[cut] & 0xC0 == 0x80:
+            cut -= 1
+        if cut > start + 1 and self._mm[cut - 1] == 0x0D:
+            cut -= 1
+        return cut if cut > start else end
+
+    def _decode(self, start: int, end: int) -> str:
+        text = self._mm[start:end].decode("utf-8", "ignore")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+
+#must not hold the MappedText itself, or the finalizer would keep it alive
+def _release(mm: Optional[mmap.mmap], file):
+    if mm is not None:
+        mm.close()
+    file.close()
@@ -0,0 +1,272 @@
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Optional, TypeVar, Union
+
+T = TypeVar("T")
+
+#pipeline stages in report order; other names are accepted and listed after these
+STAGES = ("load", "extract", "chunk", "dedup", "generate", "evaluate", "export", "checkpoint")
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    items: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    queue_depth: int = 0
+    queue_depth_max: int = 0
+    #largest tracemalloc peak above the stage's starting allocation, when traced
+    memory_peak: int = 0
+
+#what stage() hands back while metrics are disabled: one shared object whose methods do
+#nothing, so instrumented code costs an attribute lookup and a call per stage
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def add(self, items: int = 0, bytes_in: int = 0, bytes_out: int = 0, errors: int = 0):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+
+#one timed call of a stage; counts added inside the block are committed on exit, and an
+#exception leaving the block counts as an error
+class _Stage:
+    __slots__ = (
+        "metrics", "name", "items", "bytes_in", "bytes_out", "errors", "start", "profiler", "memory", "tracing"
+    )
+
+    def __init__(self, metrics: "Metrics", name: str, items: int, bytes_in: int):
+        self.metrics = metrics
+        self.name = name
+        self.items = items
+        self.bytes_in = bytes_in
+        self.bytes_out = 0
+        self.errors = 0
+        self.profiler: Optional[cProfile.Profile] = None
+        self.memory: Optional[int] = None
+        self.tracing = False
+
+    def __enter__(self) -> "_Stage":
+        self.metrics._start_capture(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed = time.perf_counter() - self.start
+        self.metrics._stop_capture(self)
+        if exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            self.errors += 1
+        self.metrics._record(self.name, elapsed, self.items, self.bytes_in, self.bytes_out, self.errors)
+        return False
+
+    def add(self, items: int = 0, bytes_in: int = 0, bytes_out: int = 0, errors: int = 0):
+        self.items += items
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.errors += errors
+
+
+#per-stage timers, counters and queue depths for one bot. Disabled (the default), every
+#method returns immediately. Seconds are wall-clock time inside stage() blocks; calls
+#that overlap on the event loop or in threads each count in full, so a stage's seconds
+#can exceed the run's elapsed time.
+#profile_stages/trace_stages name stages to capture with cProfile/tracemalloc. cProfile
+#only sees the thread that entered the stage, and only one capture runs at a time: a
+#stage entered while another is capturing is timed but not profiled
+class Metrics:
+    def __init__(
+        self,
+        enabled: bool = False,
+        profile_stages: Iterable[str] = (),
+        trace_stages: Iterable[str] = ()
+    ):
+        self.enabled = enabled
+        self.profile_stages = frozenset(profile_stages)
+        self.trace_stages = frozenset(trace_stages)
+        self.stages: Dict[str, StageStats] = {}
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        #stages may be entered from writer/loader threads
+        self._lock = threading.Lock()
+        self._capturing = False
+        self._started = time.time()
+
+    def stage(self, name: str, items: int = 0, bytes_in: int = 0):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, items, bytes_in)
+
+    #counts outside a timed block, e.g. one per document streamed through a stage
+    def count(self, name: str, items: int = 0, bytes_in: int = 0, bytes_out: int = 0, errors: int = 0):
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stats(name)
+            stats.items += items
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+            stats.errors += errors
+
+    #current depth of the queue feeding a stage
+    def queue(self, name: str, depth: int):
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stats(name)
+            stats.queue_depth = depth
+            stats.queue_depth_max = max(stats.queue_depth_max, depth)
+
+    #times each step of an async iterator (the producer's work, not the consumer's) as one
+    #call of the stage; size gives the bytes of an item. Disabled, iterable is returned as is
+    def timed(
+        self,
+        name: str,
+        iterable: AsyncIterable[T],
+        size: Optional[Callable[[T], int]] = None
+    ) -> AsyncIterator[T]:
+        if not self.enabled:
+            return iterable
+        return self._timed(name, iterable, size)
+
+    async def _timed(self, name: str, iterable: AsyncIterable[T], size: Optional[Callable[[T], int]]) -> AsyncIterator[T]:
+        iterator = iterable.__aiter__()
+        try:
+            while True:
+                with self.stage(name) as stage:
+                    try:
+                        item = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    stage.add(items=1, bytes_out=size(item) if size else 0)
+                yield item
+        finally:
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.profiles.clear()
+            self._started = time.time()
+
+    def report(self) -> Dict[str, object]:
+        with self._lock:
+            names = [s for s in STAGES if s in self.stages] + sorted(set(self.stages) - set(STAGES))
+            return {
+                "enabled": self.enabled,
+                "started": self._started,
+                "elapsed": time.time() - self._started,
+                "pid": os.getpid(),
+                "stages": {name: asdict(self.stages[name]) for name in names},
+                "profiled": sorted(self.profiles),
+            }
+
+    def write_report(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.report(), indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    #one <stage>.prof file per profiled stage, readable with pstats or snakeviz
+    def write_profiles(self, directory: Union[str, Path]) -> Dict[str, Path]:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            profiles = dict(self.profiles)
+        paths = {}
+        for name, profiler in profiles.items():
+            paths[name] = directory / f"{name}.prof"
+            profiler.dump_stats(str(paths[name]))
+        return paths
+
+    #Prometheus text exposition format (version 0.0.4)
+    def prometheus(self, prefix: str = "training_data_bot") -> str:
+        series = (
+            ("calls", "calls_total", "counter", "Timed calls of each stage"),
+            ("items", "items_total", "counter", "Items produced by each stage"),
+            ("errors", "errors_total", "counter", "Failed calls or items of each stage"),
+            ("seconds", "seconds_total", "counter", "Wall-clock seconds spent in each stage"),
+            ("bytes_in", "bytes_in_total", "counter", "Bytes of text entering each stage"),
+            ("bytes_out", "bytes_out_total", "counter", "Bytes of text leaving each stage"),
+            ("queue_depth", "queue_depth", "gauge", "Items waiting in the queue feeding each stage"),
+            ("queue_depth_max", "queue_depth_max", "gauge", "Largest queue depth seen for each stage"),
+            ("memory_peak", "memory_peak_bytes", "gauge", "Largest traced allocation peak of each stage"),
+        )
+        stages = self.report()["stages"]
+        lines = []
+        for field, suffix, kind, help_text in series:
+            metric = f"{prefix}_stage_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, stats in stages.items():
+                lines.append(f'{metric}{{stage="{name}"}} {stats[field]}')
+        return "\n".join(lines) + "\n"
+
+    def _stats(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    def _record(self, name: str, elapsed: float, items: int, bytes_in: int, bytes_out: int, errors: int):
+        with self._lock:
+            stats = self._stats(name)
+            stats.calls += 1
+            stats.seconds += elapsed
+            stats.items += items
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+            stats.errors += errors
+
+    def _start_capture(self, stage: _Stage):
+        name = stage.name
+        if name not in self.profile_stages and name not in self.trace_stages:
+            return
+        with self._lock:
+            if self._capturing:
+                return
+            self._capturing = True
+        if name in self.trace_stages:
+            #tracing slows every allocation, so it only runs inside traced stages
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                stage.tracing = True
+            tracemalloc.reset_peak()
+            stage.memory = tracemalloc.get_traced_memory()[0]
+        if name in self.profile_stages:
+            if name not in self.profiles:
+                self.profiles[name] = cProfile.Profile()
+            stage.profiler = self.profiles[name]
+            stage.profiler.enable()
+
+    def _stop_capture(self, stage: _Stage):
+        if stage.profiler is None and stage.memory is None:
+            return
+        if stage.profiler is not None:
+            stage.profiler.disable()
+        peak = 0
+        if stage.memory is not None:
+            peak = tracemalloc.get_traced_memory()[1] - stage.memory
+            if stage.tracing:
+                tracemalloc.stop()
+        with self._lock:
+            self._capturing = False
+            if peak:
+                stats = self._stats(stage.name)
+                stats.memory_peak = max(stats.memory_peak, peak)
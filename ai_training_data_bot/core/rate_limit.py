@@ -0,0 +1,35 @@
+import asyncio
+import time
+from typing import Optional
+
+#token bucket: refills at `rate` units per second up to `capacity`. Waiters are served
+#in arrival order; a request larger than the capacity waits for a full bucket and then
+#leaves it in debt, so oversized requests are slowed down rather than rejected
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        #total seconds callers spent waiting, for stats
+        self.waited = 0.0
+
+    async def acquire(self, amount: float = 1.0):
+        async with self._lock:
+            start = time.monotonic()
+            needed = min(amount, self.capacity)
+            while True:
+                self._refill()
+                if self._tokens >= needed:
+                    break
+                await asyncio.sleep((needed - self._tokens) / self.rate)
+            self._tokens -= amount
+            self.waited += time.monotonic() - start
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -1,26 +1,225 @@
-from typing import List, Dict
-from ..models import Dataset, QualityReport, QualityMetric
+import asyncio
+import multiprocessing
+import re
+from warnings import catch_warnings, simplefilter
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, FrozenSet, Iterable, List, Optional, Tuple, Union
+from .models import Dataset, QualityReport, QualityMetric, TrainingExample
+from .storage.chunk_store import ExampleStore
 from uuid import uuid4
 from datetime import datetime
-from ..core.logging import get_logger
+
+from .core.logging import get_logger
+
+#numpy is imported where it is used, so building a QualityEvaluator (which every bot does)
+#costs nothing until the first dataset is scored
+if TYPE_CHECKING:
+    import numpy as np
+
+#column order of the score arrays produced by _score_batch
+METRICS = (
+    QualityMetric.RELEVANCE,
+    QualityMetric.COHERENCE,
+    QualityMetric.TOXICITY,
+    QualityMetric.BIAS,
+    QualityMetric.DIVERSITY,
+)
+
+DEFAULT_TOXICITY_LEXICON = frozenset({
+    "idiot", "idiots", "stupid", "moron", "morons", "dumb", "loser", "losers", "hate", "hateful",
+    "kill", "killing", "die", "trash", "garbage", "pathetic", "worthless", "disgusting", "shut",
+    "ugly", "fool", "fools", "damn", "crap", "scum", "freak", "jerk", "bastard", "suck", "sucks",
+})
+
+MALE_TERMS = frozenset({"he", "him", "his", "himself", "man", "men", "male", "boy", "boys", "father", "husband"})
+FEMALE_TERMS = frozenset({"she", "her", "hers", "herself", "woman", "women", "female", "girl", "girls", "mother", "wife"})
+
+_WORD = re.compile(r"\w+")
+
+
+#token ids for several text columns over one shared vocabulary, plus per-text lengths
+def _encode(*columns: List[str]) -> Tuple[List[str], List[Tuple["np.ndarray", "np.ndarray"]]]:
+    import numpy as np
+
+    tokenized = [[_WORD.findall(t.lower()) for t in texts] for texts in columns]
+    flat = [list(chain.from_iterable(tokens)) for tokens in tokenized]
+    vocab = {w: i for i, w in enumerate(dict.fromkeys(chain.from_iterable(flat)))}
+
+    encoded = []
+    for tokens, words in zip(tokenized, flat):
+        lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+        ids = np.fromiter(map(vocab.__getitem__, words), dtype=np.int64, count=len(words))
+        encoded.append((ids, lengths))
+    return list(vocab), encoded
+
+
+#np.unique via sort; faster than the hash-based default for large int arrays
+def _unique(values: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+#(inputs, outputs) of examples[start:stop] without materializing stored examples
+def _texts(examples, start: int, stop: int) -> Tuple[List[str], List[str]]:
+    if isinstance(examples, ExampleStore):
+        rows = range(start, stop)
+        return [examples.input_text(r) for r in rows], [examples.output_text(r) for r in rows]
+    batch = examples[start:stop]
+    return [ex.input_text for ex in batch], [ex.output_text for ex in batch]
+
+
+def _mask(words: List[str], lexicon: Iterable[str]) -> "np.ndarray":
+    import numpy as np
+
+    return np.fromiter((w in lexicon for w in words), dtype=bool, count=len(words))
+
+
+#scores one batch; module level so it can run in a pool process
+#tokens are mapped to integer ids once, every metric after that is array arithmetic
+def _score_batch(inputs: List[str], outputs: List[str], toxic: FrozenSet[str]) -> "np.ndarray":
+    import numpy as np
+
+    n = len(inputs)
+    words, ((in_ids, in_len), (out_ids, out_len)) = _encode(inputs, outputs)
+    v = max(len(words), 1)
+    lengths = np.maximum(in_len, 1)
+
+    doc = np.repeat(np.arange(n), in_len)
+    same_doc = doc[1:] == doc[:-1]
+    pair_doc = doc[:-1][same_doc]
+
+    #diversity: mean of type/token ratio and distinct-bigram ratio
+    in_pairs = _unique(doc * v + in_ids)
+    ttr = np.bincount(in_pairs // v, minlength=n) / lengths
+    bigrams = _unique(pair_doc * v * v + (in_ids[:-1] * v + in_ids[1:])[same_doc])
+    bigram_total = np.bincount(pair_doc, minlength=n)
+    distinct2 = np.bincount(bigrams // (v * v), minlength=n) / np.maximum(bigram_total, 1)
+    diversity = np.where(bigram_total > 0, (ttr + distinct2) / 2, ttr)
+
+    #coherence: share of alphabetic tokens, penalized for stutter repeats and odd sentence lengths
+    alpha = np.fromiter((w.isalpha() for w in words), dtype=bool, count=len(words))
+    alpha_ratio = np.bincount(doc, weights=alpha[in_ids], minlength=n) / lengths
+    repeats = np.bincount(pair_doc, weights=(in_ids[:-1] == in_ids[1:])[same_doc], minlength=n) / lengths
+    sentences = np.fromiter(
+        (max(1, t.count(".") + t.count("!") + t.count("?")) for t in inputs), dtype=np.int64, count=n
+    )
+    per_sentence = in_len / sentences
+    length_factor = np.where((per_sentence >= 3) & (per_sentence <= 60), 1.0, 0.5)
+    coherence = np.where(in_len > 0, alpha_ratio * (1 - repeats) * length_factor, 0.0)
+
+    #toxicity: lexicon hit rate over input and output tokens
+    out_doc = np.repeat(np.arange(n), out_len)
+    toxic_mask = _mask(words, toxic)
+    toxic_hits = (np.bincount(doc, weights=toxic_mask[in_ids], minlength=n)
+                  + np.bincount(out_doc, weights=toxic_mask[out_ids], minlength=n))
+    toxicity = toxic_hits / np.maximum(in_len + out_len, 1)
+
+    #bias: imbalance between gendered terms
+    male = np.bincount(doc, weights=_mask(words, MALE_TERMS)[in_ids], minlength=n)
+    female = np.bincount(doc, weights=_mask(words, FEMALE_TERMS)[in_ids], minlength=n)
+    bias = np.abs(male - female) / (male + female + 2)
+
+    #relevance: share of output vocabulary grounded in the input; undefined without output
+    out_pairs = _unique(out_doc * v + out_ids)
+    grounded = np.intersect1d(out_pairs, in_pairs, assume_unique=True)
+    out_types = np.bincount(out_pairs // v, minlength=n)
+    relevance = np.where(
+        out_len > 0, np.bincount(grounded // v, minlength=n) / np.maximum(out_types, 1), np.nan
+    )
+
+    return np.column_stack([relevance, coherence, toxicity, bias, diversity]).astype(np.float32)
+
 
 class QualityEvaluator:
-    def __init__(self):
+    #batches of batch_size examples are scored in a process pool when max_workers > 1
+    def __init__(
+        self,
+        batch_size: int = 20_000,
+        max_workers: int = 1,
+        min_score: float = 0.7,
+        max_toxicity: float = 0.05,
+        toxicity_lexicon: Optional[Iterable[str]] = None
+    ):
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.min_score = min_score
+        self.max_toxicity = max_toxicity
+        self.toxicity_lexicon = frozenset(toxicity_lexicon or DEFAULT_TOXICITY_LEXICON)
         self.logger = get_logger("quality_evaluator")
+        self._executor: Optional[ProcessPoolExecutor] = None
 
     async def evaluate(self, dataset: Dataset, detailed_report: bool = True) -> QualityReport:
         self.logger.info(f"Evaluating dataset: {dataset.name} with {len(dataset.examples)} examples")
 
-        metric_scores = {
-            QualityMetric.RELEVANCE: 0.95,
-            QualityMetric.COHERENCE: 0.92,
-            QualityMetric.TOXICITY: 0.01,
-            QualityMetric.BIAS: 0.02,
-            QualityMetric.DIVERSITY: 0.88
-        }
+        scores = await self.score(dataset.examples)
+        names = [m.value for m in METRICS]
+        if isinstance(dataset.examples, ExampleStore):
+            dataset.examples.set_score_matrix(names, scores.tolist())
+        else:
+            for ex, row in zip(dataset.examples, scores.tolist()):
+                ex.quality_scores = {name: value for name, value in zip(names, row) if value == value}
+
+        report = self._build_report(dataset, scores, detailed_report)
+        self.logger.info(f"Evaluation complete. Passed: {report.passed}, Score: {report.overall_score:.2f}")
+        return report
 
-        overall_score = sum(metric_scores.values()) / len(metric_scores)
-        passed = overall_score > 0.85 and metric_scores[QualityMetric.TOXICITY] < 0.05
+    #(examples x METRICS) score matrix; relevance is NaN for examples without output
+    async def score(self, examples: Union[List[TrainingExample], ExampleStore]) -> "np.ndarray":
+        import numpy as np
+
+        if not examples:
+            return np.empty((0, len(METRICS)), dtype=np.float32)
+
+        batches = [
+            _texts(examples, i, min(i + self.batch_size, len(examples)))
+            for i in range(0, len(examples), self.batch_size)
+        ]
+        if self.max_workers > 1 and len(batches) > 1:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            parts = await asyncio.gather(*(
+                loop.run_in_executor(executor, _score_batch, inputs, outputs, self.toxicity_lexicon)
+                for inputs, outputs in batches
+            ))
+        else:
+            parts = [
+                await asyncio.to_thread(_score_batch, inputs, outputs, self.toxicity_lexicon)
+                for inputs, outputs in batches
+            ]
+        return np.concatenate(parts)
+
+    def _build_report(self, dataset: Dataset, scores: "np.ndarray", detailed_report: bool) -> QualityReport:
+        import numpy as np
+
+        with catch_warnings():
+            simplefilter("ignore", RuntimeWarning)
+            means = np.nanmean(scores, axis=0) if len(scores) else np.zeros(len(METRICS))
+        metric_scores = {m: float(v) for m, v in zip(METRICS, means) if v == v}
+
+        #toxicity and bias count against the overall score
+        components = [
+            1 - value if metric in (QualityMetric.TOXICITY, QualityMetric.BIAS) else value
+            for metric, value in metric_scores.items()
+        ]
+        overall_score = sum(components) / len(components) if components else 0.0
+        toxicity = metric_scores.get(QualityMetric.TOXICITY, 0.0)
+        passed = overall_score >= self.min_score and toxicity < self.max_toxicity
+
+        issues, warnings = [], []
+        if overall_score < self.min_score:
+            issues.append(f"Overall score {overall_score:.2f} below {self.min_score:.2f}")
+        if toxicity >= self.max_toxicity:
+            issues.append(f"Mean toxicity {toxicity:.3f} at or above {self.max_toxicity:.3f}")
+        toxic_examples = int((scores[:, METRICS.index(QualityMetric.TOXICITY)] >= self.max_toxicity).sum())
+        if toxic_examples:
+            warnings.append(f"{toxic_examples} examples at or above the toxicity limit")
+        if QualityMetric.RELEVANCE not in metric_scores:
+            warnings.append("No generated outputs; relevance not scored")
 
         report = QualityReport(
             id=uuid4(),
@@ -28,9 +227,29 @@ class QualityEvaluator:
             overall_score=overall_score,
             passed=passed,
             metric_scores=metric_scores,
-            issues=[] if passed else ["Low coherence", "High toxicity"],
-            warnings=[] if passed else ["Review bias and diversity"]
+            issues=issues,
+            warnings=warnings
         )
-
-        self.logger.info(f"Evaluation complete. Passed: {report.passed}, Score: {report.overall_score:.2f}")
+        if detailed_report and len(scores):
+            with catch_warnings():
+                simplefilter("ignore", RuntimeWarning)
+                quantiles = np.nanpercentile(scores, [10, 50, 90], axis=0)
+            report.metadata["distribution"] = {
+                m.value: {"p10": float(q[0]), "p50": float(q[1]), "p90": float(q[2])}
+                for m, q in zip(METRICS, quantiles.T) if q[1] == q[1]
+            }
+            report.metadata["examples"] = len(scores)
         return report
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def close(self):
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, wait=True, cancel_futures=True)
+            self._executor = None
@@ -1,9 +1,18 @@
-from dataclasses import dataclass, field
-from uuid import uuid4, UUID
+from dataclasses import InitVar, dataclass, field
+from uuid import uuid4, uuid5, UUID
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 from enum import Enum
 
+from .core.mapped_text import MappedText
+
+
+#namespace for content-derived ids, so the same input always yields the same id
+ID_NAMESPACE = UUID("6f0f3c1e-8a4e-5b7c-9d2f-3e1a7b5c9d01")
+
+def stable_id(*parts: Any) -> UUID:
+    return uuid5(ID_NAMESPACE, "\x1f".join(str(p) for p in parts))
+
 
 class TaskType(str, Enum):
     QA_GENERATION = "qa_generation"
@@ -13,9 +22,22 @@ class TaskType(str, Enum):
     RED_TEAMING = "red_teaming"
     INSTRUCTION_RESPONSE = "instruction_response"
 
+class DocumentType(str, Enum):
+    PDF = "pdf"
+    TXT = "txt"
+    DOCX = "docx"
+    MD = "md"
+    HTML = "html"
+    JSON = "json"
+    JSONL = "jsonl"
+    CSV = "csv"
+    URL = "url"
+
 class ExportFormat(str, Enum):
     JSONL = "jsonl"
     CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"
 
 
 class QualityMetric(str, Enum):
@@ -25,21 +47,85 @@ class QualityMetric(str, Enum):
     COHERENCE = "coherence"
     RELEVANCE = "relevance"
 
-@dataclass
+#slotted so millions of chunks/examples carry no per-instance __dict__; metadata
+#is only allocated on first access since most entities never get any
+@dataclass(slots=True)
 class BaseEntity:
     id: UUID = field(default_factory=uuid4)
     created_at: datetime = field(default_factory=datetime.utcnow)
-    metadata: Dict[str, Any] = field(default_factory=dict)
-  
-@dataclass
+    metadata: InitVar[Optional[Dict[str, Any]]] = None
+    _metadata: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self, metadata: Optional[Dict[str, Any]]):
+        self._metadata = metadata or None
+
+    def _get_metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    def _set_metadata(self, value: Dict[str, Any]):
+        self._metadata = value
+
+    @property
+    def has_metadata(self) -> bool:
+        return bool(self._metadata)
+
+#InitVar defaults live on the class, so the property is attached after dataclass processing
+BaseEntity.metadata = property(BaseEntity._get_metadata, BaseEntity._set_metadata)
+
+#content is held as a str, or left in a memory-mapped file (mapped) and decoded on
+#access; use text(start, end) for ranges so mapped documents only decode what is needed
+@dataclass(slots=True)
 class Document(BaseEntity):
     title: str = ""
-    content: str = ""
+    content: InitVar[str] = ""
     source: str = ""
     doc_type: str = ""
     word_count: int = 0
+    mapped: Optional[MappedText] = field(default=None, repr=False, compare=False)
+    _content: str = field(default="", init=False, repr=False)
+
+    def __post_init__(self, metadata: Optional[Dict[str, Any]], content: str):
+        BaseEntity.__post_init__(self, metadata)
+        self._content = content
+
+    def _get_content(self) -> str:
+        if self.mapped is not None:
+            return self.mapped.read()
+        return self._content
+
+    def _set_content(self, value: str):
+        self._content = value
+        self.mapped = None
+
+    def text(self, start: int, end: int) -> str:
+        if self.mapped is not None:
+            return self.mapped.text(start, end)
+        return self._content[start:end]
+
+    #text blocks in order, without materializing a mapped document
+    def blocks(self) -> Iterable[str]:
+        if self.mapped is not None:
+            return self.mapped.blocks()
+        return (self._content,)
 
-@dataclass
+    #text length in characters, or the file size in bytes when mapped, without reading it
+    def size(self) -> int:
+        return self.mapped.nbytes if self.mapped is not None else len(self._content)
+
+    #releases the file of a mapped document; its text cannot be read afterwards
+    def close(self):
+        if self.mapped is not None:
+            self.mapped.close()
+
+Document.content = property(Document._get_content, Document._set_content)
+
+#set on a chunk by the dedup "flag" action; examples made from the chunk carry them and
+#every export format writes them
+DUPLICATE_FIELDS = ("duplicate_of", "duplicate_similarity")
+
+@dataclass(slots=True)
 class TextChunk(BaseEntity):
     document_id: UUID = field(default_factory=uuid4)
     content: str = ""
@@ -48,4 +134,33 @@ class TextChunk(BaseEntity):
     chunk_index: int = 0
     token_count: int = 0
 
+    #metadata passed on to the examples made from this chunk
+    def example_metadata(self) -> Optional[Dict[str, Any]]:
+        if not self.has_metadata:
+            return None
+        return {key: self._metadata[key] for key in DUPLICATE_FIELDS if key in self._metadata} or None
+
+@dataclass(slots=True)
+class TrainingExample(BaseEntity):
+    input_text: str = ""
+    output_text: str = ""
+    task_type: TaskType = TaskType.SUMMARIZATION
+    source_document_id: Optional[UUID] = None
+    source_chunk_id: Optional[UUID] = None
+    quality_scores: Dict[str, float] = field(default_factory=dict)
+
+@dataclass(slots=True)
+class Dataset(BaseEntity):
+    name: str = ""
+    description: str = ""
+    examples: List[TrainingExample] = field(default_factory=list)
+    total_examples: int = 0
 
+@dataclass(slots=True)
+class QualityReport(BaseEntity):
+    target_id: Optional[UUID] = None
+    overall_score: float = 0.0
+    passed: bool = False
+    metric_scores: Dict[QualityMetric, float] = field(default_factory=dict)
+    issues: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
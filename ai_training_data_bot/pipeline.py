@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Union
+
+from .models import Document, ExportFormat, TextChunk, TrainingExample
+from .sources.scheduler import IngestionScheduler
+from .storage.dataset_exporter import DatasetExporter
+from .core.logging import get_logger
+from .core.metrics import Metrics
+
+ChunkFn = Callable[[Document], Iterable[TextChunk]]
+GenerateFn = Callable[[List[TextChunk]], Awaitable[List[TrainingExample]]]
+
+#end-of-stream marker passed between stages
+_DONE = object()
+
+@dataclass
+class PipelineStats:
+    documents: int = 0
+    chunks: int = 0
+    examples: int = 0
+    elapsed: float = 0.0
+
+#load -> chunk -> generate -> export, connected by bounded queues so peak memory
+#is set by queue_size rather than corpus size
+class StreamingPipeline:
+    def __init__(
+        self,
+        scheduler: IngestionScheduler,
+        chunk: ChunkFn,
+        generate: GenerateFn,
+        exporter: DatasetExporter,
+        queue_size: int = 64,
+        batch_size: int = 16,
+        concurrency: int = 1,
+        metrics: Optional[Metrics] = None
+    ):
+        self.scheduler = scheduler
+        self.chunk = chunk
+        self.generate = generate
+        self.exporter = exporter
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.concurrency = max(1, concurrency)
+        self.stats = PipelineStats()
+        #stage timings come from the callables; the pipeline reports queue depths
+        self.metrics = metrics or Metrics()
+        self.logger = get_logger("streaming_pipeline")
+
+    async def run(
+        self,
+        sources: List[Union[str, Path]],
+        output_path: Union[str, Path],
+        format: ExportFormat = ExportFormat.JSONL
+    ) -> PipelineStats:
+        start = time.perf_counter()
+        documents: asyncio.Queue = asyncio.Queue(self.queue_size)
+        chunks: asyncio.Queue = asyncio.Queue(self.queue_size)
+        examples: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        tasks = [
+            asyncio.ensure_future(self._load(sources, documents)),
+            asyncio.ensure_future(self._chunk(documents, chunks)),
+            asyncio.ensure_future(self._generate(chunks, examples)),
+            asyncio.ensure_future(self.exporter.export_stream(self._drain(examples, "export"), output_path, format=format)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        self.stats.elapsed = time.perf_counter() - start
+        self.logger.info(
+            f"Streamed {self.stats.documents} documents -> {self.stats.chunks} chunks -> "
+            f"{self.stats.examples} examples in {self.stats.elapsed:.2f}s"
+        )
+        return self.stats
+
+    async def _load(self, sources, out: asyncio.Queue):
+        async for doc in self.scheduler.stream(sources):
+            self.stats.documents += 1
+            await out.put(doc)
+        await out.put(_DONE)
+
+    async def _chunk(self, inp: asyncio.Queue, out: asyncio.Queue):
+        async for doc in self._drain(inp, "chunk"):
+            for chunk in self.chunk(doc):
+                self.stats.chunks += 1
+                await out.put(chunk)
+            doc.close()
+        await out.put(_DONE)
+
+    #up to `concurrency` batches are generated at once; results are emitted in input order.
+    #Batches are always batch_size chunks except the last, so batching (and the output) does
+    #not depend on how fast chunks arrive
+    async def _generate(self, inp: asyncio.Queue, out: asyncio.Queue):
+        window = deque()
+        batch = []
+        try:
+            async for chunk in self._drain(inp, "generate"):
+                batch.append(chunk)
+                if len(batch) >= self.batch_size:
+                    window.append(asyncio.ensure_future(self.generate(batch)))
+                    batch = []
+                    if len(window) >= self.concurrency:
+                        await self._emit(await window.popleft(), out)
+            if batch:
+                window.append(asyncio.ensure_future(self.generate(batch)))
+            while window:
+                await self._emit(await window.popleft(), out)
+        finally:
+            for task in window:
+                task.cancel()
+        await out.put(_DONE)
+
+    async def _emit(self, examples: List[TrainingExample], out: asyncio.Queue):
+        for ex in examples:
+            self.stats.examples += 1
+            await out.put(ex)
+
+    #stage names the consumer, whose queue depth is recorded on every get
+    async def _drain(self, queue: asyncio.Queue, stage: Optional[str] = None) -> AsyncIterator:
+        while True:
+            item = await queue.get()
+            if stage is not None:
+                self.metrics.queue(stage, queue.qsize())
+            if item is _DONE:
+                return
+            yield item
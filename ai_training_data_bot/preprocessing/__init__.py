@@ -0,0 +1,23 @@
+from typing import TYPE_CHECKING
+
+from ..core.lazy import lazy_exports
+
+_EXPORTS = {
+    "TextPreprocessor": ".text_preprocessor",
+    "Tokenizer": ".tokenizers",
+    "RegexTokenizer": ".tokenizers",
+    "WhitespaceTokenizer": ".tokenizers",
+    "NearDuplicateIndex": ".dedup",
+    "Deduplicator": ".dedup",
+    "ParallelChunker": ".parallel_chunker",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .text_preprocessor import TextPreprocessor
+    from .tokenizers import Tokenizer, RegexTokenizer, WhitespaceTokenizer
+    from .dedup import NearDuplicateIndex, Deduplicator
+    from .parallel_chunker import ParallelChunker
@@ -0,0 +1,234 @@
+import hashlib
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..models import TextChunk
+from ..core.exceptions import ConfigurationError
+from ..core.logging import get_logger
+
+#minhash permutations are (a * h + b) mod a Mersenne prime, so products stay inside uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_WORD = re.compile(r"\w+")
+#candidates are checked against the threshold, so a missed pair costs more than an extra one
+_FALSE_POSITIVE_WEIGHT = 0.3
+_FALSE_NEGATIVE_WEIGHT = 0.7
+
+#(bands, rows) for num_perm permutations whose S-curve 1 - (1 - s^rows)^bands best fits a step
+#at threshold: minimizes the weighted area of candidates below it and of misses above it
+def lsh_layout(threshold: float, num_perm: int) -> Tuple[int, int]:
+    if not 0.0 < threshold < 1.0:
+        raise ConfigurationError(f"dedup threshold must be between 0 and 1, got {threshold}")
+    below, above = np.linspace(0.0, threshold, 201), np.linspace(threshold, 1.0, 201)
+    best, layout = None, (1, num_perm)
+    for bands in (b for b in range(1, num_perm + 1) if num_perm % b == 0):
+        rows = num_perm // bands
+        false_positive = np.trapezoid(1 - (1 - below ** rows) ** bands, below)
+        false_negative = np.trapezoid((1 - above ** rows) ** bands, above)
+        error = _FALSE_POSITIVE_WEIGHT * false_positive + _FALSE_NEGATIVE_WEIGHT * false_negative
+        if best is None or error < best:
+            best, layout = error, (bands, rows)
+    return layout
+
+#exact hashing plus MinHash/LSH banding over chunk text; lookups only touch
+#chunks that share a band bucket, so indexing stays sub-quadratic. Without `bands`
+#the layout is derived from threshold by lsh_layout
+class NearDuplicateIndex:
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: Optional[int] = None,
+        threshold: float = 0.8,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        if bands is None:
+            bands, _ = lsh_layout(threshold, num_perm)
+        elif num_perm % bands:
+            raise ConfigurationError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+        self._band_mult = (rng.randint(1, 1 << 62, size=self.rows).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._shingle_mult = np.uint64(0x100000001B3)
+
+        self.keys: List[str] = []
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self._exact: Dict[int, int] = {}
+        #one bucket table per band: band hash -> item index, or list of indexes on collision
+        self._buckets: List[Dict[int, Union[int, List[int]]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def signature(self, text: str) -> np.ndarray:
+        tokens = _WORD.findall(text.lower())
+        if not tokens:
+            return np.full(self.num_perm, int(_PRIME), dtype=np.uint32)
+
+        token_hashes = np.fromiter(
+            (zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens)
+        )
+        k = min(self.shingle_size, len(tokens))
+        shingles = token_hashes[:len(tokens) - k + 1].copy()
+        for j in range(1, k):
+            shingles = shingles * self._shingle_mult + token_hashes[j:len(tokens) - k + 1 + j]
+        shingles = np.unique((shingles >> np.uint64(32)) ^ (shingles & np.uint64(0xFFFFFFFF)))
+
+        permuted = (shingles[:, None] * self._a[None, :] + self._b[None, :]) % _PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    #key of an indexed chunk with the same normalized text
+    def lookup_exact(self, text: str) -> Optional[str]:
+        idx = self._exact.get(_exact_hash(text))
+        return None if idx is None else self.keys[idx]
+
+    #(key, estimated jaccard) of the closest indexed chunk at or above threshold
+    def lookup_similar(self, signature: np.ndarray, exclude: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            hit = self._buckets[band].get(band_key)
+            if hit is None:
+                continue
+            if isinstance(hit, list):
+                candidates.update(hit)
+            else:
+                candidates.add(hit)
+        candidates = [i for i in candidates if self.keys[i] != exclude]
+        if not candidates:
+            return None
+
+        similarity = (self._signatures[candidates] == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] >= self.threshold:
+            return self.keys[candidates[best]], float(similarity[best])
+        return None
+
+    def add(self, key: str, text: str, signature: Optional[np.ndarray] = None):
+        signature = self.signature(text) if signature is None else signature
+        idx = len(self.keys)
+        if idx == len(self._signatures):
+            grown = np.empty((idx * 2, self.num_perm), dtype=np.uint32)
+            grown[:idx] = self._signatures
+            self._signatures = grown
+
+        self.keys.append(key)
+        self._signatures[idx] = signature
+        self._exact.setdefault(_exact_hash(text), idx)
+        self._index_bands(idx, signature)
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        exact = np.array(list(self._exact.items()), dtype=np.uint64).reshape(-1, 2)
+        with path.open("wb") as f:
+            np.savez_compressed(
+                f,
+                params=np.array([self.num_perm, self.bands, self.shingle_size, self.seed], dtype=np.int64),
+                threshold=np.array([self.threshold]),
+                keys=np.array(self.keys, dtype=str),
+                signatures=self._signatures[:len(self.keys)],
+                exact=exact
+            )
+
+    #with threshold, the saved signatures are re-banded for it; the saved one is used otherwise
+    @classmethod
+    def load(cls, path: Union[str, Path], threshold: Optional[float] = None) -> "NearDuplicateIndex":
+        with np.load(Path(path)) as data:
+            num_perm, bands, shingle_size, seed = (int(v) for v in data["params"])
+            saved = float(data["threshold"][0])
+            if threshold is not None and threshold != saved:
+                index = cls(num_perm=num_perm, threshold=threshold, shingle_size=shingle_size, seed=seed)
+            else:
+                index = cls(num_perm=num_perm, bands=bands, threshold=saved, shingle_size=shingle_size, seed=seed)
+            index.keys = data["keys"].tolist()
+            signatures = data["signatures"]
+            index._signatures = np.empty((max(1024, 2 * len(signatures)), num_perm), dtype=np.uint32)
+            index._signatures[:len(signatures)] = signatures
+            index._exact = {int(h): int(i) for h, i in data["exact"]}
+
+        for idx in range(len(index.keys)):
+            index._index_bands(idx, index._signatures[idx])
+        return index
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        bands = signature.reshape(self.bands, self.rows).astype(np.uint64)
+        return (bands * self._band_mult[None, :]).sum(axis=1).tolist()
+
+    def _index_bands(self, idx: int, signature: np.ndarray):
+        for band, band_key in enumerate(self._band_keys(signature)):
+            table = self._buckets[band]
+            hit = table.get(band_key)
+            if hit is None:
+                table[band_key] = idx
+            elif isinstance(hit, list):
+                hit.append(idx)
+            else:
+                table[band_key] = [hit, idx]
+
+
+def _exact_hash(text: str) -> int:
+    normalized = " ".join(text.lower().split())
+    return int.from_bytes(hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+#pipeline stage between chunking and example creation
+class Deduplicator:
+    def __init__(self, index: Optional[NearDuplicateIndex] = None, action: str = "drop"):
+        if action not in ("drop", "flag"):
+            raise ConfigurationError(f"Unknown dedup action: {action}")
+        self.index = index if index is not None else NearDuplicateIndex()
+        self.action = action
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self.logger = get_logger("deduplicator")
+
+    def process(self, chunks: List[TextChunk]) -> List[TextChunk]:
+        kept = []
+        for chunk in chunks:
+            key = str(chunk.id)
+            duplicate_of = self.index.lookup_exact(chunk.content)
+            if duplicate_of == key:
+                #already indexed by an earlier run
+                kept.append(chunk)
+                continue
+
+            similarity = 1.0
+            if duplicate_of is not None:
+                self.exact_duplicates += 1
+            else:
+                signature = self.index.signature(chunk.content)
+                match = self.index.lookup_similar(signature, exclude=key)
+                if match is None:
+                    self.index.add(key, chunk.content, signature=signature)
+                    kept.append(chunk)
+                    continue
+                duplicate_of, similarity = match
+                self.near_duplicates += 1
+
+            #see models.DUPLICATE_FIELDS
+            if self.action == "flag":
+                chunk.metadata["duplicate_of"] = duplicate_of
+                chunk.metadata["duplicate_similarity"] = similarity
+                kept.append(chunk)
+
+        if len(kept) < len(chunks):
+            self.logger.debug(f"Dropped {len(chunks) - len(kept)} duplicate chunks")
+        return kept
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "indexed": len(self.index),
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+        }
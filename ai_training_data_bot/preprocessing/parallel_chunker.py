@@ -0,0 +1,170 @@
+import asyncio
+import multiprocessing
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID
+
+from ..models import Document, TextChunk, stable_id
+from ..core.mapped_text import MappedText
+from ..core.logging import get_logger
+from .text_preprocessor import TextPreprocessor
+
+#(offset, size) of the document's text in the shard's shared block, its id, and the file
+#path of a memory-mapped document, which workers map instead of reading shared memory
+_Entry = Tuple[int, int, str, Optional[str]]
+
+#set in each pool process by the initializer, so the preprocessor is pickled once per worker
+_WORKER_PREPROCESSOR: Optional[TextPreprocessor] = None
+
+
+def _init_worker(preprocessor: TextPreprocessor):
+    global _WORKER_PREPROCESSOR
+    _WORKER_PREPROCESSOR = preprocessor
+
+
+#runs in a pool process: decodes each document from the shared block (or maps its file)
+#and returns its chunks as descriptors, (start, end, token_count) triples plus the packed
+#16-byte chunk ids
+def _chunk_shard(shm_name: Optional[str], entries: List[_Entry]) -> List[Tuple[bytes, bytes]]:
+    shm = SharedMemory(name=shm_name) if shm_name else None
+    try:
+        results = []
+        for offset, size, document_id, path in entries:
+            if path is not None:
+                mapped = MappedText(path)
+                blocks = mapped.blocks()
+            else:
+                mapped = None
+                blocks = (str(shm.buf[offset:offset + size], "utf-8"),)
+            spans = array("q")
+            ids = bytearray()
+            for start, end, token_count, text in _WORKER_PREPROCESSOR.iter_spans(blocks):
+                spans.extend((start, end, token_count))
+                ids += stable_id(document_id, start, end, text).bytes
+            if mapped is not None:
+                mapped.close()
+            results.append((spans.tobytes(), bytes(ids)))
+        return results
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+#chunks documents in a process pool. Documents are packed into shards of about
+#shard_bytes; each shard's text is copied once into a shared memory block instead of
+#being pickled (memory-mapped documents are mapped by the worker from their file), and
+#workers send back only offsets and ids. The chunks built from those descriptors are
+#the same as TextPreprocessor.chunk_document's
+class ParallelChunker:
+    def __init__(
+        self,
+        preprocessor: TextPreprocessor,
+        workers: Optional[int] = None,
+        shard_bytes: int = 32 << 20
+    ):
+        self.preprocessor = preprocessor
+        self.workers = workers or multiprocessing.cpu_count()
+        self.shard_bytes = shard_bytes
+        self.logger = get_logger("parallel_chunker")
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def chunk_documents(self, documents: List[Document]) -> List[List[TextChunk]]:
+        return [chunks async for _, chunks in self.iter_chunks(documents)]
+
+    #(document, chunks) in document order; at most two shards per worker are in flight,
+    #so shared memory use stays bounded however large the corpus is
+    async def iter_chunks(self, documents: List[Document]) -> AsyncIterator[Tuple[Document, List[TextChunk]]]:
+        window = deque()
+        try:
+            for shard in self._plan(documents):
+                window.append((shard, asyncio.ensure_future(self._run_shard(shard))))
+                if len(window) >= 2 * self.workers:
+                    for item in self._materialize(*await self._pop(window)):
+                        yield item
+            while window:
+                for item in self._materialize(*await self._pop(window)):
+                    yield item
+        finally:
+            for _, task in window:
+                task.cancel()
+
+    async def close(self):
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, wait=True, cancel_futures=True)
+            self._executor = None
+
+    #consecutive documents grouped so every worker gets several shards to balance load
+    def _plan(self, documents: List[Document]) -> List[List[Document]]:
+        total = sum(doc.size() for doc in documents)
+        target = max(1 << 20, min(self.shard_bytes, total // (4 * self.workers) + 1))
+        shards, shard, size = [], [], 0
+        for doc in documents:
+            shard.append(doc)
+            size += doc.size()
+            if size >= target:
+                shards.append(shard)
+                shard, size = [], 0
+        if shard:
+            shards.append(shard)
+        return shards
+
+    async def _pop(self, window: deque):
+        shard, task = window.popleft()
+        return shard, await task
+
+    async def _run_shard(self, shard: List[Document]) -> List[Tuple[bytes, bytes]]:
+        shm, entries = await asyncio.to_thread(self._pack, shard)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), _chunk_shard, shm.name if shm is not None else None, entries
+            )
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    def _pack(self, shard: List[Document]) -> Tuple[Optional[SharedMemory], List[_Entry]]:
+        encoded = [doc.content.encode("utf-8") if doc.mapped is None else b"" for doc in shard]
+        total = sum(len(b) for b in encoded)
+        shm = SharedMemory(create=True, size=total) if total else None
+        entries, offset = [], 0
+        for doc, data in zip(shard, encoded):
+            if doc.mapped is not None:
+                entries.append((0, 0, str(doc.id), str(doc.mapped.path)))
+                continue
+            shm.buf[offset:offset + len(data)] = data
+            entries.append((offset, len(data), str(doc.id), None))
+            offset += len(data)
+        return shm, entries
+
+    def _materialize(self, shard: List[Document], results: List[Tuple[bytes, bytes]]):
+        for doc, (span_bytes, ids) in zip(shard, results):
+            spans = array("q")
+            spans.frombytes(span_bytes)
+            chunks = []
+            for i in range(0, len(spans), 3):
+                start, end = spans[i], spans[i + 1]
+                chunks.append(TextChunk(
+                    id=UUID(bytes=ids[i // 3 * 16:i // 3 * 16 + 16]),
+                    document_id=doc.id,
+                    content=doc.text(start, end),
+                    start_index=start,
+                    end_index=end,
+                    chunk_index=i // 3,
+                    token_count=spans[i + 2]
+                ))
+            yield doc, chunks
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.preprocessor,)
+            )
+        return self._executor
@@ -1,40 +1,103 @@
-from typing import List
-from ..models import Document, TextChunk
-from uuid import uuid4
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+from ..models import Document, TextChunk, stable_id
 from ..core.logging import get_logger
+from ..core.exceptions import ConfigurationError
+from .tokenizers import Tokenizer, WhitespaceTokenizer
+
+#a chunk may end where one of these matches starts
+BOUNDARIES = {
+    "sentence": re.compile(r"(?<=[.!?])\s"),
+    "paragraph": re.compile(r"(?<=\S)\s*?\n\s*?\n"),
+}
 
 class TextPreprocessor:
-    def __init__(self, chunk_size: int = 512):
+    #chunk_size and overlap are measured in tokenizer tokens; boundary snaps a full chunk
+    #back to the last "sentence" or "paragraph" break in its second half
+    def __init__(
+        self,
+        chunk_size: int = 512,
+        overlap: int = 0,
+        boundary: Optional[str] = None,
+        tokenizer: Optional[Tokenizer] = None
+    ):
+        if chunk_size < 1:
+            raise ConfigurationError("chunk_size must be positive")
+        if not 0 <= overlap < chunk_size:
+            raise ConfigurationError("overlap must be smaller than chunk_size")
+        if boundary is not None and boundary not in BOUNDARIES:
+            raise ConfigurationError(f"Unknown chunk boundary: {boundary}")
+
         self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.boundary = boundary
+        self.tokenizer = tokenizer or WhitespaceTokenizer()
         self.logger = get_logger("text_preprocessor")
 
+    #single pass over character offsets; each chunk's content is one slice of the original text
     def chunk_document(self, document: Document) -> List[TextChunk]:
         self.logger.debug(f"Chunking document: {document.title} (ID: {document.id})")
+        chunks = list(self.iter_chunks(document))
+        self.logger.info(f"Finished chunking document: {len(chunks)} chunks created")
+        return chunks
 
-        words = document.content.split()
-        chunks = []
-        i = 0
-        chunk_index = 0
-
-        while i < len(words):
-            chunk_words = words[i:i + self.chunk_size]
-            content = ' '.join(chunk_words)
-
-            chunk = TextChunk(
-                id=uuid4(),
+    #chunks one at a time; a memory-mapped document is read block by block, so only
+    #the text around the current chunk is ever decoded
+    def iter_chunks(self, document: Document) -> Iterator[TextChunk]:
+        for chunk_index, (start, end, token_count, content) in enumerate(self.iter_spans(document.blocks())):
+            yield TextChunk(
+                #content-derived so rebuilds of unchanged text keep their ids
+                id=stable_id(document.id, start, end, content),
                 document_id=document.id,
                 content=content,
-                start_index=i,
-                end_index=i + len(chunk_words),
+                start_index=start,
+                end_index=end,
                 chunk_index=chunk_index,
-                token_count=len(chunk_words)
+                token_count=token_count
             )
 
-            chunks.append(chunk)
-            self.logger.debug(f"Created chunk {chunk_index} with {len(chunk_words)} tokens")
+    #(start, end, token_count) character spans of each chunk
+    def chunk_spans(self, content: str) -> List[Tuple[int, int, int]]:
+        return [(start, end, count) for start, end, count, _ in self.iter_spans((content,))]
 
-            i += self.chunk_size
-            chunk_index += 1
+    #(start, end, token_count, text) of each chunk over text arriving in blocks; offsets
+    #are into the concatenated text. A chunk is emitted once the buffered text runs past
+    #its last token, so block boundaries never change where chunks fall
+    def iter_spans(self, blocks: Iterable[str]) -> Iterator[Tuple[int, int, int, str]]:
+        blocks = iter(blocks)
+        #buf holds the text from absolute offset base onwards
+        buf, base, eof = "", 0, False
+        pos = emitted_end = 0
+        while True:
+            first, last, count = self.tokenizer.advance(buf, pos - base, self.chunk_size)
+            if not eof and (count < self.chunk_size or last >= len(buf)):
+                block = next(blocks, None)
+                if block is None:
+                    eof = True
+                else:
+                    #drop consumed text once it outweighs the rest of the buffer
+                    if pos - base > len(buf) // 2:
+                        buf, base = buf[pos - base:], pos
+                    buf += block
+                continue
+            if count == 0 or last + base <= emitted_end:
+                break
 
-        self.logger.info(f"Finished chunking document: {len(chunks)} chunks created")
-        return chunks
+            end, token_count = last, count
+            if self.boundary is not None and count == self.chunk_size:
+                end, token_count = self._snap(buf, first, last, count)
+            yield first + base, end + base, token_count, buf[first:end]
+            emitted_end = end + base
+
+            #the next chunk starts `overlap` tokens before the end of this one
+            step = max(token_count - self.overlap, 1)
+            pos = base + (end if step == token_count else self.tokenizer.advance(buf, first, step)[1])
+
+    def _snap(self, content: str, first: int, last: int, count: int) -> Tuple[int, int]:
+        half = self.tokenizer.advance(content, first, count // 2)[1]
+        cut = None
+        for m in BOUNDARIES[self.boundary].finditer(content, half, last):
+            cut = m.start()
+        if cut is None:
+            return last, count
+        return cut, count - self.tokenizer.count(content[cut:last])
@@ -0,0 +1,65 @@
+import re
+from typing import Dict, Iterator, Optional, Pattern, Tuple
+
+#tokenizers used for chunk boundaries and token_count; subclass to plug in a model tokenizer
+class Tokenizer:
+    #(start, end) character offsets of each token in text[start:end]
+    def spans(self, text: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        raise NotImplementedError
+
+    def count(self, text: str) -> int:
+        return sum(1 for _ in self.spans(text))
+
+    #(first token start, nth token end, tokens found) for up to n tokens from start
+    def advance(self, text: str, start: int, n: int, end: Optional[int] = None) -> Tuple[int, int, int]:
+        first, last, count = start, start, 0
+        for s, e in self.spans(text, start, end):
+            if count == 0:
+                first = s
+            last = e
+            count += 1
+            if count == n:
+                break
+        return first, last, count
+
+
+class RegexTokenizer(Tokenizer):
+    def __init__(self, pattern: str, flags: int = 0):
+        self.pattern = re.compile(pattern, flags)
+        self._runs: Dict[int, Pattern] = {}
+
+    def spans(self, text: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        end = len(text) if end is None else end
+        return (m.span() for m in self.pattern.finditer(text, start, end))
+
+    #one regex match covers up to n tokens, so the scan stays in the regex engine
+    def advance(self, text: str, start: int, n: int, end: Optional[int] = None) -> Tuple[int, int, int]:
+        end = len(text) if end is None else end
+        m = self._run_pattern(n).search(text, start, end)
+        if m is None:
+            return start, start, 0
+        #the run is greedy, so it is short of n tokens only when the text runs out
+        if self.pattern.search(text, m.end(), end):
+            return m.start(), m.end(), n
+        return m.start(), m.end(), sum(1 for _ in self.spans(text, m.start(), m.end()))
+
+    def _run_pattern(self, n: int) -> Pattern:
+        run = self._runs.get(n)
+        if run is None:
+            p = self.pattern.pattern
+            run = self._runs[n] = re.compile(f"(?:{p})(?:.*?(?:{p})){{0,{n - 1}}}", self.pattern.flags | re.DOTALL)
+        return run
+
+
+class WhitespaceTokenizer(RegexTokenizer):
+    def __init__(self):
+        super().__init__(r"\S+")
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+    def _run_pattern(self, n: int) -> Pattern:
+        run = self._runs.get(n)
+        if run is None:
+            run = self._runs[n] = re.compile(rf"\S+(?:\s+\S+){{0,{n - 1}}}")
+        return run
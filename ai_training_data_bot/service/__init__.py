@@ -0,0 +1,20 @@
+from typing import TYPE_CHECKING
+
+from ..core.lazy import lazy_exports
+
+#create_app pulls in FastAPI; the job types do not
+_EXPORTS = {
+    "Job": ".jobs",
+    "JobManager": ".jobs",
+    "JobStatus": ".jobs",
+    "QueueFullError": ".jobs",
+    "create_app": ".app",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .jobs import Job, JobManager, JobStatus, QueueFullError
+    from .app import create_app
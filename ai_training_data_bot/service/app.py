@@ -0,0 +1,136 @@
+import argparse
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from ..bot import TrainingDataBot
+from ..models import TaskType
+from ..core.config import settings
+from ..core.exceptions import ConfigurationError
+from ..tasks import GenerationBackend
+from .jobs import Job, JobManager, QueueFullError
+
+class JobRequest(BaseModel):
+    sources: List[str]
+    task_types: List[TaskType] = Field(default_factory=lambda: [TaskType.SUMMARIZATION])
+
+#long-running service around one TrainingDataBot. The bot and its job manager are
+#created at startup and shared by every request, so jobs skip interpreter startup,
+#connection setup and cold caches. Metrics are on unless the config turns them off.
+#
+#  POST   /jobs                 submit {"sources": [...], "task_types": [...]}; 429 when the queue is full
+#  GET    /jobs                 progress of every retained job
+#  GET    /jobs/{id}            progress of one job
+#  GET    /jobs/{id}/results    the job's examples as NDJSON, streamed while it runs
+#  DELETE /jobs/{id}            cancel a queued or running job
+#  GET    /stats                bot statistics and job queue stats as JSON
+#  GET    /metrics              Prometheus text format
+#  GET    /health
+def create_app(config: Optional[Dict[str, Any]] = None, backend: Optional[GenerationBackend] = None) -> FastAPI:
+    config = {"metrics": True, **(config or {})}
+
+    def setting(key: str) -> Any:
+        return config.get(key, settings.get(key))
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        bot = TrainingDataBot(config, backend=backend)
+        manager = JobManager(
+            bot,
+            workers=setting("service_workers"),
+            queue_size=setting("service_queue_size"),
+            max_jobs=setting("service_max_jobs"),
+            source_roots=setting("service_source_roots"),
+            allow_any_source=setting("service_allow_any_source"),
+            job_dir=setting("service_job_dir")
+        )
+        manager.start()
+        app.state.bot, app.state.jobs = bot, manager
+        try:
+            yield
+        finally:
+            await manager.close()
+            await bot.cleanup()
+
+    app = FastAPI(title="AI Training Data Bot", lifespan=lifespan)
+
+    def get_job(job_id: str) -> Job:
+        job = app.state.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+        return job
+
+    @app.post("/jobs", status_code=202)
+    async def submit_job(request: JobRequest):
+        try:
+            job = app.state.jobs.submit(request.sources, request.task_types)
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+        except ConfigurationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return job.progress()
+
+    @app.get("/jobs")
+    async def list_jobs():
+        return [job.progress() for job in app.state.jobs.jobs.values()]
+
+    @app.get("/jobs/{job_id}")
+    async def job_progress(job_id: str):
+        return get_job(job_id).progress()
+
+    @app.get("/jobs/{job_id}/results")
+    async def job_results(job_id: str):
+        return StreamingResponse(get_job(job_id).stream(), media_type="application/x-ndjson")
+
+    @app.delete("/jobs/{job_id}")
+    async def cancel_job(job_id: str):
+        get_job(job_id)
+        return (await app.state.jobs.cancel(job_id)).progress()
+
+    @app.get("/stats")
+    async def stats():
+        return {"service": app.state.jobs.stats(), "bot": app.state.bot.get_statistics()}
+
+    @app.get("/metrics")
+    async def metrics():
+        text = app.state.bot.metrics.prometheus() + app.state.jobs.prometheus()
+        return Response(text, media_type="text/plain; version=0.0.4")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the training data bot as a job service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings["service_workers"], help="concurrent jobs")
+    parser.add_argument("--queue-size", type=int, default=settings["service_queue_size"])
+    parser.add_argument("--source-root", action="append",
+                        help=f"serve local sources under this directory (default: {', '.join(settings['service_source_roots'])})")
+    parser.add_argument("--allow-any-source", action="store_true", help="let clients read any local path")
+    parser.add_argument("--job-dir", help="where job results are spooled (default: a temporary directory)")
+    args = parser.parse_args()
+
+    config = {
+        "service_workers": args.workers,
+        "service_queue_size": args.queue_size,
+        "service_allow_any_source": args.allow_any_source,
+        "service_job_dir": args.job_dir,
+    }
+    if args.source_root:
+        config["service_source_roots"] = args.source_root
+    #one event loop process: the shared bot is the point of the service
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+import asyncio
+import shutil
+import tempfile
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Deque, Dict, List, Optional, Sequence
+from uuid import uuid4
+
+from ..bot import TrainingDataBot
+from ..models import TaskType
+from ..core.exceptions import ConfigurationError, TrainingDataBotError
+from ..core.logging import get_logger
+from ..sources.scheduler import IngestionScheduler
+from ..storage.shard_writer import encode_lines, to_record
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+FINISHED = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+class QueueFullError(TrainingDataBotError):
+    pass
+
+#one submitted request. Results are spooled as NDJSON to results_path, so a job's output
+#never sits in memory; any number of readers can stream the file, from the first line,
+#while the job is still running. `bytes` is how much of it is complete lines
+@dataclass
+class Job:
+    sources: List[str]
+    task_types: List[TaskType]
+    results_path: Path
+    id: str = field(default_factory=lambda: uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    examples: int = 0
+    bytes: int = 0
+    scheduler: Optional[IngestionScheduler] = field(default=None, init=False, repr=False)
+    _file: Optional[BinaryIO] = field(default=None, init=False, repr=False)
+    task: Optional[asyncio.Task] = field(default=None, init=False, repr=False)
+    _changed: asyncio.Condition = field(default_factory=asyncio.Condition, init=False, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED
+
+    def progress(self) -> Dict[str, Any]:
+        reports = self.scheduler.reports.values() if self.scheduler is not None else ()
+        return {
+            "id": self.id,
+            "status": self.status.value,
+            "error": self.error,
+            "sources": self.sources,
+            "task_types": [t.value for t in self.task_types],
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "files": sum(r.files for r in reports),
+            "documents": sum(r.loaded for r in reports),
+            "failed": sum(r.failed for r in reports),
+            "errors": [e for r in reports for e in r.errors],
+            "examples": self.examples,
+            "bytes": self.bytes,
+        }
+
+    #called by the job's own task only, so writes never interleave
+    async def append(self, data: bytes, count: int):
+        if self._file is None:
+            self.results_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.results_path.open("wb")
+        await asyncio.to_thread(self._write, data)
+        async with self._changed:
+            self.bytes += len(data)
+            self.examples += count
+            self._changed.notify_all()
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+
+    async def finish(self, status: JobStatus, error: Optional[str] = None):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        async with self._changed:
+            self.status = status
+            self.error = error
+            self.finished = time.time()
+            self._changed.notify_all()
+
+    async def wait(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.done)
+
+    #the NDJSON output from the start, read from the spool file in blocks of at most
+    #block_size bytes; ends when the job finishes
+    async def stream(self, block_size: int = 1 << 20) -> AsyncIterator[bytes]:
+        sent = 0
+        f = None
+        try:
+            while True:
+                async with self._changed:
+                    await self._changed.wait_for(lambda: sent < self.bytes or self.done)
+                    available, done = self.bytes, self.done
+                if sent < available and f is None:
+                    f = self.results_path.open("rb")
+                while sent < available:
+                    data = await asyncio.to_thread(f.read, min(available - sent, block_size))
+                    if not data:
+                        return
+                    sent += len(data)
+                    yield data
+                if done and sent == self.bytes:
+                    return
+        finally:
+            if f is not None:
+                f.close()
+
+
+#a bounded job queue drained by `workers` tasks, all sharing one bot, so loaders, the
+#HTTP pool, the generation engine and the caches stay warm across jobs. submit() fails
+#fast with QueueFullError instead of letting a backlog grow; finished jobs past
+#max_jobs are forgotten, oldest first, along with their results. Results are spooled
+#under job_dir/<job id>/ (a temporary directory, removed on close, when not given).
+#Local sources must resolve under one of source_roots unless allow_any_source is set;
+#with neither, only URLs are accepted.
+#The bot's deduplicator, if enabled, is shared too: a chunk seen by one job is a
+#duplicate for every later job
+class JobManager:
+    def __init__(
+        self,
+        bot: TrainingDataBot,
+        workers: int = 4,
+        queue_size: int = 100,
+        max_jobs: int = 1000,
+        source_roots: Sequence[str] = (),
+        allow_any_source: bool = False,
+        job_dir: Optional[str] = None
+    ):
+        self.bot = bot
+        self.workers = max(1, workers)
+        self.max_jobs = max_jobs
+        self.source_roots = [Path(root).resolve() for root in source_roots or ()]
+        self.allow_any_source = allow_any_source
+        self._owns_job_dir = job_dir is None
+        self.job_dir = Path(job_dir) if job_dir is not None else Path(tempfile.mkdtemp(prefix="training_data_bot_jobs_"))
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.latencies: Deque[float] = deque(maxlen=10_000)
+        self.counts = {status: 0 for status in FINISHED}
+        self.logger = get_logger("job_manager")
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+
+    async def close(self):
+        for job in list(self.jobs.values()):
+            if not job.done:
+                await self.cancel(job.id)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._owns_job_dir:
+            shutil.rmtree(self.job_dir, ignore_errors=True)
+
+    def submit(self, sources: Sequence[str], task_types: Optional[Sequence[TaskType]] = None) -> Job:
+        if not sources:
+            raise ConfigurationError("A job needs at least one source")
+        for source in sources:
+            self._check_source(source)
+        job_id = uuid4().hex
+        job = Job(
+            sources=list(sources),
+            task_types=list(task_types or [TaskType.SUMMARIZATION]),
+            results_path=self.job_dir / job_id / "results.ndjson",
+            id=job_id
+        )
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.queue.maxsize} jobs waiting)") from None
+        self.jobs[job.id] = job
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.jobs.get(job_id)
+        if job is None or job.done:
+            return job
+        if job.task is not None:
+            job.task.cancel()
+            await job.wait()
+        else:
+            #still queued; the worker that picks it up skips it
+            await self._finish(job, JobStatus.CANCELLED)
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            "workers": self.workers,
+            "queued": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "running": sum(1 for job in self.jobs.values() if job.status == JobStatus.RUNNING),
+            "finished": {status.value: count for status, count in self.counts.items()},
+            "p50_latency": percentile(0.50),
+            "p95_latency": percentile(0.95),
+            "p99_latency": percentile(0.99),
+        }
+
+    #Prometheus text lines for the job queue, appended to the bot's stage metrics
+    def prometheus(self, prefix: str = "training_data_bot") -> str:
+        stats = self.stats()
+        lines = [
+            f"# HELP {prefix}_jobs_queued Jobs waiting for a worker",
+            f"# TYPE {prefix}_jobs_queued gauge",
+            f"{prefix}_jobs_queued {stats['queued']}",
+            f"# HELP {prefix}_jobs_running Jobs being processed",
+            f"# TYPE {prefix}_jobs_running gauge",
+            f"{prefix}_jobs_running {stats['running']}",
+            f"# HELP {prefix}_jobs_finished_total Finished jobs by final status",
+            f"# TYPE {prefix}_jobs_finished_total counter",
+        ]
+        lines.extend(f'{prefix}_jobs_finished_total{{status="{s}"}} {n}' for s, n in stats["finished"].items())
+        lines.extend([
+            f"# HELP {prefix}_job_latency_seconds Submit-to-finish time of recent jobs",
+            f"# TYPE {prefix}_job_latency_seconds summary",
+        ])
+        lines.extend(
+            f'{prefix}_job_latency_seconds{{quantile="{q}"}} {stats[key]}'
+            for q, key in (("0.5", "p50_latency"), ("0.95", "p95_latency"), ("0.99", "p99_latency"))
+        )
+        return "\n".join(lines) + "\n"
+
+    def _check_source(self, source: str):
+        if source.startswith(("http://", "https://")) or self.allow_any_source:
+            return
+        path = Path(source).resolve()
+        if not any(path == root or root in path.parents for root in self.source_roots):
+            raise ConfigurationError(f"Source outside the allowed roots: {source}")
+
+    async def _work(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.done:
+                    continue
+                job.task = asyncio.ensure_future(self._run(job))
+                try:
+                    await job.task
+                except asyncio.CancelledError:
+                    if not job.task.cancelled():
+                        #the worker itself is being cancelled
+                        job.task.cancel()
+                        raise
+                    await self._finish(job, JobStatus.CANCELLED)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = JobStatus.RUNNING
+        job.started = time.time()
+        job.scheduler = IngestionScheduler(self.bot.loader, max_workers=self.bot.max_workers, metrics=self.bot.metrics)
+        try:
+            async for examples in self.bot.iter_examples(job.sources, job.task_types, scheduler=job.scheduler):
+                if examples:
+                    await job.append(encode_lines([to_record(ex) for ex in examples]), len(examples))
+        except Exception as e:
+            self.logger.warning(f"Job {job.id} failed: {e!r}")
+            await self._finish(job, JobStatus.FAILED, str(e))
+            return
+        await self._finish(job, JobStatus.SUCCEEDED)
+
+    async def _finish(self, job: Job, status: JobStatus, error: Optional[str] = None):
+        await job.finish(status, error)
+        self.counts[status] += 1
+        self.latencies.append(job.finished - job.created)
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job_id]
+            shutil.rmtree(self.job_dir / job_id, ignore_errors=True)
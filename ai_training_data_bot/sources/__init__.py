@@ -0,0 +1,31 @@
+from typing import TYPE_CHECKING
+
+from ..core.lazy import lazy_exports
+
+_EXPORTS = {
+    "BaseLoader": ".base_loader",
+    "DocumentLoader": ".document_loader",
+    "PDFLoader": ".pdf_loader",
+    "WebLoader": ".web_loader",
+    "RecordLoader": ".record_loader",
+    "UnifiedLoader": ".unified_loader",
+    "IngestionScheduler": ".scheduler",
+    "SourceReport": ".scheduler",
+    "ExtractedHTML": ".html_extractor",
+    "extract_html": ".html_extractor",
+    "extract_html_async": ".html_extractor",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .base_loader import BaseLoader
+    from .document_loader import DocumentLoader
+    from .pdf_loader import PDFLoader
+    from .web_loader import WebLoader
+    from .record_loader import RecordLoader
+    from .unified_loader import UnifiedLoader
+    from .scheduler import IngestionScheduler, SourceReport
+    from .html_extractor import ExtractedHTML, extract_html, extract_html_async
@@ -1,8 +1,58 @@
 from abc import ABC, abstractmethod
-from typing import List
-from ..models import Document
+from pathlib import Path
+from typing import List, Optional, Tuple
+from ..models import Document, stable_id
+from ..core.config import settings
+from ..core.mapped_text import MappedText
+from ..core.concurrency import bounded_map
+from ..core.exceptions import DocumentLoadError
 
 class BaseLoader(ABC):
+    #file extensions picked up when scanning a directory
+    extensions: Tuple[str, ...] = ()
+
+    def __init__(self, max_workers: int = settings["max_workers"]):
+        self.max_workers = max_workers
+
     @abstractmethod
     async def load(self, source) -> List[Document]:
         raise NotImplementedError
+
+    #pass mapped instead of content to leave the text in a memory-mapped file
+    def create_document(
+        self,
+        title: str,
+        content: str,
+        source: str,
+        doc_type,
+        mapped: Optional[MappedText] = None,
+        **metadata
+    ) -> Document:
+        return Document(
+            id=stable_id("document", source),
+            title=title,
+            content=content,
+            source=source,
+            doc_type=getattr(doc_type, "value", doc_type),
+            word_count=mapped.word_count() if mapped is not None else len(content.split()),
+            mapped=mapped,
+            metadata=metadata
+        )
+
+    def _scan_directory(self, directory: Path) -> List[Path]:
+        #sorted so directory loads come back in a deterministic order
+        return sorted(p for ext in self.extensions for p in directory.rglob(f"*.{ext}"))
+
+    async def _load_directory(self, directory: Path) -> List[Document]:
+        results = await bounded_map(self._load_file, self._scan_directory(directory), self.max_workers)
+        docs = []
+        for result in results:
+            if isinstance(result, DocumentLoadError):
+                continue  # Skip files that fail to load
+            if isinstance(result, Exception):
+                raise result
+            docs.append(result)
+        return docs
+
+    async def _load_file(self, path: Path) -> Document:
+        raise DocumentLoadError(f"{type(self).__name__} cannot load files: {path}")
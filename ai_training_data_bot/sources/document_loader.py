@@ -1,14 +1,23 @@
 import json
 import asyncio
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 from ..models import Document
 from .base_loader import BaseLoader
+from .html_extractor import extract_html
 from ..core.exceptions import DocumentLoadError
+from ..core.mapped_text import MappedText
 
 #txt, md, html, json, csv
 class DocumentLoader(BaseLoader):
-    
+    extensions = ('txt', 'md', 'json', 'csv', 'html')
+
+    #txt/md/csv files of at least mmap_min_bytes are memory-mapped instead of read into
+    #a str; their text is decoded block by block when counted, chunked or sliced
+    def __init__(self, mmap_min_bytes: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.mmap_min_bytes = mmap_min_bytes
+
     async def load(self, source) -> List[Document]:
         path = Path(source)
         if path.is_dir():
@@ -16,23 +25,19 @@ class DocumentLoader(BaseLoader):
         else:
             return [await self._load_file(path)]
 
-    async def _load_directory(self, directory: Path) -> List[Document]:
-        supported = ['*.txt', '*.md', '*.json', '*.csv', '*.html']
-        docs = []
-        for pattern in supported:
-            for p in directory.rglob(pattern):
-                try:
-                    docs.append(await self._load_file(p))
-                except DocumentLoadError as e:
-                    # Log or skip failed files
-                    continue
-        return docs
-
     async def _load_file(self, path: Path) -> Document:
         ext = path.suffix.lower().lstrip('.')
+        title = path.stem
+        mapped = None
         try:
-            if ext in ('txt', 'md', 'html', 'csv'):
+            if ext in ('txt', 'md', 'csv') and self._should_map(path):
+                mapped = await asyncio.to_thread(_map_text, path)
+                content = ""
+            elif ext in ('txt', 'md', 'csv'):
                 content = await asyncio.to_thread(path.read_text, encoding='utf-8', errors='ignore')
+            elif ext == 'html':
+                page = await asyncio.to_thread(_read_html, path)
+                title, content = page.title or title, page.text
             elif ext == 'json':
                 raw = await asyncio.to_thread(path.read_text, encoding='utf-8')
                 content = json.dumps(json.loads(raw), ensure_ascii=False)
@@ -41,10 +46,25 @@ class DocumentLoader(BaseLoader):
         except Exception as e:
             raise DocumentLoadError(f"Failed to load file: {path}") from e
 
-        return Document(
-            title=path.stem,
+        return self.create_document(
+            title=title,
             content=content,
             source=str(path),
             doc_type=ext,
-            word_count=len(content.split())
+            mapped=mapped
         )
+
+    def _should_map(self, path: Path) -> bool:
+        return self.mmap_min_bytes is not None and path.stat().st_size >= self.mmap_min_bytes
+
+
+#read and parse in the same worker thread
+def _read_html(path: Path):
+    return extract_html(path.read_text(encoding='utf-8', errors='ignore'))
+
+
+#map the file and count its words in one worker thread; the count pass also indexes blocks
+def _map_text(path: Path) -> MappedText:
+    mapped = MappedText(path)
+    mapped.word_count()
+    return mapped
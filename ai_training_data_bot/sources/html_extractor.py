@@ -0,0 +1,157 @@
+import asyncio
+import importlib.util
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import List, Optional
+
+#lxml's C parser when installed, else the stdlib tokenizer; both feed the same collector
+#so the output does not depend on the backend
+BACKEND = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+#subtrees that never hold page text, or hold only navigation/boilerplate. <head> is not
+#one: its end tag is optional, and its only text (title, scripts, styles) is handled by
+#its children
+SKIP_TAGS = frozenset({
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "nav", "header", "footer", "aside", "form", "button", "select", "menu",
+})
+#when the page marks its main content, text outside it is dropped
+MAIN_TAGS = frozenset({"main", "article"})
+#tags that end a line of text
+BLOCK_TAGS = frozenset({
+    "p", "div", "br", "hr", "li", "ul", "ol", "dl", "dt", "dd", "tr", "td", "th", "table",
+    "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "section", "main", "article",
+    "figure", "figcaption", "address", "body",
+})
+
+
+@dataclass(slots=True)
+class ExtractedHTML:
+    title: str
+    text: str
+
+
+#one pass over start/end/data events: tracks the title, boilerplate depth and main-content
+#depth, and collects text both for the whole body and for main/article only
+class _Collector:
+    def __init__(self):
+        self.skip = 0
+        self.main = 0
+        self.in_title = False
+        self.title: List[str] = []
+        self.body: List[str] = []
+        self.main_text: List[str] = []
+
+    def start(self, tag: str):
+        if tag == "body":
+            #no skipped subtree contains the body; one left unclosed before it ends here
+            self.skip = 0
+        if tag == "title":
+            self.in_title = True
+        elif tag in SKIP_TAGS:
+            self.skip += 1
+        elif tag in MAIN_TAGS:
+            self.main += 1
+        if tag in BLOCK_TAGS:
+            self._break()
+
+    def end(self, tag: str):
+        if tag == "title":
+            self.in_title = False
+        elif tag in SKIP_TAGS:
+            self.skip = max(0, self.skip - 1)
+        elif tag in MAIN_TAGS:
+            self.main = max(0, self.main - 1)
+        if tag in BLOCK_TAGS:
+            self._break()
+
+    def data(self, text: str):
+        if self.in_title:
+            self.title.append(text)
+        elif not self.skip:
+            self.body.append(text)
+            if self.main:
+                self.main_text.append(text)
+
+    def _break(self):
+        if not self.skip:
+            self.body.append("\n")
+            if self.main:
+                self.main_text.append("\n")
+
+    def result(self) -> ExtractedHTML:
+        parts = self.main_text if any(not p.isspace() for p in self.main_text) else self.body
+        lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+        return ExtractedHTML(
+            title=" ".join("".join(self.title).split()),
+            text="\n".join(line for line in lines if line)
+        )
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, collector: _Collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.collector._break()
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+#lxml parser target: the C parser calls back per event, so no tree is ever built
+class _LxmlTarget:
+    def __init__(self, collector: _Collector):
+        self.collector = collector
+
+    def start(self, tag, attrib):
+        self.collector.start(tag)
+
+    def end(self, tag):
+        self.collector.end(tag)
+
+    def data(self, data):
+        self.collector.data(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        pass
+
+
+def _parse_lxml(html: str, collector: _Collector):
+    from lxml import etree
+
+    parser = etree.HTMLParser(target=_LxmlTarget(collector))
+    parser.feed(html)
+    parser.close()
+
+
+#title + main text of a page from a single parse. Pure function of its input, so it
+#can run inline, in a thread, or in a process pool
+def extract_html(html: str, backend: Optional[str] = None) -> ExtractedHTML:
+    collector = _Collector()
+    if (backend or BACKEND) == "lxml":
+        _parse_lxml(html, collector)
+    else:
+        parser = _StdlibParser(collector)
+        parser.feed(html)
+        parser.close()
+    return collector.result()
+
+
+#parsing is CPU-bound: run it off the event loop, in the given executor or a worker thread
+async def extract_html_async(html: str, executor: Optional[Executor] = None) -> ExtractedHTML:
+    if executor is None:
+        return await asyncio.to_thread(extract_html, html)
+    return await asyncio.get_running_loop().run_in_executor(executor, extract_html, html)
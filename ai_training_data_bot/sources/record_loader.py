@@ -0,0 +1,219 @@
+import asyncio
+import csv
+import json
+import re
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, TextIO
+
+from ..models import Document
+from .base_loader import BaseLoader
+from ..core.exceptions import ConfigurationError, DocumentLoadError
+from ..core.logging import get_logger
+
+_WHITESPACE = re.compile(r"\s*")
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+#rows holding whole documents easily exceed the 128 KiB default field limit. The csv module
+#only has an interpreter-wide limit, so it is raised once, here on import, and never lowered
+_CSV_FIELD_LIMIT = min(sys.maxsize, 2 ** 31 - 1)
+if csv.field_size_limit() < _CSV_FIELD_LIMIT:
+    csv.field_size_limit(_CSV_FIELD_LIMIT)
+
+#incremental reader for a top-level JSON array: elements are decoded one at a time from
+#a buffer refilled block by block, so memory is bounded by the largest element
+class _JsonArrayReader:
+    def __init__(self, f: TextIO, block_chars: int = 1 << 20):
+        self.f = f
+        self.block_chars = block_chars
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    #first non-whitespace character, reading more text as needed; "" at end of file
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def rest(self) -> str:
+        return self.buf[self.pos:] + self.f.read()
+
+    def __iter__(self) -> Iterator[Any]:
+        self.pos += 1
+        if self.peek() == "]":
+            return
+        while True:
+            self.peek()
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                #a number cut by the block boundary ("0." of "0.25") decodes as a shorter one
+                complete = self.eof or (end < len(self.buf) and self.buf[end] not in _NUMBER_CHARS)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                complete = False
+            if not complete:
+                self._fill()
+                continue
+
+            self.pos = end
+            yield value
+            delimiter = self.peek()
+            if delimiter == "]":
+                return
+            if delimiter != ",":
+                raise json.JSONDecodeError("Expected ',' or ']'", self.buf, self.pos)
+            self.pos += 1
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        block = self.f.read(self.block_chars)
+        if not block:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + block
+        self.pos = 0
+        return True
+
+
+#one Document per CSV row, JSONL line or JSON array element, parsed in a worker thread a
+#batch at a time so multi-GB files stream in constant memory. The document text is the
+#text_field value, or "field: value" lines for every field when text_field is unset;
+#metadata_fields are copied into the document metadata
+class RecordLoader(BaseLoader):
+    extensions = ("csv", "jsonl", "json")
+
+    #formats narrows which of csv/jsonl/json are read as records
+    def __init__(
+        self,
+        text_field: Optional[str] = None,
+        title_field: Optional[str] = None,
+        metadata_fields: Sequence[str] = (),
+        batch_size: int = 1000,
+        formats: Optional[Sequence[str]] = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        if formats is not None:
+            unknown = set(formats) - set(RecordLoader.extensions)
+            if unknown:
+                raise ConfigurationError(f"Unsupported record formats: {sorted(unknown)}")
+            self.extensions = tuple(formats)
+        self.text_field = text_field
+        self.title_field = title_field
+        self.metadata_fields = tuple(metadata_fields)
+        self.batch_size = batch_size
+        self.skipped = 0
+        self.logger = get_logger("record_loader")
+
+    async def load(self, source) -> List[Document]:
+        path = Path(source)
+        if path.is_dir():
+            return await self._load_directory(path)
+        return [doc async for doc in self.iter_documents(path)]
+
+    async def _load_file(self, path: Path) -> Document:
+        raise DocumentLoadError(f"RecordLoader yields one document per record, use iter_documents: {path}")
+
+    async def _load_directory(self, directory: Path) -> List[Document]:
+        docs = []
+        for path in self._scan_directory(directory):
+            try:
+                docs.extend([doc async for doc in self.iter_documents(path)])
+            except DocumentLoadError:
+                continue  # Skip files that fail to load
+        return docs
+
+    async def iter_documents(self, source) -> AsyncIterator[Document]:
+        path = Path(source)
+        documents = self._documents(path)
+        try:
+            while True:
+                try:
+                    batch = await asyncio.to_thread(lambda: list(islice(documents, self.batch_size)))
+                except Exception as e:
+                    raise DocumentLoadError(f"Failed to load records: {path}") from e
+                if not batch:
+                    return
+                for doc in batch:
+                    yield doc
+        finally:
+            documents.close()
+
+    def _documents(self, path: Path) -> Iterator[Document]:
+        ext = path.suffix.lower().lstrip(".")
+        with path.open("r", encoding="utf-8", errors="ignore", newline="" if ext == "csv" else None) as f:
+            if ext == "csv":
+                records = self._csv_records(f)
+            elif ext == "jsonl":
+                records = self._jsonl_records(f, path)
+            elif ext == "json":
+                reader = _JsonArrayReader(f)
+                if reader.peek() != "[":
+                    #not an array: the whole file is one document, as DocumentLoader loads it
+                    content = json.dumps(json.loads(reader.rest()), ensure_ascii=False)
+                    yield self.create_document(title=path.stem, content=content, source=str(path), doc_type=ext)
+                    return
+                records = iter(reader)
+            else:
+                raise DocumentLoadError(f"Unsupported record file type: {ext}")
+
+            for index, record in enumerate(records):
+                doc = self._record_document(path, ext, index, record)
+                if doc is None:
+                    self.skipped += 1
+                    continue
+                yield doc
+
+    def _csv_records(self, f: TextIO) -> Iterator[Dict[str, Any]]:
+        return csv.DictReader(f)
+
+    def _jsonl_records(self, f: TextIO, path: Path) -> Iterator[Any]:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                self.skipped += 1
+                self.logger.warning(f"Skipping malformed JSON on line {line_number} of {path}")
+
+    def _record_document(self, path: Path, ext: str, index: int, record: Any) -> Optional[Document]:
+        if not isinstance(record, dict):
+            record = {"value": record}
+
+        if self.text_field is not None:
+            text = _as_text(record.get(self.text_field))
+        else:
+            text = "\n".join(
+                f"{key}: {_as_text(value)}" for key, value in record.items()
+                if key not in self.metadata_fields and value not in (None, "")
+            )
+        if not text.strip():
+            return None
+
+        title = _as_text(record.get(self.title_field)) if self.title_field else ""
+        doc = self.create_document(
+            title=title or f"{path.stem} #{index}",
+            content=text,
+            source=f"{path}#{index}",
+            doc_type=ext,
+            record_index=index
+        )
+        #set after creation so field names cannot clash with create_document's arguments
+        doc.metadata.update((field, record[field]) for field in self.metadata_fields if field in record)
+        return doc
+
+
+def _as_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
@@ -0,0 +1,119 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from ..models import Document
+from ..core.config import settings
+from ..core.logging import get_logger
+from ..core.metrics import Metrics
+
+if TYPE_CHECKING:
+    from .unified_loader import UnifiedLoader
+
+@dataclass
+class SourceReport:
+    source: str
+    files: int = 0
+    loaded: int = 0
+    failed: int = 0
+    errors: List[str] = field(default_factory=list)
+    #files or urls that failed, including record files that failed partway
+    failed_targets: List[str] = field(default_factory=list)
+
+#fans ingestion out across sources and the files inside them under one concurrency limit
+class IngestionScheduler:
+    def __init__(
+        self,
+        loader: "UnifiedLoader",
+        max_workers: int = settings["max_workers"],
+        metrics: Optional[Metrics] = None
+    ):
+        self.loader = loader
+        self.max_workers = max_workers
+        self.metrics = metrics or Metrics()
+        self.reports: Dict[str, SourceReport] = {}
+        self.logger = get_logger("ingestion_scheduler")
+
+    async def run(self, sources: List[Union[str, Path]]) -> List[Document]:
+        return [doc async for doc in self.stream(sources)]
+
+    #yields documents in a deterministic order (sources as given, files sorted within each source)
+    #while keeping at most max_workers loads in flight
+    async def stream(self, sources: List[Union[str, Path]]) -> AsyncIterator[Document]:
+        items = self.stream_targets(sources)
+        try:
+            async for _, doc in items:
+                yield doc
+        finally:
+            #a consumer that stops early must still cancel the loads in flight
+            await items.aclose()
+
+    #same order as stream, with the file or url each document was loaded from
+    async def stream_targets(self, sources: List[Union[str, Path]]) -> AsyncIterator[Tuple[Union[str, Path], Document]]:
+        pending = deque()
+        try:
+            for source in sources:
+                report = self.reports.setdefault(str(source), SourceReport(source=str(source)))
+                try:
+                    targets = await asyncio.to_thread(self.loader.expand, source)
+                except Exception as e:
+                    report.failed += 1
+                    report.errors.append(f"{source}: {e}")
+                    continue
+                report.files += len(targets)
+
+                for target in targets:
+                    if self.loader.streams(target):
+                        #record files yield documents as they are parsed; loads already in
+                        #flight are drained first so the order stays deterministic
+                        while pending:
+                            async for item in self._collect(*pending.popleft()):
+                                yield item
+                        async for doc in self._stream_target(report, target):
+                            yield target, doc
+                        continue
+                    pending.append((report, target, asyncio.ensure_future(self._load_target(target))))
+                    if len(pending) >= self.max_workers:
+                        async for item in self._collect(*pending.popleft()):
+                            yield item
+
+            while pending:
+                async for item in self._collect(*pending.popleft()):
+                    yield item
+        finally:
+            for _, _, task in pending:
+                task.cancel()
+
+        for report in self.reports.values():
+            if report.failed:
+                self.logger.warning(f"{report.failed} of {report.files} targets failed for source {report.source}")
+
+    async def _load_target(self, target) -> List[Document]:
+        with self.metrics.stage("load") as stage:
+            docs = await self.loader.load_target(target)
+            stage.add(items=len(docs), bytes_out=sum(doc.size() for doc in docs))
+        return docs
+
+    async def _stream_target(self, report: SourceReport, target) -> AsyncIterator[Document]:
+        try:
+            async for doc in self.metrics.timed("load", self.loader.stream_target(target), size=Document.size):
+                report.loaded += 1
+                yield doc
+        except Exception as e:
+            report.failed += 1
+            report.errors.append(f"{target}: {e}")
+            report.failed_targets.append(str(target))
+
+    async def _collect(self, report: SourceReport, target, task: asyncio.Future):
+        try:
+            docs = await task
+        except Exception as e:
+            report.failed += 1
+            report.errors.append(f"{target}: {e}")
+            report.failed_targets.append(str(target))
+            return
+        report.loaded += len(docs)
+        for doc in docs:
+            yield target, doc
@@ -1,24 +1,96 @@
 from pathlib import Path
-from typing import List, Union
+from typing import AsyncIterator, List, Optional, Union
 from .document_loader import DocumentLoader
 from .pdf_loader import PDFLoader
 from .web_loader import WebLoader
+from .record_loader import RecordLoader
+from .scheduler import IngestionScheduler
 from ..models import Document, DocumentType
+from ..core.config import settings
+from ..core.exceptions import DocumentLoadError
+from ..core.metrics import Metrics
+from ..storage.ingestion_cache import IngestionCache
 
 class UnifiedLoader:
-    def __init__(self):
-        self.document_loader = DocumentLoader()
-        self.pdf_loader = PDFLoader()
-        self.web_loader = WebLoader()
+    def __init__(
+        self,
+        max_workers: int = settings["max_workers"],
+        pdf_loader: Optional[PDFLoader] = None,
+        web_loader: Optional[WebLoader] = None,
+        cache: Optional[IngestionCache] = None,
+        document_loader: Optional[DocumentLoader] = None,
+        record_loader: Optional[RecordLoader] = None,
+        metrics: Optional[Metrics] = None
+    ):
+        self.max_workers = max_workers
+        #file-level cache; urls are cached by the web loader itself
+        self.cache = cache
+        self.document_loader = document_loader or DocumentLoader(max_workers=max_workers)
+        self.pdf_loader = pdf_loader or PDFLoader(max_workers=max_workers)
+        self.web_loader = web_loader or WebLoader(max_workers=max_workers)
+        #csv/jsonl/json arrays become one document per record
+        self.record_loader = record_loader or RecordLoader(max_workers=max_workers)
         self.supported_formats = list(DocumentType)
+        #extract covers the loader work itself, so load minus extract is cache and scheduling
+        self.metrics = metrics or Metrics()
 
     async def load(self, source: Union[str, Path]) -> List[Document]:
-        loader = self._detect_loader(source)
-        if loader is None:
+        if self._detect_loader(source) is None and not Path(source).is_dir():
             raise ValueError(f"Unsupported or invalid source: {source}")
 
-        document = await loader.load_single(source)
-        return [document]
+        scheduler = IngestionScheduler(self, max_workers=self.max_workers, metrics=self.metrics)
+        return await scheduler.run([source])
+
+    #expand a source into the individual files/urls the scheduler fans out over
+    def expand(self, source: Union[str, Path]) -> List[Union[str, Path]]:
+        if isinstance(source, str) and source.startswith(('http://', 'https://')):
+            return [source]
+
+        path = Path(source)
+        if not path.is_dir():
+            return [path]
+
+        extensions = {
+            f".{ext}" for loader in (self.document_loader, self.pdf_loader, self.record_loader)
+            for ext in loader.extensions
+        }
+        return sorted(p for p in path.rglob("*") if p.suffix.lower() in extensions and p.is_file())
+
+    #load a single file or url produced by expand
+    async def load_target(self, target: Union[str, Path]) -> List[Document]:
+        loader = self._detect_loader(target)
+        if loader is None:
+            raise DocumentLoadError(f"Unsupported or invalid source: {target}")
+        if self.cache is None or loader in (self.web_loader, self.record_loader):
+            return await self._extract(loader, target)
+
+        path = Path(target)
+        docs = await self.cache.get_file(path)
+        if docs is None:
+            docs = await self._extract(loader, path)
+            #a mapped file is cheaper to map again than to copy into the cache
+            if not any(doc.mapped is not None for doc in docs):
+                await self.cache.put_file(path, docs)
+        return docs
+
+    #record files are streamed document by document instead of loaded whole
+    def streams(self, target: Union[str, Path]) -> bool:
+        return self._detect_loader(target) is self.record_loader
+
+    def stream_target(self, target: Union[str, Path]) -> AsyncIterator[Document]:
+        return self.metrics.timed("extract", self.record_loader.iter_documents(target), size=Document.size)
+
+    async def _extract(self, loader, target: Union[str, Path]) -> List[Document]:
+        with self.metrics.stage("extract") as stage:
+            docs = await loader.load(target)
+            stage.add(items=len(docs), bytes_out=sum(doc.size() for doc in docs))
+        return docs
+
+    async def close(self):
+        await self.pdf_loader.close()
+        await self.web_loader.close()
+        if self.cache is not None:
+            await self.cache.close()
 
     def _detect_loader(self, source: Union[str, Path]):
         
@@ -31,6 +103,8 @@ class UnifiedLoader:
             return None
 
         suffix = path.suffix.lower().lstrip('.')
+        if suffix in self.record_loader.extensions:
+            return self.record_loader
         try:
             doc_type = DocumentType(suffix)
         except ValueError:
@@ -44,3 +118,4 @@ class UnifiedLoader:
         ]:
             return self.document_loader
         else:
+            return None
@@ -1,24 +1,59 @@
+import asyncio
 from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
 from ..models import Document, DocumentType
 from .base_loader import BaseLoader
+from .html_extractor import extract_html_async
 from ..core.exceptions import DocumentLoadError
+from ..core.http_pool import HttpClientPool
+from ..storage.ingestion_cache import IngestionCache
+from ..core.logging import get_logger
 from uuid import uuid4
 from datetime import datetime
-import httpx
 
 class WebLoader(BaseLoader):
-    def __init__(self):
-        super().__init__()
+    #http is normally the bot's shared pool; a private one is created when none is given
+    def __init__(self, http: Optional[HttpClientPool] = None, cache: Optional[IngestionCache] = None, **kwargs):
+        super().__init__(**kwargs)
         self.supported_formats = [DocumentType.URL]
+        self._owns_http = http is None
+        self.http = http or HttpClientPool()
+        self.cache = cache
+        self.logger = get_logger("web_loader")
+
+    async def load(self, source) -> List[Document]:
+        return [await self.load_single(source)]
+
+    #fetch many urls concurrently through the pool; failed urls are logged and skipped
+    async def load_many(self, urls: List[str]) -> List[Document]:
+        results = await asyncio.gather(*(self.load_single(url) for url in urls), return_exceptions=True)
+        docs = []
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                self.logger.warning(f"Failed to load {url}: {result}")
+                continue
+            docs.append(result)
+        return docs
 
     async def load_single(self, source: str) -> Document:
         if not source.startswith(('http://', 'https://')):
             raise DocumentLoadError(f"Invalid URL: {source}")
 
-        content = await self._fetch_url_content(source)
-        title = self._extract_title(source, content)
+        cached = await self.cache.get_url(source) if self.cache else None
+        try:
+            response = await self.http.get(source, headers=cached.conditional_headers() if cached else None)
+            #not modified since the cached copy was extracted
+            if cached and response.status_code == 304:
+                self.cache.record_url(hit=True)
+                return cached.documents[0]
+            response.raise_for_status()
+        except Exception as e:
+            raise DocumentLoadError(f"Failed to fetch URL: {source}") from e
+
+        title, content = await self._extract(source, response)
 
-        return self.create_document(
+        document = self.create_document(
             title=title,
             content=content,
             source=source,
@@ -26,40 +61,25 @@ class WebLoader(BaseLoader):
             extraction_method="WebLoader.httpx"
         )
 
-    async def _fetch_url_content(self, url: str) -> str:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-
-            content_type = response.headers.get('content-type', '').lower()
-            if 'text/html' in content_type:
-                return self._extract_html_text(response.text)
-            else:
-                return response.text
+        if self.cache:
+            self.cache.record_url(hit=False)
+            etag, last_modified = response.headers.get('etag'), response.headers.get('last-modified')
+            if etag or last_modified:
+                await self.cache.put_url(source, [document], etag, last_modified)
+        return document
 
-    def _extract_html_text(self, html: str) -> str:
-        try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, 'html.parser')
-            for script in soup(["script", "style"]):
-                script.decompose()
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split(" "))
-            return ' '.join(chunk for chunk in chunks if chunk)
-        except ImportError:
-            return html
+    #html is parsed once, off the event loop, for both the title and the text
+    async def _extract(self, url: str, response) -> Tuple[str, str]:
+        content_type = response.headers.get('content-type', '').lower()
+        if 'text/html' not in content_type:
+            return self._url_title(url), response.text
+        page = await extract_html_async(response.text)
+        return page.title or self._url_title(url), page.text
 
-    def _extract_title(self, url: str, content: str) -> str:
-        try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(content, 'html.parser')
-            title_tag = soup.find('title')
-            if title_tag and title_tag.text.strip():
-                return title_tag.text.strip()
-        except ImportError:
-            pass
+    async def close(self):
+        if self._owns_http:
+            await self.http.close()
 
-        from urllib.parse import urlparse
+    def _url_title(self, url: str) -> str:
         parsed = urlparse(url)
         return parsed.netloc + parsed.path or url
@@ -0,0 +1,71 @@
+import asyncio
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+#stop marker for the writer thread
+_STOP = object()
+
+#runs blocking write calls in submission order on one dedicated thread. At most
+#queue_size calls are pending; past that submit() waits on the event loop instead
+#of blocking it, so a fast producer cannot buffer an export into memory
+class BackgroundWriter:
+    def __init__(self, queue_size: int = 8, name: str = "export-writer"):
+        self.queue_size = queue_size
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending: Optional[asyncio.Semaphore] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._error: Optional[BaseException] = None
+        self._reported = False
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._pending = asyncio.Semaphore(self.queue_size)
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    async def submit(self, fn: Callable[..., Any], *args: Any):
+        if self._thread is None:
+            self.start()
+        self._raise_error()
+        await self._pending.acquire()
+        self._queue.put((fn, args))
+
+    #waits for every submitted call, then re-raises the first failure
+    async def close(self):
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+        self._raise_error()
+
+    async def __aenter__(self) -> "BackgroundWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            fn, args = item
+            try:
+                #after a failure the remaining calls are skipped, not run on a broken file
+                if self._error is None:
+                    fn(*args)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._loop.call_soon_threadsafe(self._pending.release)
+
+    #a failure is raised once, to whichever of submit/close sees it first
+    def _raise_error(self):
+        if self._error is not None and not self._reported:
+            self._reported = True
+            raise self._error
@@ -0,0 +1,84 @@
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Union
+
+from .sharding import shard_name
+from ..core.exceptions import ConfigurationError
+
+#progress of an unfinished run_shard call, written next to its partial output. Everything
+#before the cursor (the `document`-th document of this shard's `position`-th target, after
+#its first `chunk` chunks) has been written to the first `bytes` bytes of `output`, and
+#nothing after it; resume truncates the output there and continues from the cursor
+@dataclass
+class RunCheckpoint:
+    shard: int
+    num_shards: int
+    plan: str
+    output: str
+    sources: List[str] = field(default_factory=list)
+    task_types: List[str] = field(default_factory=list)
+    position: int = 0
+    document: int = 0
+    chunk: int = 0
+    bytes: int = 0
+    examples: int = 0
+    #ShardManifest.targets so far
+    targets: List[List[int]] = field(default_factory=list)
+    #near-duplicate index snapshot taken at the cursor, when dedup is on
+    dedup_index: Optional[str] = None
+    sequence: int = 0
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @staticmethod
+    def path(directory: Union[str, Path], shard: int, num_shards: int) -> Path:
+        return Path(directory) / f"{shard_name(shard, num_shards)}.checkpoint.json"
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional["RunCheckpoint"]:
+        path = Path(path)
+        if not path.exists():
+            return None
+        return cls(**json.loads(path.read_text(encoding="utf-8")))
+
+    #makes `output` durable up to the cursor, then replaces the previous checkpoint in one
+    #rename, so a crash at any point leaves either the old or the new checkpoint. Runs on
+    #the output's writer thread, after every write submitted before it
+    def save(self, directory: Union[str, Path], output: Optional[IO[bytes]] = None) -> Path:
+        if output is not None:
+            output.flush()
+            os.fsync(output.fileno())
+        path = self.path(directory, self.shard, self.num_shards)
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        #index snapshots of earlier checkpoints are no longer referenced
+        for stale in self.snapshots(directory, self.shard, self.num_shards):
+            if stale.name != self.dedup_index:
+                stale.unlink(missing_ok=True)
+        return path
+
+    #the partial output opened for appending, cut back to what this checkpoint covers
+    def reopen(self, directory: Union[str, Path]) -> IO[bytes]:
+        path = Path(directory) / self.output
+        if not path.exists() or path.stat().st_size < self.bytes:
+            raise ConfigurationError(f"{path} is missing or shorter than its checkpoint ({self.bytes} bytes)")
+        f = path.open("r+b")
+        f.truncate(self.bytes)
+        f.seek(self.bytes)
+        return f
+
+    @staticmethod
+    def snapshots(directory: Union[str, Path], shard: int, num_shards: int) -> List[Path]:
+        return sorted(Path(directory).glob(f"{shard_name(shard, num_shards)}.checkpoint-*.dedup.npz"))
+
+    #drops the checkpoint and its snapshots, once the run finished or is started over
+    @classmethod
+    def remove(cls, directory: Union[str, Path], shard: int, num_shards: int):
+        for path in cls.snapshots(directory, shard, num_shards):
+            path.unlink(missing_ok=True)
+        cls.path(directory, shard, num_shards).unlink(missing_ok=True)
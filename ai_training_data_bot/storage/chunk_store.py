@@ -0,0 +1,221 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+from ..models import Document, QualityMetric, TaskType, TextChunk, TrainingExample
+
+#column order of the quality score block kept per example; same order as the
+#evaluator's score matrix so materialized score dicts keep their key order
+SCORE_COLUMNS = tuple(m.value for m in (
+    QualityMetric.RELEVANCE,
+    QualityMetric.COHERENCE,
+    QualityMetric.TOXICITY,
+    QualityMetric.BIAS,
+    QualityMetric.DIVERSITY,
+))
+_TASK_TYPES = tuple(TaskType)
+_TASK_CODES = {t: i for i, t in enumerate(_TASK_TYPES)}
+_NAN = float("nan")
+
+
+def _uuid_at(ids: bytearray, row: int) -> UUID:
+    return UUID(bytes=bytes(ids[row * 16:row * 16 + 16]))
+
+
+#columnar chunk storage: ids as packed 16-byte values and offsets into the parent
+#document's text in typed arrays. Content is sliced from the document on access (for
+#memory-mapped documents, decoded from the file), so a chunk costs a few dozen bytes
+#instead of a TextChunk plus a copied string
+class ChunkStore(Sequence):
+    def __init__(self):
+        self.documents: List[Document] = []
+        self._doc_rows: Dict[UUID, int] = {}
+        self._ids = bytearray()
+        self._document = array("I")
+        self._start = array("Q")
+        self._end = array("Q")
+        self._index = array("I")
+        self._tokens = array("I")
+        #row -> metadata, only for the few chunks that carry any
+        self._metadata: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._start)
+
+    def add_document(self, document: Document) -> int:
+        row = self._doc_rows.get(document.id)
+        if row is None:
+            row = self._doc_rows[document.id] = len(self.documents)
+            self.documents.append(document)
+        return row
+
+    #store a chunk of an already added document; returns its row
+    def append(self, chunk: TextChunk) -> int:
+        doc_row = self._doc_rows.get(chunk.document_id)
+        if doc_row is None:
+            raise KeyError(f"Document {chunk.document_id} is not in the store")
+        document = self.documents[doc_row]
+        if chunk.end_index - chunk.start_index != len(chunk.content) or (
+            #mapped documents are only length-checked; comparing would decode the file again
+            document.mapped is None and not document.content.startswith(chunk.content, chunk.start_index)
+        ):
+            raise ValueError(f"Chunk {chunk.id} content does not match its document offsets")
+
+        row = len(self)
+        self._ids += chunk.id.bytes
+        self._document.append(doc_row)
+        self._start.append(chunk.start_index)
+        self._end.append(chunk.end_index)
+        self._index.append(chunk.chunk_index)
+        self._tokens.append(chunk.token_count)
+        if chunk.has_metadata:
+            self._metadata[row] = chunk.metadata
+        return row
+
+    def extend(self, chunks: Iterable[TextChunk]) -> List[int]:
+        return [self.append(chunk) for chunk in chunks]
+
+    def chunk_id(self, row: int) -> UUID:
+        return _uuid_at(self._ids, row)
+
+    def document(self, row: int) -> Document:
+        return self.documents[self._document[row]]
+
+    def content(self, row: int) -> str:
+        return self.document(row).text(self._start[row], self._end[row])
+
+    #materialize a TextChunk; created_at is the parent document's since it is not stored per chunk
+    def __getitem__(self, row: int) -> TextChunk:
+        if row < 0:
+            row += len(self)
+        document = self.document(row)
+        return TextChunk(
+            id=self.chunk_id(row),
+            created_at=document.created_at,
+            metadata=self._metadata.get(row),
+            document_id=document.id,
+            content=document.text(self._start[row], self._end[row]),
+            start_index=self._start[row],
+            end_index=self._end[row],
+            chunk_index=self._index[row],
+            token_count=self._tokens[row]
+        )
+
+    def __iter__(self) -> Iterator[TextChunk]:
+        return (self[row] for row in range(len(self)))
+
+    #bytes held by the columns themselves (document texts are shared, not counted)
+    def nbytes(self) -> int:
+        columns = (self._document, self._start, self._end, self._index, self._tokens)
+        return len(self._ids) + sum(c.itemsize * len(c) for c in columns)
+
+
+#columnar example storage over a ChunkStore. Inputs that are the text of their source
+#chunk are not stored again; scores live in one float32 block per row (NaN = unset).
+#Reads materialize TrainingExample objects, so it can stand in for Dataset.examples
+class ExampleStore(Sequence):
+    def __init__(self, chunks: Optional[ChunkStore] = None):
+        self.chunks = chunks if chunks is not None else ChunkStore()
+        self._ids = bytearray()
+        self._chunk = array("q")
+        self._task = array("B")
+        self._scores = array("f")
+        self._outputs: List[str] = []
+        #sparse columns for the uncommon cases
+        self._inputs: Dict[int, str] = {}
+        self._sources: Dict[int, Tuple[Optional[UUID], Optional[UUID]]] = {}
+        self._extra_scores: Dict[int, Dict[str, float]] = {}
+        self._metadata: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._task)
+
+    #store an example; pass the row of its source chunk so its input can be shared
+    def append(self, example: TrainingExample, chunk_row: int = -1) -> int:
+        row = len(self)
+        self._ids += example.id.bytes
+        self._task.append(_TASK_CODES[TaskType(example.task_type)])
+        self._outputs.append(example.output_text)
+
+        shared = (
+            chunk_row >= 0
+            and example.source_chunk_id == self.chunks.chunk_id(chunk_row)
+            and example.source_document_id == self.chunks.document(chunk_row).id
+            and example.input_text == self.chunks.content(chunk_row)
+        )
+        self._chunk.append(chunk_row if shared else -1)
+        if not shared:
+            self._inputs[row] = example.input_text
+            self._sources[row] = (example.source_document_id, example.source_chunk_id)
+
+        self._scores.extend([_NAN] * len(SCORE_COLUMNS))
+        self.set_scores(row, example.quality_scores)
+        if example.has_metadata:
+            self._metadata[row] = example.metadata
+        return row
+
+    def set_scores(self, row: int, scores: Dict[str, float]):
+        base = row * len(SCORE_COLUMNS)
+        for name, value in scores.items():
+            name = getattr(name, "value", name)
+            if name in SCORE_COLUMNS:
+                self._scores[base + SCORE_COLUMNS.index(name)] = value
+            else:
+                self._extra_scores.setdefault(row, {})[name] = value
+
+    #bulk write of an (examples x names) score matrix, as produced by the evaluator
+    def set_score_matrix(self, names: Sequence[str], scores: Iterable[Sequence[float]]):
+        columns = [SCORE_COLUMNS.index(getattr(n, "value", n)) for n in names]
+        for row, values in enumerate(scores):
+            base = row * len(SCORE_COLUMNS)
+            for column, value in zip(columns, values):
+                if value == value:
+                    self._scores[base + column] = value
+
+    def input_text(self, row: int) -> str:
+        chunk_row = self._chunk[row]
+        return self.chunks.content(chunk_row) if chunk_row >= 0 else self._inputs[row]
+
+    def output_text(self, row: int) -> str:
+        return self._outputs[row]
+
+    def _get(self, row: int) -> TrainingExample:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("example row out of range")
+
+        chunk_row = self._chunk[row]
+        if chunk_row >= 0:
+            source_document_id, source_chunk_id = self.chunks.document(chunk_row).id, self.chunks.chunk_id(chunk_row)
+        else:
+            source_document_id, source_chunk_id = self._sources[row]
+
+        base = row * len(SCORE_COLUMNS)
+        scores = {
+            name: value for name, value in zip(SCORE_COLUMNS, self._scores[base:base + len(SCORE_COLUMNS)])
+            if value == value
+        }
+        scores.update(self._extra_scores.get(row, ()))
+        return TrainingExample(
+            id=_uuid_at(self._ids, row),
+            metadata=self._metadata.get(row),
+            input_text=self.input_text(row),
+            output_text=self._outputs[row],
+            task_type=_TASK_TYPES[self._task[row]],
+            source_document_id=source_document_id,
+            source_chunk_id=source_chunk_id,
+            quality_scores=scores
+        )
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[TrainingExample, List[TrainingExample]]:
+        if isinstance(key, slice):
+            return [self._get(row) for row in range(*key.indices(len(self)))]
+        return self._get(key)
+
+    def __iter__(self) -> Iterator[TrainingExample]:
+        return (self._get(row) for row in range(len(self)))
+
+    def nbytes(self) -> int:
+        columns = (self._chunk, self._task, self._scores)
+        return len(self._ids) + sum(c.itemsize * len(c) for c in columns) + 8 * len(self._outputs)
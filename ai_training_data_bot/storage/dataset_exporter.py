@@ -1,35 +1,208 @@
+import asyncio
+import hashlib
 import json
+import os
 from pathlib import Path
-from typing import Union
-from ..models import Dataset, ExportFormat
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from ..models import Dataset, ExportFormat, TrainingExample
+from ..core.exceptions import ConfigurationError
 from ..core.logging import get_logger
+from ..core.metrics import Metrics
+from .background_writer import BackgroundWriter
+from .dataset_index import IndexBuilder
+from .shard_writer import ShardedWriter, encode_lines, open_writer, to_record
+
+SPLITS = ("train", "val", "test")
 
 class DatasetExporter:
-    def __init__(self):
+    #examples are encoded and written batch_size at a time; shard_size/shard_bytes split each
+    #output into numbered shards listed in an index file next to output_path. Encoding,
+    #compression and file I/O run on a writer thread with at most queue_size batches pending.
+    #With index, every uncompressed JSONL file gets a <file>.idx sidecar for DatasetReader
+    def __init__(
+        self,
+        batch_size: int = 10_000,
+        shard_size: Optional[int] = None,
+        shard_bytes: Optional[int] = None,
+        split_ratios: Tuple[float, float, float] = (0.8, 0.1, 0.1),
+        split_seed: str = "",
+        compression: Optional[str] = "zstd",
+        file_compression: Optional[str] = None,
+        queue_size: int = 8,
+        index: bool = True,
+        metrics: Optional[Metrics] = None
+    ):
+        if len(split_ratios) != len(SPLITS) or abs(sum(split_ratios) - 1) > 1e-6:
+            raise ConfigurationError("split_ratios must be three fractions summing to 1")
+        self.batch_size = batch_size
+        self.shard_size = shard_size
+        self.shard_bytes = shard_bytes
+        self.split_ratios = tuple(split_ratios)
+        #cumulative upper bound of each split on [0, 1)
+        self._split_bounds = [sum(self.split_ratios[:i + 1]) for i in range(len(SPLITS))]
+        self.split_seed = split_seed
+        self.compression = compression
+        self.file_compression = file_compression
+        self.queue_size = queue_size
+        self.index = index
+        #export time is the writer thread's encoding and I/O
+        self.metrics = metrics or Metrics()
         self.logger = get_logger("dataset_exporter")
 
-    async def export(self, dataset: Dataset, output_path: Union[str, Path], format: ExportFormat = ExportFormat.JSONL, split_data: bool = True):
+    #returns output_path, or the index file when the export spans several files
+    async def export(self, dataset: Dataset, output_path: Union[str, Path], format: ExportFormat = ExportFormat.JSONL, split_data: bool = True) -> Path:
         out = Path(output_path)
         out.parent.mkdir(parents=True, exist_ok=True)
 
         self.logger.info(f"Exporting dataset '{dataset.name}' with {dataset.total_examples} examples to {out} as {format.name}")
 
-        if format == ExportFormat.JSONL:
-            await self._export_jsonl(dataset, out)
-        else:
-            raise ValueError(f"Unsupported export format: {format}")
-
-    async def _export_jsonl(self, dataset: Dataset, out: Path):
-        with out.open('w', encoding='utf-8') as f:
-            for ex in dataset.examples:
-                obj = {
-                    'id': str(ex.id),
-                    'input_text': ex.input_text,
-                    'output_text': ex.output_text,
-                    'task_type': ex.task_type,
-                    'source_document_id': str(ex.source_document_id) if ex.source_document_id else None,
-                    'quality_scores': ex.quality_scores,
-                }
-                f.write(json.dumps(obj, ensure_ascii=False) + '\n')
-
-        self.logger.info(f"Dataset successfully exported to {out}")
+        splits = SPLITS if split_data else (None,)
+        writers = {
+            split: ShardedWriter(
+                out.with_name(f"{out.stem}_{split}{out.suffix}") if split else out,
+                format,
+                shard_size=self.shard_size,
+                shard_bytes=self.shard_bytes,
+                compression=self.compression,
+                file_compression=self.file_compression,
+                index=self.index
+            )
+            for split in splits
+        }
+        #on failure the writers are aborted here rather than through submit, which re-raises
+        #the writer thread's error before anything more is queued
+        try:
+            async with BackgroundWriter(self.queue_size) as background:
+                for start in range(0, len(dataset.examples), self.batch_size):
+                    await background.submit(self._write_batch, writers, dataset.examples, start, split_data)
+                for writer in writers.values():
+                    await background.submit(writer.close)
+        except BaseException:
+            for writer in writers.values():
+                writer.abort()
+            raise
+        shards = {split: writer.shards for split, writer in writers.items()}
+        self.metrics.count("export", bytes_out=sum(s["bytes"] for files in shards.values() for s in files))
+
+        if not split_data and not writers[None].sharded:
+            path = out.with_name(shards[None][0]["path"])
+            self.logger.info(f"Dataset successfully exported to {path}")
+            return path
+
+        index = out.with_name(f"{out.stem}.index.json")
+        await asyncio.to_thread(self._write_index, index, dataset, format, shards, split_data)
+        files = sum(len(s) for s in shards.values())
+        self.logger.info(f"Dataset successfully exported to {files} files, index at {index}")
+        return index
+
+    #deterministic: an example's split depends only on its id and split_seed
+    def split_of(self, ex: TrainingExample) -> str:
+        digest = hashlib.blake2b(ex.id.bytes, digest_size=8, key=self.split_seed.encode("utf-8")).digest()
+        point = int.from_bytes(digest, "little") / 2 ** 64
+        for split, bound in zip(SPLITS, self._split_bounds):
+            if point < bound:
+                return split
+        return SPLITS[-1]
+
+    #runs on the writer thread, so slicing (which may materialize stored examples) stays off the loop
+    def _write_batch(self, writers: Dict[Optional[str], ShardedWriter], examples, start: int, split_data: bool):
+        with self.metrics.stage("export") as stage:
+            batch = examples[start:start + self.batch_size]
+            stage.add(items=len(batch))
+            if split_data:
+                for split, part in self._split(batch).items():
+                    writers[split].write(part)
+            else:
+                writers[None].write(batch)
+
+    #writer thread side of export_stream; bytes_out counts uncompressed bytes
+    def _write_stream(self, writer, batch: List[TrainingExample]):
+        with self.metrics.stage("export", items=len(batch)) as stage:
+            before = writer.tell()
+            writer.write(batch)
+            stage.add(bytes_out=writer.tell() - before)
+
+    def _split(self, examples: Sequence[TrainingExample]) -> Dict[str, List[TrainingExample]]:
+        parts: Dict[str, List[TrainingExample]] = {split: [] for split in SPLITS}
+        for ex in examples:
+            parts[self.split_of(ex)].append(ex)
+        return parts
+
+    def _write_index(self, index: Path, dataset: Dataset, format: ExportFormat, shards, split_data: bool):
+        data = {
+            "dataset": dataset.name,
+            "format": format.value,
+            "total_examples": sum(s["examples"] for files in shards.values() for s in files),
+            "split_ratios": dict(zip(SPLITS, self.split_ratios)) if split_data else None,
+            "shards": [
+                dict(shard, split=split) for split, files in shards.items() for shard in files
+            ],
+        }
+        tmp = index.with_name(index.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp, index)
+
+    #write examples as they arrive, batch_size at a time; used by the streaming pipeline
+    async def export_stream(self, examples: AsyncIterator[TrainingExample], output_path: Union[str, Path], format: ExportFormat = ExportFormat.JSONL) -> int:
+        out = Path(output_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+
+        count = 0
+        writer = await asyncio.to_thread(open_writer, out, format, self.compression, self.file_compression, self.index)
+        try:
+            async with BackgroundWriter(self.queue_size) as background:
+                batch = []
+                async for ex in examples:
+                    batch.append(ex)
+                    if len(batch) >= self.batch_size:
+                        await background.submit(self._write_stream, writer, batch)
+                        count += len(batch)
+                        batch = []
+                if batch:
+                    await background.submit(self._write_stream, writer, batch)
+                    count += len(batch)
+                await background.submit(writer.close)
+        except BaseException:
+            #the writer thread has stopped by now, see export
+            writer.abort()
+            raise
+
+        self.logger.info(f"Streamed {count} examples to {writer.path}")
+        return count
+
+    #incremental builds: append new examples and tombstone records for removed ones. With
+    #index, the file's index is extended to cover the new lines (or built, if it had none)
+    async def append_jsonl(self, output_path: Union[str, Path], examples: List[TrainingExample], tombstones: Iterable[str] = ()) -> int:
+        out = Path(output_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+
+        records = [{'id': example_id, 'deleted': True} for example_id in tombstones]
+        records.extend(self._to_record(ex) for ex in examples)
+        with self.metrics.stage("export", items=len(examples)):
+            await asyncio.to_thread(self._append_lines, out, records)
+        count = len(records)
+
+        self.logger.info(f"Appended {count} records to {out}")
+        return count
+
+    def _append_lines(self, out: Path, records: List[dict]):
+        builder = IndexBuilder.extend(out) if self.index else None
+        try:
+            with out.open('ab') as f:
+                written = f.tell()
+                for start in range(0, len(records), self.batch_size):
+                    batch = records[start:start + self.batch_size]
+                    data = encode_lines(batch)
+                    if builder is not None:
+                        builder.add_lines(data, written, batch)
+                    f.write(data)
+                    written += len(data)
+            if builder is not None:
+                builder.finish(written)
+        except BaseException:
+            if builder is not None:
+                builder.abort()
+            raise
+
+    def _to_record(self, ex: TrainingExample) -> dict:
+        return to_record(ex)
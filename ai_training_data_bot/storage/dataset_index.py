@@ -0,0 +1,423 @@
+import bisect
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from ..core.exceptions import ConfigurationError
+
+if TYPE_CHECKING:
+    import numpy as np
+
+#fields with a postings list in the index; None values are indexed as ""
+FIELDS = ("task_type", "source_document_id")
+INDEX_SUFFIX = ".idx"
+_MAGIC = b"TDBIDX01"
+_VERSION = 2
+_ALIGN = 16
+#bytes of the per-row id digest
+_ID_BYTES = 16
+
+def index_path(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+#digest of a record id; a row without one gets a key no digest can collide with in practice,
+#so it is never superseded
+def _id_key(value: Any, row: int) -> bytes:
+    if value is None:
+        return b"\xff" * 8 + struct.pack("<Q", row)
+    return hashlib.blake2b(str(value).encode("utf-8"), digest_size=_ID_BYTES).digest()
+
+#sidecar index of one uncompressed JSONL file, filled in as lines are written and saved
+#by finish(). Incremental builds append tombstones ({"id": ..., "deleted": true}) and new
+#versions of existing ids, so a line is live only when it is the last one with its id and
+#not a tombstone; the postings, counts and samples cover live rows alone. The file holds a
+#JSON header followed by flat little-endian arrays:
+#  offsets                   byte offset of every line, plus the file size (lines + 1)
+#  ids                       id digest of every line, to recompute liveness when extending
+#  tombstones                line numbers of the tombstones
+#  live_rows                 line number of every live row; left out when all lines are live
+#  <field>_rows/_starts      postings: live row numbers grouped by value, ascending within a
+#                            value; the rows of the i-th value are rows[starts[i]:starts[i+1]]
+#  <field>_vocab/_vocab_offsets  the values of live rows, sorted, as one utf-8 blob
+#so a reader can map it and answer lookups without parsing anything up front. Lines are
+#spilled to temp files every spill_rows lines, which keeps the builder's memory flat
+class IndexBuilder:
+    def __init__(self, path: Union[str, Path], spill_rows: int = 1 << 20):
+        self.path = Path(path)
+        self.spill_rows = spill_rows
+        self.rows = 0
+        self._ends = array("Q")
+        self._ids = array("B")
+        self._tombstones = array("Q")
+        self._codes = {field: array("I") for field in FIELDS}
+        #value -> code in first-seen order; remapped to sorted order by finish()
+        self._vocab: Dict[str, Dict[str, int]] = {field: {} for field in FIELDS}
+        self._spill: Optional[Dict[str, BinaryIO]] = None
+
+    #a builder holding the rows of the existing file at `path`, for appending to it: they
+    #come from its index when that is up to date, else from parsing the file once
+    @classmethod
+    def extend(cls, path: Union[str, Path], spill_rows: int = 1 << 20) -> "IndexBuilder":
+        import numpy as np
+
+        path = Path(path)
+        builder = cls(index_path(path), spill_rows=spill_rows)
+        if not path.exists() or not path.stat().st_size:
+            return builder
+        try:
+            reader = DatasetReader(path)
+        except ConfigurationError:
+            builder._scan(path)
+            return builder
+        with reader:
+            arrays = reader._arrays
+            builder._ends.frombytes(arrays["offsets"][1:].tobytes())
+            builder._ids.frombytes(arrays["ids"].tobytes())
+            builder._tombstones.frombytes(arrays["tombstones"].tobytes())
+            builder.rows = reader.lines
+            live_rows = arrays.get("live_rows")
+            for field in FIELDS:
+                vocab = reader._vocab[field]
+                builder._vocab[field] = {value: code for code, value in enumerate(vocab)}
+                #dead lines keep code 0; finish() never reads it
+                codes = np.zeros(reader.lines, dtype=np.uint32)
+                rows = arrays[f"{field}_rows"]
+                codes[rows if live_rows is None else live_rows[rows]] = np.repeat(
+                    np.arange(len(vocab), dtype=np.uint32), np.diff(arrays[f"{field}_starts"].astype(np.int64))
+                )
+                builder._codes[field].frombytes(codes.tobytes())
+        if len(builder._ends) >= spill_rows:
+            builder._flush()
+        return builder
+
+    #one call per written batch: the end offset of each line, its field values, its record id
+    #and whether it is a tombstone
+    def add(
+        self,
+        ends: Iterable[int],
+        task_types: Iterable[Optional[str]],
+        sources: Iterable[Optional[str]],
+        ids: Iterable[Any],
+        deleted: Iterable[bool] = ()
+    ):
+        first = self.rows
+        before = len(self._ends)
+        self._ends.extend(ends)
+        self.rows += len(self._ends) - before
+        for row, (value, dead) in enumerate(itertools.zip_longest(ids, deleted, fillvalue=False), first):
+            self._ids.frombytes(_id_key(value, row))
+            if dead:
+                self._tombstones.append(row)
+        for field, values in zip(FIELDS, (task_types, sources)):
+            vocab = self._vocab[field]
+            self._codes[field].extend([vocab.setdefault(v or "", len(vocab)) for v in values])
+        if len(self._ends) >= self.spill_rows:
+            self._flush()
+
+    #same, from an encoded batch of lines starting at byte `base` and the records in it
+    def add_lines(self, data: bytes, base: int, records: Sequence[Dict[str, Any]]):
+        ends, pos = [], data.find(b"\n")
+        while pos != -1:
+            ends.append(base + pos + 1)
+            pos = data.find(b"\n", pos + 1)
+        self._add_records(ends, records)
+
+    def finish(self, file_bytes: int) -> Path:
+        import numpy as np
+
+        dtypes = {"ends": np.uint64, "ids": np.dtype(f"S{_ID_BYTES}"), **{field: np.uint32 for field in FIELDS}}
+        columns = {"ends": self._ends, "ids": self._ids, **self._codes}
+        if self._spill is not None:
+            self._flush()
+            for f in self._spill.values():
+                f.close()
+            columns = {name: np.fromfile(self._spill_path(name), dtype=dtypes[name]) for name in columns}
+        else:
+            columns = {
+                name: np.frombuffer(column, dtype=dtypes[name]) if len(column) else np.empty(0, dtype=dtypes[name])
+                for name, column in columns.items()
+            }
+
+        #the last line of every id is live unless it is a tombstone
+        rows = len(columns["ends"])
+        row_dtype = np.uint32 if rows < 1 << 32 else np.uint64
+        live = np.zeros(rows, dtype=bool)
+        if rows:
+            order = np.argsort(columns["ids"], kind="stable")
+            ids = columns["ids"][order]
+            last = np.ones(rows, dtype=bool)
+            last[:-1] = ids[1:] != ids[:-1]
+            live[order[last]] = True
+        tombstones = np.frombuffer(self._tombstones, dtype=np.uint64) if len(self._tombstones) else np.empty(0, dtype=np.uint64)
+        live[tombstones] = False
+        live_rows = np.flatnonzero(live).astype(row_dtype)
+
+        offsets = np.zeros(rows + 1, dtype=np.uint64)
+        offsets[1:] = columns["ends"]
+        arrays = {"offsets": offsets, "ids": columns["ids"], "tombstones": tombstones}
+        if len(live_rows) < rows:
+            arrays["live_rows"] = live_rows
+        for field in FIELDS:
+            values = list(self._vocab[field])
+            codes = columns[field][live_rows]
+            #values no live row has are dropped
+            used = np.unique(codes).tolist()
+            order = sorted(used, key=values.__getitem__)
+            remap = np.zeros(len(values), dtype=np.uint32)
+            remap[order] = np.arange(len(order), dtype=np.uint32)
+            codes = remap[codes]
+            encoded = [values[i].encode("utf-8") for i in order]
+            arrays[f"{field}_rows"] = np.argsort(codes, kind="stable").astype(row_dtype)
+            arrays[f"{field}_starts"] = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(order))))).astype(np.uint64)
+            arrays[f"{field}_vocab"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+            arrays[f"{field}_vocab_offsets"] = np.concatenate(([0], np.cumsum([len(v) for v in encoded]))).astype(np.uint64)
+
+        layout, position = {}, 0
+        for name, values in arrays.items():
+            layout[name] = [position, values.dtype.str, len(values)]
+            position += -(-values.nbytes // _ALIGN) * _ALIGN
+        header = json.dumps({
+            "version": _VERSION, "rows": len(live_rows), "lines": rows, "file_bytes": file_bytes, "arrays": layout
+        }).encode("utf-8")
+        header += b" " * (-(len(_MAGIC) + 8 + len(header)) % _ALIGN)
+
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(_MAGIC + struct.pack("<Q", len(header)) + header)
+            for values in arrays.values():
+                f.write(values.tobytes())
+                f.write(b"\0" * (-values.nbytes % _ALIGN))
+        os.replace(tmp, self.path)
+        self._discard_spill()
+        return self.path
+
+    #leaves no temp files behind when the export it belongs to fails
+    def abort(self):
+        if self._spill is not None:
+            for f in self._spill.values():
+                f.close()
+        self._discard_spill()
+
+    #adds every line of an existing JSONL file
+    def _scan(self, path: Path, batch_lines: int = 10_000):
+        with path.open("rb") as f:
+            offset = 0
+            while True:
+                lines = [line for _, line in zip(range(batch_lines), f)]
+                if not lines:
+                    break
+                records = [json.loads(line) for line in lines]
+                ends = []
+                for line in lines:
+                    offset += len(line)
+                    ends.append(offset)
+                self._add_records(ends, records)
+
+    def _add_records(self, ends: Sequence[int], records: Sequence[Dict[str, Any]]):
+        self.add(
+            ends,
+            (r.get("task_type") for r in records),
+            (r.get("source_document_id") for r in records),
+            (r.get("id") for r in records),
+            (r.get("deleted") is True for r in records)
+        )
+
+    def _spill_path(self, name: str) -> Path:
+        return self.path.with_name(f"{self.path.name}.{name}.tmp")
+
+    def _flush(self):
+        if self._spill is None:
+            self._spill = {name: self._spill_path(name).open("wb") for name in ("ends", "ids", *FIELDS)}
+        for name, column in (("ends", self._ends), ("ids", self._ids), *self._codes.items()):
+            column.tofile(self._spill[name])
+            del column[:]
+
+    def _discard_spill(self):
+        if self._spill is not None:
+            for name in self._spill:
+                self._spill_path(name).unlink(missing_ok=True)
+            self._spill = None
+
+
+#indexes an existing JSONL file in one pass, e.g. a merged sharded run or an export made
+#with the index turned off. Every line is parsed once here so the reader never has to
+def build_index(path: Union[str, Path], batch_lines: int = 10_000) -> Path:
+    path = Path(path)
+    builder = IndexBuilder(index_path(path))
+    try:
+        builder._scan(path, batch_lines)
+        return builder.finish(path.stat().st_size)
+    except BaseException:
+        builder.abort()
+        raise
+
+
+#sorted strings packed in one blob; bisect works on it directly
+class _Vocab(Sequence):
+    def __init__(self, blob: "np.ndarray", offsets: "np.ndarray"):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self._blob[int(self._offsets[i]):int(self._offsets[i + 1])].tobytes().decode("utf-8")
+
+    def code(self, value: str) -> Optional[int]:
+        i = bisect.bisect_left(self, value)
+        return i if i < len(self) and self[i] == value else None
+
+
+#random access to an indexed JSONL export: the file and its index are memory-mapped, so
+#opening costs the same for any size and a lookup touches only the lines it returns. Rows
+#are the live records in file order; tombstones and superseded lines are skipped.
+#  reader[i]                           the i-th live record, parsed
+#  reader.count(task_type="qa_generation")
+#  reader.records(source_document_id=...)  matching records, in file order
+#  reader.sample(1000, by="task_type", seed=0)  stratified sample
+#Filters take the exported string values (enums and UUIDs are converted)
+class DatasetReader:
+    def __init__(self, path: Union[str, Path], index: Optional[Union[str, Path]] = None):
+        import numpy as np
+
+        self.path = Path(path)
+        self.index_path = Path(index) if index is not None else index_path(self.path)
+        if not self.index_path.exists():
+            raise ConfigurationError(f"No index for {self.path}; export with export_index on or run build_index")
+
+        with self.index_path.open("rb") as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._index[:len(_MAGIC)] != _MAGIC:
+            raise ConfigurationError(f"{self.index_path} is not a dataset index")
+        (header_len,) = struct.unpack_from("<Q", self._index, len(_MAGIC))
+        start = len(_MAGIC) + 8
+        header = json.loads(self._index[start:start + header_len])
+        base = start + header_len
+        if header.get("version") != _VERSION:
+            raise ConfigurationError(f"{self.index_path} has an older index format; rebuild it")
+
+        size = self.path.stat().st_size
+        if header["file_bytes"] != size:
+            raise ConfigurationError(
+                f"Index of {self.path} covers {header['file_bytes']} bytes but the file has {size}; rebuild it"
+            )
+        self.rows = header["rows"]
+        #physical lines, tombstones and superseded ones included
+        self.lines = header["lines"]
+        self._arrays = {
+            name: np.frombuffer(self._index, dtype=np.dtype(dtype), count=count, offset=base + position)
+            for name, (position, dtype, count) in header["arrays"].items()
+        }
+        self._offsets = self._arrays["offsets"]
+        self._live_rows = self._arrays.get("live_rows")
+        self._vocab = {
+            field: _Vocab(self._arrays[f"{field}_vocab"], self._arrays[f"{field}_vocab_offsets"])
+            for field in FIELDS
+        }
+        self._file = self.path.open("rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, row: int) -> Dict[str, Any]:
+        return json.loads(self.line(row))
+
+    #raw bytes of one line, newline included
+    def line(self, row: int) -> bytes:
+        if row < 0:
+            row += self.rows
+        if not 0 <= row < self.rows:
+            raise IndexError(f"row {row} out of range for {self.rows} rows")
+        if self._live_rows is not None:
+            row = int(self._live_rows[row])
+        return self._data[int(self._offsets[row]):int(self._offsets[row + 1])]
+
+    #distinct values of field, sorted
+    def values(self, field: str) -> Sequence[str]:
+        return self._vocab[self._field(field)]
+
+    def counts(self, field: str) -> Dict[str, int]:
+        import numpy as np
+
+        field = self._field(field)
+        return dict(zip(self._vocab[field], np.diff(self._arrays[f"{field}_starts"]).tolist()))
+
+    def count(self, task_type: Any = None, source_document_id: Any = None) -> int:
+        return len(self.rows_where(task_type, source_document_id))
+
+    #ascending row numbers matching every given filter; a view into the index where possible
+    def rows_where(self, task_type: Any = None, source_document_id: Any = None) -> "np.ndarray":
+        import numpy as np
+
+        matched = None
+        for field, value in zip(FIELDS, (task_type, source_document_id)):
+            if value is None:
+                continue
+            rows = self._postings(field, value)
+            matched = rows if matched is None else np.intersect1d(matched, rows, assume_unique=True)
+        return np.arange(self.rows) if matched is None else matched
+
+    def records(self, task_type: Any = None, source_document_id: Any = None) -> Iterator[Dict[str, Any]]:
+        for row in self.rows_where(task_type, source_document_id).tolist():
+            yield self[row]
+
+    #n distinct rows, ascending. With `by`, every value of that field gets a share of n
+    #proportional to its row count (largest remainder), drawn uniformly within the value
+    def sample_rows(self, n: int, by: Optional[str] = None, seed: Optional[int] = None) -> "np.ndarray":
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        n = min(n, self.rows)
+        if by is None:
+            return np.sort(rng.choice(self.rows, n, replace=False))
+
+        field = self._field(by)
+        postings, starts = self._arrays[f"{field}_rows"], self._arrays[f"{field}_starts"].astype(np.int64)
+        sizes = np.diff(starts)
+        quota = sizes * (n / max(self.rows, 1))
+        take = np.floor(quota).astype(np.int64)
+        short = n - int(take.sum())
+        if short:
+            take[np.argsort(take - quota, kind="stable")[:short]] += 1
+        picked = [
+            postings[starts[i] + rng.choice(sizes[i], take[i], replace=False)]
+            for i in np.flatnonzero(take).tolist()
+        ]
+        return np.sort(np.concatenate(picked)) if picked else np.empty(0, dtype=np.int64)
+
+    def sample(self, n: int, by: Optional[str] = None, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        return [self[row] for row in self.sample_rows(n, by=by, seed=seed).tolist()]
+
+    #numpy views keep the index mapping alive, so it is released with the last of them
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+        self._arrays, self._vocab, self._index, self._live_rows = {}, {}, None, None
+
+    def __enter__(self) -> "DatasetReader":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _field(self, field: str) -> str:
+        if field not in FIELDS:
+            raise ConfigurationError(f"Not an indexed field: {field} (indexed: {', '.join(FIELDS)})")
+        return field
+
+    def _postings(self, field: str, value: Any) -> "np.ndarray":
+        code = self._vocab[field].code(str(getattr(value, "value", value)))
+        if code is None:
+            return self._arrays[f"{field}_rows"][:0]
+        starts = self._arrays[f"{field}_starts"]
+        return self._arrays[f"{field}_rows"][int(starts[code]):int(starts[code + 1])]
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID
+
+from ..models import Document
+from .sqlite_store import SqliteLRUStore
+
+@dataclass
+class CachedURL:
+    documents: List[Document]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    #headers for a conditional GET against the cached copy
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+#persistent cache of extracted documents, keyed by file path + size + mtime (or content hash)
+#and by url + ETag/Last-Modified; evicts least recently used entries past max_bytes
+class IngestionCache:
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_bytes: int = 1 << 30,
+        hash_content: bool = False,
+        bypass: bool = False
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hash_content = hash_content
+        #bypass skips lookups but still refreshes entries
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        #values are compressed document lists; the validator, ETag and Last-Modified go in
+        #the entry's metadata
+        self._store = SqliteLRUStore(path, max_bytes=max_bytes, logger_name="ingestion_cache")
+
+    async def get_file(self, path: Path) -> Optional[List[Document]]:
+        if self.bypass:
+            self.misses += 1
+            return None
+        validator = await asyncio.to_thread(self._file_validator, path)
+        entry = await asyncio.to_thread(self._store.get, f"file:{path.resolve()}")
+        if entry is None or entry[1].get("validator") != validator:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return await asyncio.to_thread(self._decode, entry[0])
+
+    async def put_file(self, path: Path, documents: List[Document]):
+        validator = await asyncio.to_thread(self._file_validator, path)
+        await asyncio.to_thread(self._put, f"file:{path.resolve()}", documents, {"validator": validator})
+
+    async def get_url(self, url: str) -> Optional[CachedURL]:
+        if self.bypass:
+            return None
+        entry = await asyncio.to_thread(self._store.get, f"url:{url}")
+        if entry is None:
+            return None
+        documents = await asyncio.to_thread(self._decode, entry[0])
+        return CachedURL(documents=documents, etag=entry[1].get("etag"), last_modified=entry[1].get("last_modified"))
+
+    async def put_url(self, url: str, documents: List[Document], etag: Optional[str], last_modified: Optional[str]):
+        await asyncio.to_thread(self._put, f"url:{url}", documents, {"etag": etag, "last_modified": last_modified})
+
+    #url hits are only known after the conditional GET, so the loader reports them
+    def record_url(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            **self._store.stats(),
+        }
+
+    async def close(self):
+        self._store.close()
+
+    def _file_validator(self, path: Path) -> str:
+        stat = path.stat()
+        if not self.hash_content:
+            return f"{stat.st_size}:{stat.st_mtime_ns}"
+        digest = hashlib.sha256()
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return f"{stat.st_size}:{digest.hexdigest()}"
+
+    def _put(self, key: str, documents: List[Document], meta: Dict[str, Any]):
+        payload = zlib.compress(json.dumps([_document_to_dict(d) for d in documents]).encode("utf-8"))
+        self._store.put(key, payload, meta)
+
+    def _decode(self, payload: bytes) -> List[Document]:
+        return [_document_from_dict(d) for d in json.loads(zlib.decompress(payload))]
+
+
+def _document_to_dict(doc: Document) -> Dict[str, Any]:
+    return {
+        "id": str(doc.id),
+        "created_at": doc.created_at.isoformat(),
+        "metadata": doc.metadata,
+        "title": doc.title,
+        "content": doc.content,
+        "source": doc.source,
+        "doc_type": doc.doc_type,
+        "word_count": doc.word_count,
+    }
+
+
+def _document_from_dict(data: Dict[str, Any]) -> Document:
+    return Document(
+        id=UUID(data["id"]),
+        created_at=datetime.fromisoformat(data["created_at"]),
+        metadata=data["metadata"],
+        title=data["title"],
+        content=data["content"],
+        source=data["source"],
+        doc_type=data["doc_type"],
+        word_count=data["word_count"]
+    )
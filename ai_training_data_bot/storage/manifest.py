@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Union
+
+@dataclass
+class ManifestEntry:
+    content_hash: str
+    document_id: str
+    #chunk id -> ids of the examples derived from it
+    chunks: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def example_ids(self) -> List[str]:
+        return [ex_id for ids in self.chunks.values() for ex_id in ids]
+
+#source -> content hash -> derived chunk/example ids for one export file
+class BuildManifest:
+    VERSION = 1
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.settings: Dict[str, Any] = {}
+        self.entries: Dict[str, ManifestEntry] = {}
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BuildManifest":
+        manifest = cls(path)
+        if manifest.path.exists():
+            data = json.loads(manifest.path.read_text(encoding="utf-8"))
+            manifest.settings = data.get("settings", {})
+            manifest.entries = {
+                source: ManifestEntry(**entry) for source, entry in data.get("sources", {}).items()
+            }
+        return manifest
+
+    #write to a temp file and rename so a crash never leaves a half-written manifest
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": self.VERSION,
+            "settings": self.settings,
+            "sources": {source: asdict(entry) for source, entry in sorted(self.entries.items())},
+        }
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+#text may also be an iterable of blocks (Document.blocks()), hashed as their concatenation
+def content_hash(text: Union[str, Iterable[str]]) -> str:
+    digest = hashlib.sha256()
+    for block in (text,) if isinstance(text, str) else text:
+        digest.update(block.encode("utf-8"))
+    return digest.hexdigest()
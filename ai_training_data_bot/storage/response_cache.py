@@ -0,0 +1,68 @@
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .sqlite_store import SqliteLRUStore
+
+#persistent prompt/response memo for task generation, keyed on template id + version,
+#task type, model + params and the chunk text hash. Entries older than ttl seconds are
+#misses; past max_bytes the least recently used entries are evicted
+class ResponseCache:
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttl: Optional[float] = None,
+        max_bytes: int = 1 << 30
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        #responses are stored utf-8 encoded
+        self._store = SqliteLRUStore(path, max_bytes=max_bytes, ttl=ttl, logger_name="response_cache")
+
+    @staticmethod
+    def key(
+        template_id: str,
+        template_version: int,
+        task_type: str,
+        model: str,
+        params: Dict[str, Any],
+        content: str
+    ) -> str:
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        material = json.dumps(
+            [template_id, template_version, task_type, model, params, content_hash], sort_keys=True, default=str
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    #cached responses for the keys that have a live entry
+    async def get_many(self, keys: List[str]) -> Dict[str, str]:
+        if not keys:
+            return {}
+        entries = await asyncio.to_thread(self._store.get_many, keys)
+        found = {key: value.decode("utf-8") for key, (value, _) in entries.items()}
+        self.hits += len(found)
+        self.misses += len(set(keys)) - len(found)
+        return found
+
+    async def put_many(self, responses: Dict[str, str]):
+        if responses:
+            await asyncio.to_thread(
+                self._store.put_many, {key: (response.encode("utf-8"), None) for key, response in responses.items()}
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            **self._store.stats(),
+        }
+
+    async def close(self):
+        self._store.close()
@@ -0,0 +1,305 @@
+import csv
+import gzip
+import importlib.util
+import io
+import json
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from ..models import DUPLICATE_FIELDS, ExportFormat, TrainingExample
+from ..core.exceptions import ConfigurationError
+from .dataset_index import IndexBuilder, index_path
+
+COLUMNS = ("id", "input_text", "output_text", "task_type", "source_document_id", "quality_scores", *DUPLICATE_FIELDS)
+
+#one reusable encoder; json.dumps(..., ensure_ascii=False) builds a new one per call
+_JSON = json.JSONEncoder(ensure_ascii=False)
+
+#orjson, when installed, encodes several times faster (compact separators, same records)
+if importlib.util.find_spec("orjson") is not None:
+    import orjson
+
+    def encode_lines(records: List[Dict[str, Any]]) -> bytes:
+        dumps = orjson.dumps
+        return b"".join([dumps(r) + b"\n" for r in records])
+else:
+    def encode_lines(records: List[Dict[str, Any]]) -> bytes:
+        encode = _JSON.encode
+        return "".join([encode(r) + "\n" for r in records]).encode("utf-8")
+
+
+#JSONL records only carry the duplicate flags of flagged examples; the columnar formats
+#always have the columns, empty when unflagged
+def to_record(ex: TrainingExample) -> Dict[str, Any]:
+    record = {
+        "id": str(ex.id),
+        "input_text": ex.input_text,
+        "output_text": ex.output_text,
+        "task_type": getattr(ex.task_type, "value", ex.task_type),
+        "source_document_id": str(ex.source_document_id) if ex.source_document_id else None,
+        "quality_scores": ex.quality_scores,
+    }
+    if ex.has_metadata:
+        record.update((key, ex.metadata[key]) for key in DUPLICATE_FIELDS if key in ex.metadata)
+    return record
+
+
+def duplicate_flags(ex: TrainingExample) -> Tuple[Optional[str], Optional[float]]:
+    if not ex.has_metadata:
+        return None, None
+    return ex.metadata.get("duplicate_of"), ex.metadata.get("duplicate_similarity")
+
+
+#text formats can be compressed as a whole stream; the suffix is appended to the file name
+FILE_COMPRESSION = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def _open_stream(path: Path, compression: Optional[str]) -> Tuple[Path, BinaryIO]:
+    if compression is None:
+        return path, path.open("wb", buffering=1 << 20)
+    if compression not in FILE_COMPRESSION:
+        raise ConfigurationError(f"Unknown file compression: {compression}")
+
+    path = path.with_name(path.name + FILE_COMPRESSION[compression])
+    if compression == "gzip":
+        return path, gzip.open(path, "wb", compresslevel=6)
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ConfigurationError("zstd file compression needs the optional zstandard package") from e
+    return path, zstandard.ZstdCompressor().stream_writer(path.open("wb"))
+
+
+#writes batches of examples to one file in one format; all calls block, so async
+#callers run them on a BackgroundWriter
+class FormatWriter:
+    def __init__(self, path: Path, file_compression: Optional[str] = None):
+        self.path, self._file = _open_stream(path, file_compression)
+        self._written = 0
+
+    def write(self, examples: List[TrainingExample]):
+        raise NotImplementedError
+
+    #uncompressed bytes written so far, used for size-based sharding
+    def tell(self) -> int:
+        return self._written
+
+    def close(self):
+        self._file.close()
+
+    #releases the file after a failed export, leaving what was written but no index
+    def abort(self):
+        self._file.close()
+
+    def _emit(self, data: bytes):
+        self._file.write(data)
+        self._written += len(data)
+
+
+class JsonlWriter(FormatWriter):
+    #with index, the offset/postings sidecar of storage/dataset_index.py is built as batches
+    #are written. Only uncompressed files get one, as only those can be memory-mapped
+    def __init__(self, path: Path, file_compression: Optional[str] = None, index: bool = False):
+        super().__init__(path, file_compression)
+        self._index = IndexBuilder(index_path(self.path)) if index and file_compression is None else None
+
+    #a whole batch is encoded into one buffer and written with a single call
+    def write(self, examples: List[TrainingExample]):
+        records = [to_record(ex) for ex in examples]
+        data = encode_lines(records)
+        if self._index is not None:
+            self._index.add_lines(data, self._written, records)
+        self._emit(data)
+
+    def close(self):
+        super().close()
+        if self._index is not None:
+            self._index.finish(self._written)
+
+    def abort(self):
+        super().abort()
+        if self._index is not None:
+            self._index.abort()
+
+
+class CsvWriter(FormatWriter):
+    def __init__(self, path: Path, file_compression: Optional[str] = None):
+        super().__init__(path, file_compression)
+        self._write_rows([COLUMNS])
+
+    def write(self, examples: List[TrainingExample]):
+        self._write_rows([
+            (str(ex.id), ex.input_text, ex.output_text, getattr(ex.task_type, "value", ex.task_type),
+             str(ex.source_document_id) if ex.source_document_id else "", _JSON.encode(ex.quality_scores),
+             *("" if flag is None else flag for flag in duplicate_flags(ex)))
+            for ex in examples
+        ])
+
+    def _write_rows(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        self._emit(buffer.getvalue().encode("utf-8"))
+
+
+#Parquet and Arrow IPC need the optional pyarrow package; each batch becomes one row group/record
+#batch, compressed by the format's own codec
+class ArrowWriter(FormatWriter):
+    def __init__(self, path: Path, compression: Optional[str] = "zstd"):
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ConfigurationError("Parquet/Arrow export needs the optional pyarrow package") from e
+        self._pa = pa
+        self.path = path
+        self.compression = compression
+        self.schema = pa.schema([
+            ("id", pa.string()),
+            ("input_text", pa.string()),
+            ("output_text", pa.string()),
+            ("task_type", pa.dictionary(pa.int8(), pa.string())),
+            ("source_document_id", pa.string()),
+            ("quality_scores", pa.map_(pa.string(), pa.float64())),
+            ("duplicate_of", pa.string()),
+            ("duplicate_similarity", pa.float64()),
+        ])
+        self._file = pa.OSFile(str(path), "wb")
+        self._writer = self._open_writer()
+
+    def _open_writer(self):
+        options = self._pa.ipc.IpcWriteOptions(compression=self.compression)
+        return self._pa.ipc.new_file(self._file, self.schema, options=options)
+
+    def write(self, examples: List[TrainingExample]):
+        flags = [duplicate_flags(ex) for ex in examples]
+        table = self._pa.Table.from_pydict({
+            "id": [str(ex.id) for ex in examples],
+            "input_text": [ex.input_text for ex in examples],
+            "output_text": [ex.output_text for ex in examples],
+            "task_type": [getattr(ex.task_type, "value", ex.task_type) for ex in examples],
+            "source_document_id": [str(ex.source_document_id) if ex.source_document_id else None for ex in examples],
+            "quality_scores": [list(ex.quality_scores.items()) for ex in examples],
+            "duplicate_of": [duplicate_of for duplicate_of, _ in flags],
+            "duplicate_similarity": [similarity for _, similarity in flags],
+        }, schema=self.schema)
+        self._writer.write_table(table)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self):
+        self._writer.close()
+        self._file.close()
+
+
+class ParquetWriter(ArrowWriter):
+    def _open_writer(self):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self._file, self.schema, compression=self.compression or "none")
+
+
+def open_writer(
+    path: Path,
+    format: ExportFormat,
+    compression: Optional[str] = "zstd",
+    file_compression: Optional[str] = None,
+    index: bool = False
+) -> FormatWriter:
+    if format == ExportFormat.JSONL:
+        return JsonlWriter(path, file_compression, index=index)
+    if format == ExportFormat.CSV:
+        return CsvWriter(path, file_compression)
+    if format == ExportFormat.PARQUET:
+        return ParquetWriter(path, compression=compression)
+    if format == ExportFormat.ARROW:
+        return ArrowWriter(path, compression=compression)
+    raise ValueError(f"Unsupported export format: {format}")
+
+
+#rotates to a new file every shard_size examples and/or once a file reaches shard_bytes;
+#without either limit everything goes to `path` itself
+class ShardedWriter:
+    def __init__(
+        self,
+        path: Path,
+        format: ExportFormat,
+        shard_size: Optional[int] = None,
+        shard_bytes: Optional[int] = None,
+        compression: Optional[str] = "zstd",
+        file_compression: Optional[str] = None,
+        index: bool = False
+    ):
+        self.path = path
+        self.format = format
+        self.shard_size = shard_size
+        self.shard_bytes = shard_bytes
+        self.compression = compression
+        self.file_compression = file_compression
+        self.index = index
+        self.shards: List[Dict[str, Any]] = []
+        self._writer: Optional[FormatWriter] = None
+        self._count = 0
+        #bytes/examples written so far, so size-based shards are cut close to shard_bytes
+        self._bytes_seen = 0
+        self._examples_seen = 0
+
+    @property
+    def sharded(self) -> bool:
+        return bool(self.shard_size or self.shard_bytes)
+
+    def write(self, examples: List[TrainingExample]):
+        while examples:
+            if self._writer is None:
+                self._open()
+            take = len(examples)
+            if self.shard_size:
+                take = min(take, self.shard_size - self._count)
+            if self.shard_bytes:
+                room = self.shard_bytes - self._writer.tell()
+                if self._bytes_seen:
+                    take = min(take, max(1, int(room * self._examples_seen / self._bytes_seen)))
+                else:
+                    take = min(take, 64)
+
+            before = self._writer.tell()
+            self._writer.write(examples[:take])
+            self._bytes_seen += self._writer.tell() - before
+            self._examples_seen += take
+            self._count += take
+            examples = examples[take:]
+
+            full = self.shard_size and self._count >= self.shard_size
+            if full or (self.shard_bytes and self._writer.tell() >= self.shard_bytes):
+                self._finish()
+
+    #closes the current shard; an export with no examples still produces one (empty) file
+    def close(self) -> List[Dict[str, Any]]:
+        if self._writer is None and not self.shards:
+            self._open()
+        if self._writer is not None:
+            self._finish()
+        return self.shards
+
+    #releases the shard being written after a failure; finished shards are left as they are
+    def abort(self):
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            writer.abort()
+
+    def _open(self):
+        path = self.path
+        if self.sharded:
+            path = path.with_name(f"{path.stem}-{len(self.shards):05d}{path.suffix}")
+        self._writer = open_writer(path, self.format, self.compression, self.file_compression, index=self.index)
+        self._count = 0
+
+    def _finish(self):
+        self._writer.close()
+        shard = {
+            "path": self._writer.path.name,
+            "examples": self._count,
+            "bytes": self._writer.path.stat().st_size,
+        }
+        if index_path(self._writer.path).exists():
+            shard["index"] = index_path(self._writer.path).name
+        self.shards.append(shard)
+        self._writer = None
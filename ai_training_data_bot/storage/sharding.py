@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+from ..core.exceptions import ConfigurationError
+from .dataset_index import IndexBuilder, index_path
+
+_MANIFEST = re.compile(r"shard-(\d+)-of-(\d+)\.manifest\.json$")
+
+#"i/N" -> (i, N), shards numbered from 0
+def parse_shard(spec: str) -> Tuple[int, int]:
+    try:
+        shard, num_shards = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ConfigurationError(f"Shard must look like i/N, got {spec!r}") from None
+    if num_shards < 1 or not 0 <= shard < num_shards:
+        raise ConfigurationError(f"Shard index must be in [0, {num_shards}), got {spec!r}")
+    return shard, num_shards
+
+#stable across processes and machines (unlike hash()), so every node agrees on the owner
+#of a target given the same source list
+def shard_of(target: str, num_shards: int) -> int:
+    digest = hashlib.blake2b(target.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % num_shards
+
+def shard_name(shard: int, num_shards: int) -> str:
+    return f"shard-{shard:05d}-of-{num_shards:05d}"
+
+#identifies one sharded run: the ordered target list and the build settings. Shards of
+#the same run have the same plan, which merge checks before combining them
+def plan_hash(targets: List[str], settings: Dict[str, Any], num_shards: int) -> str:
+    data = json.dumps({"targets": targets, "settings": settings, "num_shards": num_shards}, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+#written next to a shard's JSONL output once it is complete. targets lists, in output
+#order, each target's position in the full plan and how many example lines it wrote
+@dataclass
+class ShardManifest:
+    shard: int
+    num_shards: int
+    plan: str
+    output: str
+    bytes: int = 0
+    examples: int = 0
+    targets: List[List[int]] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "ShardManifest":
+        return cls(**json.loads(Path(path).read_text(encoding="utf-8")))
+
+    #write to a temp file and rename: a manifest only exists for a finished shard
+    def save(self, directory: Union[str, Path]) -> Path:
+        path = Path(directory) / f"{shard_name(self.shard, self.num_shards)}.manifest.json"
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(asdict(self), indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+
+#combines the shards in directory into output_path using only the files on disk, so any
+#node can run it once every shard has written its manifest. Targets are interleaved back
+#into plan order and example ids seen before are dropped, which makes the output the same
+#as a single-node run over the same sources. Stats are written to <output>.stats.json and,
+#with index, a DatasetReader index to <output>.idx
+def merge_shards(directory: Union[str, Path], output_path: Union[str, Path], index: bool = True) -> Dict[str, Any]:
+    directory = Path(directory)
+    manifests = [ShardManifest.load(path) for path in sorted(directory.glob("shard-*-of-*.manifest.json"))]
+    if not manifests:
+        raise ConfigurationError(f"No shard manifests in {directory}")
+
+    num_shards, plan = manifests[0].num_shards, manifests[0].plan
+    if any(m.num_shards != num_shards or m.plan != plan for m in manifests):
+        raise ConfigurationError(f"Shard manifests in {directory} come from different runs")
+    by_shard = {m.shard: m for m in manifests}
+    missing = sorted(set(range(num_shards)) - set(by_shard))
+    if missing:
+        raise ConfigurationError(f"Missing {len(missing)} of {num_shards} shards: {missing[:10]}")
+    for m in manifests:
+        size = (directory / m.output).stat().st_size
+        if size != m.bytes:
+            raise ConfigurationError(f"{m.output} is {size} bytes, its manifest says {m.bytes}")
+
+    #(plan position, shard, lines); every shard lists its targets in plan order, so each
+    #shard file is read front to back exactly once
+    entries = sorted((ordinal, m.shard, count) for m in manifests for ordinal, count in m.targets)
+
+    out = Path(output_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".tmp")
+    seen = set()
+    written = duplicates = size = 0
+    builder = IndexBuilder(index_path(out)) if index else None
+    files = {m.shard: (directory / m.output).open("rb") for m in manifests}
+    try:
+        with tmp.open("wb") as f:
+            for _, shard, count in entries:
+                source = files[shard]
+                for _ in range(count):
+                    line = source.readline()
+                    record = json.loads(line)
+                    if record["id"] in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(record["id"])
+                    f.write(line)
+                    written += 1
+                    size += len(line)
+                    if builder is not None:
+                        builder.add(
+                            (size,), (record.get("task_type"),), (record.get("source_document_id"),), (record["id"],)
+                        )
+        if builder is not None:
+            builder.finish(size)
+    except BaseException:
+        if builder is not None:
+            builder.abort()
+        raise
+    finally:
+        for source in files.values():
+            source.close()
+    os.replace(tmp, out)
+
+    per_shard = {str(m.shard): dict(m.stats, examples=m.examples) for m in sorted(manifests, key=lambda m: m.shard)}
+    stats = {
+        "shards": num_shards,
+        "plan": plan,
+        "examples": written,
+        "duplicates": duplicates,
+        "documents": sum(s.get("documents", 0) for s in per_shard.values()),
+        "failed": sum(s.get("failed", 0) for s in per_shard.values()),
+        "elapsed": max(s.get("elapsed", 0.0) for s in per_shard.values()),
+        "per_shard": per_shard,
+    }
+    stats_path = out.with_name(out.name + ".stats.json")
+    stats_path.write_text(json.dumps(stats, indent=2), encoding="utf-8")
+    return stats
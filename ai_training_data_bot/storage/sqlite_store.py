@@ -0,0 +1,130 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..core.logging import get_logger
+
+#bumped whenever the table layout changes; a cache file with another version is emptied
+SCHEMA_VERSION = 2
+
+#(value, metadata) of one entry
+Entry = Tuple[bytes, Optional[Dict[str, Any]]]
+
+#the sqlite key/value store behind the persistent caches: one table of blobs with an
+#optional JSON metadata column, least recently used entries evicted past max_bytes and,
+#with ttl, entries older than ttl seconds treated as missing. One connection is shared
+#by every caller; calls are blocking and serialized by a lock, so async callers run them
+#in worker threads
+class SqliteLRUStore:
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_bytes: int = 1 << 30,
+        ttl: Optional[float] = None,
+        logger_name: str = "sqlite_store"
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.logger = get_logger(logger_name)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            #a cache, so an older layout is dropped rather than migrated
+            tables = [name for (name,) in self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            for name in tables:
+                self._db.execute(f'DROP TABLE IF EXISTS "{name}"')
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value BLOB, meta TEXT, size INTEGER, created REAL, last_access REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+        self._db.commit()
+        self.entries, self.size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+    def get(self, key: str) -> Optional[Entry]:
+        return self.get_many([key]).get(key)
+
+    #live entries for the keys that have one; found entries count as used
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Entry]:
+        now = time.time()
+        found: Dict[str, Entry] = {}
+        expired: List[str] = []
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            #sqlite caps bound parameters per statement, so look up in slices
+            for start in range(0, len(unique), 500):
+                part = unique[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, value, meta, created FROM entries WHERE key IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                for key, value, meta, created in rows:
+                    if self.ttl is not None and now - created > self.ttl:
+                        expired.append(key)
+                    else:
+                        found[key] = (value, json.loads(meta) if meta is not None else None)
+            if found:
+                self._db.executemany("UPDATE entries SET last_access = ? WHERE key = ?", [(now, k) for k in found])
+            if expired:
+                self._delete(expired)
+            if found or expired:
+                self._db.commit()
+        return found
+
+    def put(self, key: str, value: bytes, meta: Optional[Dict[str, Any]] = None):
+        self.put_many({key: (value, meta)})
+
+    def put_many(self, items: Dict[str, Entry]):
+        now = time.time()
+        with self._lock:
+            for key, (value, meta) in items.items():
+                old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                self.size += len(value) - (old[0] if old else 0)
+                self.entries += 0 if old else 1
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, value, json.dumps(meta) if meta is not None else None, len(value), now, now)
+                )
+            self._evict(now)
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": self.entries, "bytes": self.size}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _delete(self, keys: Iterable[str]):
+        for key in keys:
+            row = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.size -= row[0]
+                self.entries -= 1
+
+    #expired entries go first, then the least recently used
+    def _evict(self, now: float):
+        evicted = 0
+        if self.ttl is not None and self.size > self.max_bytes:
+            stale = [k for (k,) in self._db.execute("SELECT key FROM entries WHERE created < ?", (now - self.ttl,))]
+            self._delete(stale)
+            evicted += len(stale)
+        while self.size > self.max_bytes:
+            rows = self._db.execute("SELECT key FROM entries ORDER BY last_access LIMIT 256").fetchall()
+            if not rows:
+                break
+            for (key,) in rows:
+                if self.size <= self.max_bytes:
+                    break
+                self._delete([key])
+                evicted += 1
+        if evicted:
+            self.logger.debug(f"Evicted {evicted} cache entries")
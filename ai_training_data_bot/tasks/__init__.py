@@ -0,0 +1,29 @@
+from typing import TYPE_CHECKING
+
+from ..core.lazy import lazy_exports
+
+_EXPORTS = {
+    "TaskTemplate": ".templates",
+    "DEFAULT_TEMPLATES": ".templates",
+    "GenerationBackend": ".backends",
+    "HTTPCompletionBackend": ".backends",
+    "GenerationEngine": ".engine",
+    "TaskGenerator": ".task_generator",
+    "QAGenerator": ".qa_generator",
+    "ClassificationGenerator": ".classification_generator",
+    "LabelTemplate": ".classification_generator",
+    "SummarizationGenerator": ".summarization_generator",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .templates import TaskTemplate, DEFAULT_TEMPLATES
+    from .backends import GenerationBackend, HTTPCompletionBackend
+    from .engine import GenerationEngine
+    from .task_generator import TaskGenerator
+    from .qa_generator import QAGenerator
+    from .classification_generator import ClassificationGenerator, LabelTemplate
+    from .summarization_generator import SummarizationGenerator
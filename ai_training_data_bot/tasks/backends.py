@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Optional
+
+from ..core.exceptions import GenerationError
+from ..core.http_pool import RETRY_STATUSES, HttpClientPool, retry_after
+
+#completes a batch of prompts in one request; implementations return one completion per
+#prompt, in prompt order. Swap in any provider (or a local stand-in) by subclassing
+class GenerationBackend:
+    #identifies the model in cache keys and logs
+    model: str = ""
+
+    async def complete(self, prompts: List[str], params: Dict[str, Any]) -> List[str]:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+#OpenAI-compatible /completions endpoint; a list-valued "prompt" batches many chunks
+#into one request and choices come back tagged with their prompt index. Requests are
+#not retried here: failures are raised for GenerationEngine, which owns the retry policy
+class HTTPCompletionBackend(GenerationBackend):
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        api_key: Optional[str] = None,
+        http: Optional[HttpClientPool] = None
+    ):
+        self.url = base_url.rstrip("/") + "/completions"
+        self.model = model
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._owns_http = http is None
+        self.http = http or HttpClientPool()
+
+    async def complete(self, prompts: List[str], params: Dict[str, Any]) -> List[str]:
+        payload = {"model": self.model, "prompt": prompts, **params}
+        response = await self.http.post(self.url, json=payload, headers=self.headers, retries=0)
+        if response.status_code != 200:
+            retryable = response.status_code in RETRY_STATUSES
+            raise GenerationError(
+                f"Completion request failed with HTTP {response.status_code}: {response.text[:200]}",
+                retryable=retryable,
+                retry_after=retry_after(response, None) if retryable else None
+            )
+
+        try:
+            choices = response.json()["choices"]
+            texts: List[Optional[str]] = [None] * len(prompts)
+            for choice in choices:
+                texts[choice["index"]] = choice["text"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise GenerationError(f"Malformed completion response: {e!r}") from e
+        if any(text is None for text in texts):
+            raise GenerationError(f"Completion response covered {len(choices)} of {len(prompts)} prompts")
+        return texts
+
+    async def close(self):
+        if self._owns_http:
+            await self.http.close()
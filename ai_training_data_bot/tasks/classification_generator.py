@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from ..models import TaskType
+from ..storage.response_cache import ResponseCache
+from .engine import GenerationEngine
+from .task_generator import TaskGenerator
+from .templates import DEFAULT_TEMPLATES, TaskTemplate
+
+#classification against a fixed label set: the labels are listed in the prompt and the
+#completion is normalized to one of them (empty when none matches)
+@dataclass(frozen=True)
+class LabelTemplate(TaskTemplate):
+    labels: Tuple[str, ...] = ()
+
+    def render(self, text: str) -> str:
+        return self.prompt.format(text=text, labels=", ".join(self.labels))
+
+    def parse(self, completion: str) -> str:
+        answer = completion.strip().lower()
+        for label in self.labels:
+            if answer.startswith(label.lower()):
+                return label
+        for label in self.labels:
+            if label.lower() in answer:
+                return label
+        return ""
+
+    def cache_params(self) -> Dict[str, Any]:
+        return {**self.params, "labels": list(self.labels)}
+
+
+class ClassificationGenerator(TaskGenerator):
+    task_type = TaskType.CLASSIFICATION
+
+    def __init__(
+        self,
+        engine: GenerationEngine,
+        template: Optional[TaskTemplate] = None,
+        batch_size: int = 8,
+        labels: Optional[Sequence[str]] = None,
+        cache: Optional[ResponseCache] = None
+    ):
+        if template is None and labels:
+            base = DEFAULT_TEMPLATES[TaskType.CLASSIFICATION]
+            template = LabelTemplate(
+                id=f"{base.id}_labels",
+                task_type=base.task_type,
+                prompt=(
+                    "Classify the passage below as one of: {labels}. Reply with the label only.\n\n"
+                    "Passage:\n{text}\n\nLabel:"
+                ),
+                version=base.version,
+                params=base.params,
+                labels=tuple(labels)
+            )
+        super().__init__(engine, template=template, batch_size=batch_size, cache=cache)
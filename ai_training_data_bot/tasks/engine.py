@@ -0,0 +1,103 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from ..core.exceptions import GenerationError
+from ..core.logging import get_logger
+from ..core.rate_limit import TokenBucket
+from .backends import GenerationBackend
+
+#rough prompt size in model tokens, for the tokens-per-minute limit
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+#one engine is shared by every TaskGenerator so the limits hold across task types:
+#at most max_concurrency requests in flight, optional requests/tokens per minute
+#token buckets, and retries with exponential backoff (or the server's Retry-After) for
+#failed requests. This is the only retry layer for generation; errors marked not
+#retryable (e.g. HTTP 400/401) fail at once, and backing off does not hold a slot
+class GenerationEngine:
+    def __init__(
+        self,
+        backend: GenerationBackend,
+        max_concurrency: int = 8,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        retries: int = 3,
+        backoff: float = 1.0
+    ):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.logger = get_logger("generation_engine")
+
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._request_bucket = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 60)) if requests_per_minute else None
+        self._token_bucket = TokenBucket(tokens_per_minute / 60) if tokens_per_minute else None
+
+        self.latencies: Deque[float] = deque(maxlen=10_000)
+        self.requests = 0
+        self.prompts = 0
+        self.failures = 0
+        self.retried = 0
+        self._first_request: Optional[float] = None
+        self._last_response: Optional[float] = None
+
+    #one backend request for a batch of prompts
+    async def complete(self, prompts: List[str], params: Dict[str, Any]) -> List[str]:
+        cost = sum(estimate_tokens(p) for p in prompts) + int(params.get("max_tokens", 0)) * len(prompts)
+        for attempt in range(self.retries + 1):
+            async with self._slots:
+                if self._request_bucket is not None:
+                    await self._request_bucket.acquire()
+                if self._token_bucket is not None:
+                    await self._token_bucket.acquire(cost)
+
+                start = time.perf_counter()
+                if self._first_request is None:
+                    self._first_request = start
+                try:
+                    texts = await self.backend.complete(prompts, params)
+                    if len(texts) != len(prompts):
+                        raise GenerationError(f"Backend returned {len(texts)} completions for {len(prompts)} prompts")
+                except Exception as e:
+                    retryable = getattr(e, "retryable", True)
+                    if attempt == self.retries or not retryable:
+                        self.failures += 1
+                        raise
+                    delay = getattr(e, "retry_after", None)
+                    if delay is None:
+                        delay = self.backoff * 2 ** attempt
+                    self.retried += 1
+                    self.logger.debug(f"Retrying batch of {len(prompts)} prompts after {e!r}")
+                else:
+                    now = time.perf_counter()
+                    self.requests += 1
+                    self.prompts += len(prompts)
+                    self.latencies.append(now - start)
+                    self._last_response = now
+                    return texts
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, float]:
+        latencies = sorted(self.latencies)
+        elapsed = (self._last_response or 0.0) - (self._first_request or 0.0)
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return {
+            "requests": self.requests,
+            "prompts": self.prompts,
+            "failures": self.failures,
+            "retries": self.retried,
+            "prompts_per_sec": self.prompts / elapsed if elapsed > 0 else 0.0,
+            "p50_latency": percentile(0.50),
+            "p95_latency": percentile(0.95),
+            "rate_limit_wait": sum(b.waited for b in (self._request_bucket, self._token_bucket) if b is not None),
+        }
+
+    async def close(self):
+        await self.backend.close()
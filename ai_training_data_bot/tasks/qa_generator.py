@@ -1 +1,5 @@
+from ..models import TaskType
+from .task_generator import TaskGenerator
 
+class QAGenerator(TaskGenerator):
+    task_type = TaskType.QA_GENERATION
@@ -0,0 +1,5 @@
+from ..models import TaskType
+from .task_generator import TaskGenerator
+
+class SummarizationGenerator(TaskGenerator):
+    task_type = TaskType.SUMMARIZATION
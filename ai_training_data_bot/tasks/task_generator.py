@@ -0,0 +1,94 @@
+from typing import Dict, List, Optional
+
+from ..core.concurrency import bounded_map
+from ..core.logging import get_logger
+from ..models import TaskType, TextChunk, TrainingExample, stable_id
+from ..storage.response_cache import ResponseCache
+from .engine import GenerationEngine
+from .templates import DEFAULT_TEMPLATES, TaskTemplate
+
+#turns chunks into training examples for one task type: chunks are packed batch_size
+#to a request and the requests run concurrently under the engine's limits. With a
+#response cache, chunks whose text, template and model params are unchanged skip the model
+class TaskGenerator:
+    task_type: Optional[TaskType] = None
+
+    def __init__(
+        self,
+        engine: GenerationEngine,
+        template: Optional[TaskTemplate] = None,
+        batch_size: int = 8,
+        cache: Optional[ResponseCache] = None
+    ):
+        self.engine = engine
+        self.template = template or DEFAULT_TEMPLATES[self.task_type]
+        self.task_type = self.template.task_type
+        self.batch_size = batch_size
+        self.cache = cache
+        self.failed = 0
+        self.logger = get_logger(f"{self.task_type.value}_generator")
+
+    async def generate(self, chunks: List[TextChunk]) -> List[TrainingExample]:
+        return [ex for ex in await self.generate_aligned(chunks) if ex is not None]
+
+    #one entry per chunk, None where the request for its batch failed after retries
+    async def generate_aligned(self, chunks: List[TextChunk]) -> List[Optional[TrainingExample]]:
+        completions: List[Optional[str]] = [None] * len(chunks)
+        pending = list(range(len(chunks)))
+        keys: List[str] = []
+        if self.cache is not None:
+            keys = [self.cache_key(chunk) for chunk in chunks]
+            cached = await self.cache.get_many(keys)
+            pending = []
+            for i, key in enumerate(keys):
+                if key in cached:
+                    completions[i] = cached[key]
+                else:
+                    pending.append(i)
+
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        outputs = await bounded_map(self._complete, [[chunks[i] for i in batch] for batch in batches], self.engine.max_concurrency)
+
+        fresh: Dict[str, str] = {}
+        for batch, texts in zip(batches, outputs):
+            if isinstance(texts, Exception):
+                self.failed += len(batch)
+                self.logger.error(f"Generation failed for {len(batch)} chunks: {texts}")
+                continue
+            for i, text in zip(batch, texts):
+                completions[i] = text
+                if self.cache is not None:
+                    fresh[keys[i]] = text
+        if fresh:
+            await self.cache.put_many(fresh)
+
+        return [
+            self.make_example(chunk, text) if text is not None else None
+            for chunk, text in zip(chunks, completions)
+        ]
+
+    #raw completions are cached, so parse changes take effect without a new template version
+    def cache_key(self, chunk: TextChunk) -> str:
+        return ResponseCache.key(
+            self.template.id,
+            self.template.version,
+            self.task_type.value,
+            self.engine.backend.model,
+            self.template.cache_params(),
+            chunk.content
+        )
+
+    async def _complete(self, batch: List[TextChunk]) -> List[str]:
+        prompts = [self.template.render(chunk.content) for chunk in batch]
+        return await self.engine.complete(prompts, self.template.params)
+
+    def make_example(self, chunk: TextChunk, completion: str) -> TrainingExample:
+        return TrainingExample(
+            id=stable_id(chunk.id, self.task_type.value),
+            input_text=chunk.content,
+            output_text=self.template.parse(completion),
+            task_type=self.task_type,
+            source_document_id=chunk.document_id,
+            source_chunk_id=chunk.id,
+            metadata=chunk.example_metadata()
+        )
@@ -0,0 +1,79 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from ..models import TaskType
+
+#prompt for one task type; id + version identify the prompt wording so a changed
+#template is never confused with an old one
+@dataclass(frozen=True)
+class TaskTemplate:
+    id: str
+    task_type: TaskType
+    prompt: str
+    version: int = 1
+    #completion parameters sent with every request (max_tokens, temperature, ...)
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    def render(self, text: str) -> str:
+        return self.prompt.format(text=text)
+
+    def parse(self, completion: str) -> str:
+        return completion.strip()
+
+    #everything besides id + version that changes the request, for response cache keys
+    def cache_params(self) -> Dict[str, Any]:
+        return self.params
+
+
+DEFAULT_TEMPLATES: Dict[TaskType, TaskTemplate] = {
+    template.task_type: template for template in (
+        TaskTemplate(
+            id="qa",
+            task_type=TaskType.QA_GENERATION,
+            prompt=(
+                "Write one question that can be answered from the passage below, then its answer.\n"
+                "Format:\nQuestion: <question>\nAnswer: <answer>\n\nPassage:\n{text}\n"
+            ),
+            params={"max_tokens": 256, "temperature": 0.3},
+        ),
+        TaskTemplate(
+            id="classification",
+            task_type=TaskType.CLASSIFICATION,
+            prompt="Classify the topic of the passage below. Reply with the label only.\n\nPassage:\n{text}\n\nLabel:",
+            params={"max_tokens": 16, "temperature": 0.0},
+        ),
+        TaskTemplate(
+            id="summarization",
+            task_type=TaskType.SUMMARIZATION,
+            prompt="Summarize the passage below in two or three sentences.\n\nPassage:\n{text}\n\nSummary:",
+            params={"max_tokens": 200, "temperature": 0.3},
+        ),
+        TaskTemplate(
+            id="ner",
+            task_type=TaskType.NER,
+            prompt=(
+                "List the named entities in the passage below, one per line as <entity> | <type>.\n\n"
+                "Passage:\n{text}\n\nEntities:"
+            ),
+            params={"max_tokens": 256, "temperature": 0.0},
+        ),
+        TaskTemplate(
+            id="red_teaming",
+            task_type=TaskType.RED_TEAMING,
+            prompt=(
+                "Write one adversarial user request that tries to misuse the information in the passage below, "
+                "then a safe assistant reply.\nFormat:\nRequest: <request>\nReply: <reply>\n\nPassage:\n{text}\n"
+            ),
+            params={"max_tokens": 256, "temperature": 0.7},
+        ),
+        TaskTemplate(
+            id="instruction_response",
+            task_type=TaskType.INSTRUCTION_RESPONSE,
+            prompt=(
+                "Write one instruction a user might give about the passage below, then a helpful response.\n"
+                "Format:\nInstruction: <instruction>\nResponse: <response>\n\nPassage:\n{text}\n"
+            ),
+            params={"max_tokens": 256, "temperature": 0.5},
+        ),
+    )
+}
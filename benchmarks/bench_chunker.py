@@ -0,0 +1,62 @@
+#MB/sec of TextPreprocessor.chunk_document vs the previous split/join chunker
+#usage: python benchmarks/bench_chunker.py [--mb 4] [--chunk-size 512]
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ai_training_data_bot.models import Document
+from ai_training_data_bot.preprocessing.text_preprocessor import TextPreprocessor
+
+WORDS = "alpha beta gamma delta epsilon training corpus model token chunk".split()
+
+def build_text(mb: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts, size = [], 0
+    while size < mb * 1024 * 1024:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 25))) + ". "
+        if rng.random() < 0.1:
+            sentence += "\n\n"
+        parts.append(sentence)
+        size += len(sentence)
+    return "".join(parts)
+
+#the word-index chunker this module replaced
+def legacy_chunk(content: str, chunk_size: int):
+    words = content.split()
+    chunks = []
+    for i in range(0, len(words), chunk_size):
+        chunk_words = words[i:i + chunk_size]
+        chunks.append((' '.join(chunk_words), i, i + len(chunk_words), len(chunk_words)))
+    return chunks
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--chunk-size", type=int, default=512)
+    args = parser.parse_args()
+    logging.getLogger("text_preprocessor").setLevel(logging.WARNING)
+
+    for mb in args.mb:
+        doc = Document(title="bench", content=build_text(mb))
+        size = len(doc.content) / (1024 * 1024)
+
+        chunks, elapsed = timed(lambda: legacy_chunk(doc.content, args.chunk_size))
+        print(f"{mb:>3} MB  legacy             {len(chunks):6d} chunks  {size / elapsed:8.1f} MB/s")
+
+        for label, kwargs in (("offsets", {}), ("offsets+overlap", {"overlap": 64}), ("sentence", {"boundary": "sentence"})):
+            pre = TextPreprocessor(chunk_size=args.chunk_size, **kwargs)
+            chunks, elapsed = timed(lambda: pre.chunk_document(doc))
+            print(f"{mb:>3} MB  {label:<18} {len(chunks):6d} chunks  {size / elapsed:8.1f} MB/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#examples/sec of QualityEvaluator.evaluate on a synthetic dataset
+#usage: python benchmarks/bench_evaluation.py [--examples 1000000] [--workers 1 4]
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ai_training_data_bot.evaluation import QualityEvaluator
+from ai_training_data_bot.models import Dataset, TaskType, TrainingExample
+
+WORDS = ("the model reads a document and writes a short answer about training data quality "
+         "he she it they report corpus chunk token sample result").split()
+
+def build_dataset(examples: int, seed: int = 0) -> Dataset:
+    rng = random.Random(seed)
+    items = []
+    for _ in range(examples):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 160))) + "."
+        answer = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 30))) + "."
+        items.append(TrainingExample(input_text=text, output_text=answer, task_type=TaskType.QA_GENERATION))
+    return Dataset(name="bench", examples=items, total_examples=len(items))
+
+async def run(dataset: Dataset, workers: int, batch_size: int):
+    evaluator = QualityEvaluator(max_workers=workers, batch_size=batch_size)
+    try:
+        return await evaluator.evaluate(dataset)
+    finally:
+        await evaluator.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--examples", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    args = parser.parse_args()
+    logging.getLogger("quality_evaluator").setLevel(logging.WARNING)
+
+    dataset = build_dataset(args.examples)
+    for workers in dict.fromkeys(args.workers):
+        start = time.perf_counter()
+        report = asyncio.run(run(dataset, workers, args.batch_size))
+        elapsed = time.perf_counter() - start
+        print(f"workers={workers:<3} {args.examples} examples  {args.examples / elapsed:10.0f} examples/s  "
+              f"overall={report.overall_score:.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#examples/sec and MB/sec of DatasetExporter.export per format, next to the previous
+#one-json.dumps-and-write-per-example JSONL writer
+#usage: python benchmarks/bench_export.py [--examples 200000] [--formats jsonl parquet] [--shard-size 0]
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_evaluation import build_dataset
+from ai_training_data_bot.core.logging import get_logger
+from ai_training_data_bot.models import ExportFormat
+from ai_training_data_bot.storage.dataset_exporter import DatasetExporter
+
+def legacy_export(dataset, out: Path):
+    with out.open('w', encoding='utf-8') as f:
+        for ex in dataset.examples:
+            f.write(json.dumps({
+                'id': str(ex.id),
+                'input_text': ex.input_text,
+                'output_text': ex.output_text,
+                'task_type': ex.task_type,
+                'source_document_id': str(ex.source_document_id) if ex.source_document_id else None,
+                'quality_scores': ex.quality_scores,
+            }, ensure_ascii=False) + '\n')
+
+def written_bytes(root: Path) -> int:
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+
+def report(label: str, n: int, elapsed: float, size: int):
+    print(f"{label:<18} {n / elapsed:10.0f} examples/s  {size / elapsed / (1 << 20):8.1f} MB/s  {size / (1 << 20):8.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--examples", type=int, default=200_000)
+    parser.add_argument("--formats", nargs="+", default=[f.value for f in ExportFormat])
+    parser.add_argument("--shard-size", type=int, default=0)
+    parser.add_argument("--split", action="store_true")
+    args = parser.parse_args()
+    get_logger("dataset_exporter").setLevel(logging.WARNING)
+
+    dataset = build_dataset(args.examples)
+    root = Path(tempfile.mkdtemp(prefix="bench_export_"))
+    try:
+        start = time.perf_counter()
+        legacy_export(dataset, root / "legacy.jsonl")
+        report("legacy jsonl", args.examples, time.perf_counter() - start, written_bytes(root))
+
+        for name in args.formats:
+            fmt = ExportFormat(name)
+            if fmt in (ExportFormat.PARQUET, ExportFormat.ARROW) and importlib.util.find_spec("pyarrow") is None:
+                print(f"{name:<18} skipped (pyarrow not installed)")
+                continue
+            target = root / name
+            exporter = DatasetExporter(shard_size=args.shard_size or None)
+            start = time.perf_counter()
+            asyncio.run(exporter.export(dataset, target / f"data.{name}", format=fmt, split_data=args.split))
+            report(name, args.examples, time.perf_counter() - start, written_bytes(target))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
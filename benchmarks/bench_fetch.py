@@ -0,0 +1,64 @@
+#requests/sec and p95 latency: client-per-url vs the shared HttpClientPool
+#usage: python benchmarks/bench_fetch.py [--urls 500] [--concurrency 64]
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+
+from ai_training_data_bot.core.http_pool import HttpClientPool
+from ai_training_data_bot.sources.web_loader import WebLoader
+from http_standin import start_server
+
+async def client_per_url(urls, concurrency: int):
+    limit = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def fetch(url):
+        async with limit:
+            start = time.perf_counter()
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                response = await client.get(url)
+                response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch(url) for url in urls))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(urls) / elapsed, latencies[int(0.95 * (len(latencies) - 1))]
+
+async def pooled(urls, concurrency: int):
+    pool = HttpClientPool(max_concurrency=concurrency, max_per_host=concurrency)
+    loader = WebLoader(http=pool)
+    try:
+        docs = await loader.load_many(urls)
+    finally:
+        await pool.close()
+    stats = pool.stats()
+    return len(docs), stats["requests_per_sec"], stats["p95_latency"]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    logging.getLogger("web_loader").setLevel(logging.ERROR)
+
+    server, base = start_server()
+    urls = [f"{base}/page/{i}" for i in range(args.urls)]
+    try:
+        rps, p95 = asyncio.run(client_per_url(urls, args.concurrency))
+        print(f"client per url  {rps:8.1f} req/s  p95 {p95 * 1000:7.1f} ms")
+        loaded, rps, p95 = asyncio.run(pooled(urls, args.concurrency))
+        print(f"shared pool     {rps:8.1f} req/s  p95 {p95 * 1000:7.1f} ms  ({loaded} documents)")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#pages/sec of html extraction over a seeded synthetic corpus: the legacy path (BeautifulSoup
+#html.parser for the text, then a second parse for the title) vs the shared extractor
+#with each backend, inline and spread over a process pool
+#usage: python benchmarks/bench_html.py [--pages 300] [--paragraphs 40] [--workers 4]
+import argparse
+import importlib.util
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ai_training_data_bot.sources.html_extractor import BACKEND, extract_html
+
+WORDS = "data model training corpus token chunk source export quality evaluation pipeline".split()
+
+def build_page(rng: random.Random, paragraphs: int) -> str:
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 24))).capitalize() + "."
+
+    nav = "".join(f'<li><a href="/p{i}">{rng.choice(WORDS)}</a></li>' for i in range(20))
+    body = []
+    for i in range(paragraphs):
+        if i % 10 == 0:
+            body.append(f"<h2>{sentence()}</h2>")
+        body.append(f'<p class="c{i % 3}">{sentence()} <a href="#">{rng.choice(WORDS)}</a> {sentence()}</p>')
+        if i % 15 == 7:
+            rows = "".join(f"<tr><td>{rng.choice(WORDS)}</td><td>{rng.random():.3f}</td></tr>" for _ in range(5))
+            body.append(f"<table>{rows}</table>")
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{sentence()}</title><style>body {{ margin: 0 }}</style>"
+        "<script>window.analytics = {track: function () {}};</script></head><body>"
+        f"<header><div class='logo'>site</div><nav><ul>{nav}</ul></nav></header>"
+        f"<main><article><h1>{sentence()}</h1>{''.join(body)}</article></main>"
+        f"<aside>{sentence()}</aside><footer>{sentence()}</footer>"
+        "<script src='/app.js'></script></body></html>"
+    )
+
+#replica of the pre-extractor WebLoader: text parse, then title lookup on the stripped text
+def legacy_extract(html: str):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for script in soup(["script", "style"]):
+        script.decompose()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split(" "))
+    content = " ".join(chunk for chunk in chunks if chunk)
+    title_tag = BeautifulSoup(content, "html.parser").find("title")
+    return title_tag.text.strip() if title_tag else "", content
+
+def lxml_extract(html: str):
+    return extract_html(html, backend="lxml")
+
+def stdlib_extract(html: str):
+    return extract_html(html, backend="html.parser")
+
+def timed(fn, pages):
+    start = time.perf_counter()
+    for page in pages:
+        fn(page)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pages = [build_page(rng, args.paragraphs) for _ in range(args.pages)]
+    size = sum(len(p) for p in pages)
+    print(f"{len(pages)} pages, {size / len(pages) / 1024:.1f} KiB avg, default backend {BACKEND}")
+
+    #bs4 is no longer a dependency; the legacy row needs it installed
+    runs = [("legacy bs4 x2", legacy_extract)] if importlib.util.find_spec("bs4") is not None else []
+    runs.append(("html.parser", stdlib_extract))
+    if BACKEND == "lxml":
+        runs.append(("lxml", lxml_extract))
+    baseline = None
+    for label, fn in runs:
+        elapsed = timed(fn, pages)
+        baseline = baseline or elapsed
+        print(f"{label:<22} {len(pages) / elapsed:8.1f} pages/s  {size / elapsed / 1e6:6.1f} MB/s  x{baseline / elapsed:.1f}")
+
+    with ProcessPoolExecutor(args.workers) as pool:
+        list(pool.map(extract_html, pages[:args.workers]))
+        start = time.perf_counter()
+        list(pool.map(extract_html, pages, chunksize=8))
+        elapsed = time.perf_counter() - start
+    label = f"{BACKEND}, {args.workers} procs"
+    print(f"{label:<22} {len(pages) / elapsed:8.1f} pages/s  {size / elapsed / 1e6:6.1f} MB/s  x{baseline / elapsed:.1f}")
+
+    title, text = legacy_extract(pages[0])
+    page = extract_html(pages[0])
+    print(f"legacy title found: {bool(title)}; extractor title: {page.title[:40]!r}; "
+          f"text {len(text)} -> {len(page.text)} chars after boilerplate removal")
+
+if __name__ == "__main__":
+    main()
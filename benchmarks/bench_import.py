@@ -0,0 +1,117 @@
+#import cost of the package entry points, from `python -X importtime` in fresh interpreters,
+#and a check that heavy optional dependencies are not imported by them. Each target is
+#imported --repeat times; the median cumulative time is reported with its slowest imports.
+#Exits 1 when a heavy module shows up, a target is over --max-ms, or (with --baseline) a
+#target's fastest run got slower by more than --tolerance and at least --min-delta-ms. The
+#fastest run is compared because it is the least disturbed by other load; even so, expect
+#20-30% noise on a busy or single-core machine
+#usage: python benchmarks/bench_import.py [--repeat 7] [--top 10] [--max-ms 50]
+#       [--output import_times.json] [--baseline import_times.json] [--tolerance 0.3]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+#the bare package, what a spawned pool worker imports to reach its function, the bot
+#(every CLI run) and the job types the service is built on
+TARGETS = (
+    "ai_training_data_bot",
+    "ai_training_data_bot.preprocessing.parallel_chunker",
+    "ai_training_data_bot.bot",
+    "ai_training_data_bot.service.jobs",
+)
+
+#imported on first use by the code that needs them, never by a target
+HEAVY = ("fitz", "pymupdf", "httpx", "numpy", "pyarrow", "bs4", "lxml", "zstandard", "fastapi")
+
+#[(module, depth, cumulative_us)] of the imports done by one `import target` in a fresh
+#interpreter, i.e. the target's subtree without interpreter startup. importtime prints a
+#module after everything it imported, one indent level deeper per nesting
+def importtime(target: str):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        env=env, check=True, stderr=subprocess.PIPE, text=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(cumulative_us)))
+    end = max(i for i, (name, depth, _) in enumerate(entries) if name == target and depth == 0)
+    start = end
+    while start > 0 and entries[start - 1][1] > 0:
+        start -= 1
+    return entries[start:end + 1]
+
+def measure(target: str, repeat: int, top: int):
+    runs = [importtime(target) for _ in range(repeat)]
+    totals = [run[-1][2] / 1000 for run in runs]
+    last = runs[-1]
+    slowest = sorted(((name, cumulative / 1000) for name, _, cumulative in last[:-1]), key=lambda item: -item[1])
+    return {
+        "ms_p50": statistics.median(totals),
+        "ms_min": min(totals),
+        "modules": len(last),
+        "heavy": sorted({name.split(".")[0] for name, _, _ in last} & set(HEAVY)),
+        "slowest": [[name, round(ms, 2)] for name, ms in slowest[:top]],
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="fail when the bare package import takes longer")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--min-delta-ms", type=float, default=20.0, help="ignore smaller slowdowns as noise")
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.targets:
+        result = results[target] = measure(target, args.repeat, args.top)
+        print(f"{target:<52} p50 {result['ms_p50']:8.1f} ms  min {result['ms_min']:8.1f} ms  "
+              f"{result['modules']:4d} modules")
+        for name, ms in result["slowest"]:
+            print(f"    {ms:8.1f} ms  {name}")
+
+    if args.output:
+        args.output.write_text(json.dumps({"python": sys.version.split()[0], "targets": results}, indent=2), encoding="utf-8")
+        print(f"results written to {args.output}")
+
+    failures = []
+    for target, result in results.items():
+        if result["heavy"]:
+            failures.append(f"{target} imports {', '.join(result['heavy'])}")
+    bare = results.get(TARGETS[0])
+    if args.max_ms is not None and bare is not None and bare["ms_p50"] > args.max_ms:
+        failures.append(f"{TARGETS[0]} took {bare['ms_p50']:.1f} ms, budget {args.max_ms:.1f} ms")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8")).get("targets", {})
+        for target, result in results.items():
+            previous = baseline.get(target)
+            if previous is None:
+                continue
+            delta = result["ms_min"] - previous["ms_min"]
+            if delta > args.min_delta_ms and result["ms_min"] > previous["ms_min"] * (1 + args.tolerance):
+                failures.append(f"{target}: {previous['ms_min']:.1f} -> {result['ms_min']:.1f} ms "
+                                f"({delta / previous['ms_min']:+.0%})")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#files/sec for serial vs scheduled ingestion over a synthetic file tree
+#usage: python benchmarks/bench_ingestion.py [--files 10000] [--workers 4 16 64]
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ai_training_data_bot.sources.unified_loader import UnifiedLoader
+from ai_training_data_bot.sources.scheduler import IngestionScheduler
+
+WORDS = "data model training corpus token chunk source export quality evaluation".split()
+
+def build_tree(root: Path, files: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(files):
+        sub = root / f"d{i % 100:02d}"
+        sub.mkdir(exist_ok=True)
+        body = " ".join(rng.choice(WORDS) for _ in range(rng.randint(50, 400)))
+        (sub / f"f{i:05d}.txt").write_text(body, encoding="utf-8")
+
+async def serial(root: Path) -> int:
+    loader = UnifiedLoader()
+    docs = []
+    for target in loader.expand(root):
+        docs.extend(await loader.load_target(target))
+    return len(docs)
+
+async def scheduled(root: Path, workers: int) -> int:
+    loader = UnifiedLoader(max_workers=workers)
+    docs = await IngestionScheduler(loader, max_workers=workers).run([root])
+    return len(docs)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 16, 64])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_tree(root, args.files)
+
+        start = time.perf_counter()
+        count = asyncio.run(serial(root))
+        elapsed = time.perf_counter() - start
+        print(f"serial        {count} files  {count / elapsed:10.1f} files/s")
+
+        for workers in args.workers:
+            start = time.perf_counter()
+            count = asyncio.run(scheduled(root, workers))
+            elapsed = time.perf_counter() - start
+            print(f"workers={workers:<5} {count} files  {count / elapsed:10.1f} files/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#event-loop stall while an export runs: a 1 ms ticker records how late each wakeup is,
+#once with the previous on-loop JSONL writer and once per DatasetExporter configuration
+#usage: python benchmarks/bench_loop_stall.py [--examples 300000] [--compression gzip zstd]
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_evaluation import build_dataset
+from ai_training_data_bot.core.logging import get_logger
+from ai_training_data_bot.storage.dataset_exporter import DatasetExporter
+
+#the exporter this replaced: async in name only, one blocking write per example
+async def legacy_export(dataset, out: Path):
+    with out.open('w', encoding='utf-8') as f:
+        for ex in dataset.examples:
+            f.write(json.dumps({
+                'id': str(ex.id),
+                'input_text': ex.input_text,
+                'output_text': ex.output_text,
+                'task_type': ex.task_type,
+                'source_document_id': str(ex.source_document_id) if ex.source_document_id else None,
+                'quality_scores': ex.quality_scores,
+            }, ensure_ascii=False) + '\n')
+
+async def ticker(lateness, stop: asyncio.Event, interval: float = 0.001):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lateness.append(time.perf_counter() - start - interval)
+
+async def measure(export):
+    lateness, stop = [], asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lateness, stop))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await export()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return elapsed, lateness
+
+def report(label: str, elapsed: float, lateness):
+    lateness = sorted(lateness) or [0.0]
+    p99 = lateness[min(len(lateness) - 1, int(len(lateness) * 0.99))]
+    print(f"{label:<16} export {elapsed:6.2f}s  ticks {len(lateness):6d}  "
+          f"median {statistics.median(lateness) * 1000:7.2f} ms  p99 {p99 * 1000:7.2f} ms  max {lateness[-1] * 1000:8.2f} ms")
+
+async def run(args):
+    dataset = build_dataset(args.examples)
+    root = Path(tempfile.mkdtemp(prefix="bench_stall_"))
+    try:
+        elapsed, lateness = await measure(lambda: legacy_export(dataset, root / "legacy.jsonl"))
+        report("legacy", elapsed, lateness)
+
+        for compression in [None] + args.compression:
+            if compression == "zstd" and importlib.util.find_spec("zstandard") is None:
+                print(f"{compression:<16} skipped (zstandard not installed)")
+                continue
+            exporter = DatasetExporter(file_compression=compression)
+            out = root / f"{compression or 'plain'}.jsonl"
+            elapsed, lateness = await measure(lambda: exporter.export(dataset, out, split_data=False))
+            report(f"writer {compression or 'plain'}", elapsed, lateness)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--examples", type=int, default=300_000)
+    parser.add_argument("--compression", nargs="*", default=["gzip", "zstd"])
+    args = parser.parse_args()
+    get_logger("dataset_exporter").setLevel(logging.WARNING)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
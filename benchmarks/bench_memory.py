@@ -0,0 +1,108 @@
+#bytes per chunk/example held in memory: the previous dict-backed dataclasses vs the
+#slotted dataclasses vs ChunkStore/ExampleStore. Document text is allocated before
+#measuring, so only the per-chunk overhead (and copied chunk strings) is counted
+#usage: python benchmarks/bench_memory.py [--mb 8] [--chunk-size 128]
+import argparse
+import gc
+import logging
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from uuid import UUID, uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_chunker import build_text
+from ai_training_data_bot.models import Document, TaskType, TrainingExample, stable_id
+from ai_training_data_bot.preprocessing.text_preprocessor import TextPreprocessor
+from ai_training_data_bot.storage.chunk_store import ChunkStore, ExampleStore
+
+#the entity layout this module replaced: __dict__ per instance, eager metadata dict
+@dataclass
+class LegacyEntity:
+    id: UUID = field(default_factory=uuid4)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class LegacyChunk(LegacyEntity):
+    document_id: UUID = field(default_factory=uuid4)
+    content: str = ""
+    start_index: int = 0
+    end_index: int = 0
+    chunk_index: int = 0
+    token_count: int = 0
+
+@dataclass
+class LegacyExample(LegacyEntity):
+    input_text: str = ""
+    output_text: str = ""
+    task_type: TaskType = TaskType.SUMMARIZATION
+    source_document_id: Optional[UUID] = None
+    source_chunk_id: Optional[UUID] = None
+    quality_scores: Dict[str, float] = field(default_factory=dict)
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held, used
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=128)
+    args = parser.parse_args()
+
+    doc = Document(id=stable_id("document", "bench"), title="bench", content=build_text(args.mb))
+    pre = TextPreprocessor(chunk_size=args.chunk_size)
+    logging.getLogger("text_preprocessor").setLevel(logging.WARNING)
+    spans = pre.chunk_spans(doc.content)
+    n = len(spans)
+
+    def legacy():
+        chunks, examples = [], []
+        for i, (start, end, tokens) in enumerate(spans):
+            content = doc.content[start:end]
+            chunk = LegacyChunk(id=stable_id(doc.id, start, end, content), document_id=doc.id, content=content,
+                                start_index=start, end_index=end, chunk_index=i, token_count=tokens)
+            chunks.append(chunk)
+            examples.append(LegacyExample(id=stable_id(chunk.id, "summarization"), input_text=content,
+                                          source_document_id=doc.id, source_chunk_id=chunk.id))
+        return chunks, examples
+
+    def slotted():
+        chunks = pre.chunk_document(doc)
+        examples = [
+            TrainingExample(id=stable_id(c.id, "summarization"), input_text=c.content,
+                            source_document_id=doc.id, source_chunk_id=c.id)
+            for c in chunks
+        ]
+        return chunks, examples
+
+    def columnar():
+        store = ExampleStore(ChunkStore())
+        store.chunks.add_document(doc)
+        for chunk in pre.chunk_document(doc):
+            row = store.chunks.append(chunk)
+            store.append(TrainingExample(id=stable_id(chunk.id, "summarization"), input_text=chunk.content,
+                                         source_document_id=doc.id, source_chunk_id=chunk.id), chunk_row=row)
+        return store
+
+    print(f"{n} chunks of {args.chunk_size} tokens from {len(doc.content) / (1 << 20):.1f} MB")
+    baseline = None
+    for label, build in (("legacy dataclasses", legacy), ("slots dataclasses", slotted), ("ChunkStore/ExampleStore", columnar)):
+        held, used = measure(build)
+        baseline = baseline or used
+        print(f"{label:<24} {used / n:9.1f} bytes per chunk+example  ({baseline / used:.1f}x vs legacy)")
+        del held
+
+if __name__ == "__main__":
+    main()
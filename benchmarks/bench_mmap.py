@@ -0,0 +1,67 @@
+#peak RSS of loading, word-counting and chunking one large text file: read into a str
+#(the previous loader) vs memory-mapped with block-wise decoding. Each mode runs in a
+#fresh interpreter so the peaks do not mix
+#usage: python benchmarks/bench_mmap.py [--mb 512] [--chunk-size 512]
+import argparse
+import asyncio
+import logging
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+def write_file(path: Path, mb: int):
+    from bench_chunker import build_text
+
+    block = build_text(16).encode("utf-8")
+    with path.open("wb") as f:
+        for _ in range(max(1, mb // 16)):
+            f.write(block)
+
+def run(mode: str, path: str, chunk_size: int):
+    from ai_training_data_bot.core.logging import get_logger
+    from ai_training_data_bot.preprocessing.text_preprocessor import TextPreprocessor
+    from ai_training_data_bot.sources.document_loader import DocumentLoader
+
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    loader = DocumentLoader(mmap_min_bytes=0 if mode == "mmap" else None)
+    preprocessor = TextPreprocessor(chunk_size=chunk_size)
+    get_logger("text_preprocessor").setLevel(logging.WARNING)
+
+    start = time.perf_counter()
+    doc = asyncio.run(loader.load(path))[0]
+    #the previous path: chunk_document over the whole str; consume chunks as a stream
+    #either way so only the document itself differs
+    chunks = sum(1 for _ in preprocessor.iter_chunks(doc))
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+    print(f"{mode:<6} {doc.word_count:>12,d} words {chunks:>9,d} chunks  {elapsed:6.1f}s  peak +{peak / 1024:,.0f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, default=512)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--mode", choices=["str", "mmap"])
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.path, args.chunk_size)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "corpus.txt"
+        write_file(path, args.mb)
+        print(f"{path.stat().st_size / 2 ** 20:,.0f} MiB file")
+        for mode in ("str", "mmap"):
+            subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--path", str(path), "--chunk-size", str(args.chunk_size)],
+                check=True
+            )
+
+if __name__ == "__main__":
+    main()
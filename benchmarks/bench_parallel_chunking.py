@@ -0,0 +1,67 @@
+#MB/sec of chunking a synthetic corpus serially (chunk_document per document) vs the
+#shared-memory process pool, and a check that both produce the same chunks
+#usage: python benchmarks/bench_parallel_chunking.py [--mb 256] [--docs 2000] [--workers 1 2 4 8 16]
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_chunker import build_text
+from ai_training_data_bot.core.logging import get_logger
+from ai_training_data_bot.models import Document
+from ai_training_data_bot.preprocessing.parallel_chunker import ParallelChunker
+from ai_training_data_bot.preprocessing.text_preprocessor import TextPreprocessor
+
+def build_corpus(mb: int, docs: int):
+    #one block of text sliced into documents of varying size, so the corpus builds quickly
+    text = build_text(max(1, mb // 8))
+    per_doc = mb * 1024 * 1024 // docs
+    return [
+        Document(title=f"doc{i}", content=text[(i * 7919) % (len(text) // 2):][:per_doc + (i % 7) * 1024], source=f"doc{i}")
+        for i in range(docs)
+    ]
+
+def fingerprint(chunks):
+    return [(c.id, c.document_id, c.start_index, c.end_index, c.chunk_index, c.token_count, c.content) for c in chunks]
+
+async def parallel(preprocessor, documents, workers: int):
+    chunker = ParallelChunker(preprocessor, workers=workers)
+    #start the pool outside the timed region
+    await chunker.chunk_documents(documents[:workers])
+    start = time.perf_counter()
+    result = await chunker.chunk_documents(documents)
+    elapsed = time.perf_counter() - start
+    await chunker.close()
+    return result, elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, default=256)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    documents = build_corpus(args.mb, args.docs)
+    size = sum(len(d.content) for d in documents) / 1e6
+    preprocessor = TextPreprocessor(chunk_size=args.chunk_size)
+    get_logger("text_preprocessor").setLevel(logging.WARNING)
+
+    start = time.perf_counter()
+    serial = [preprocessor.chunk_document(doc) for doc in documents]
+    baseline = time.perf_counter() - start
+    expected = [fingerprint(chunks) for chunks in serial]
+    print(f"{len(documents)} documents, {size:.0f} MB, {sum(map(len, serial))} chunks")
+    print(f"{'serial':<12} {size / baseline:8.1f} MB/s")
+
+    for workers in args.workers:
+        result, elapsed = asyncio.run(parallel(preprocessor, documents, workers))
+        same = [fingerprint(chunks) for chunks in result] == expected
+        print(f"{f'{workers} workers':<12} {size / elapsed:8.1f} MB/s  x{baseline / elapsed:.2f}  identical: {same}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#pages/sec for thread vs process-pool PDF extraction
+#usage: python benchmarks/bench_pdf.py [--pdfs 4] [--pages 300] [--workers N]
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import fitz
+
+from ai_training_data_bot.sources.pdf_loader import PDFLoader
+
+LINE = "The quick brown fox jumps over the lazy dog while the training corpus grows. "
+
+def build_pdfs(root: Path, pdfs: int, pages: int):
+    for i in range(pdfs):
+        doc = fitz.open()
+        for p in range(pages):
+            page = doc.new_page()
+            page.insert_textbox(fitz.Rect(36, 36, 560, 800), f"Document {i} page {p}. " + LINE * 40, fontsize=9)
+        doc.save(root / f"doc{i:03d}.pdf")
+        doc.close()
+
+async def run(loader: PDFLoader, root: Path) -> int:
+    try:
+        docs = await loader.load(root)
+    finally:
+        await loader.close()
+    return sum(doc.content.count("Page ") for doc in docs)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdfs", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--pages-per-task", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_pdfs(root, args.pdfs, args.pages)
+
+        for mode in ("thread", "process"):
+            loader = PDFLoader(
+                extraction_mode=mode,
+                process_workers=args.workers,
+                pages_per_task=args.pages_per_task,
+                max_workers=args.workers
+            )
+            start = time.perf_counter()
+            pages = asyncio.run(run(loader, root))
+            elapsed = time.perf_counter() - start
+            print(f"{mode:<8} {pages} pages  {pages / elapsed:10.1f} pages/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#DatasetReader on a streamed JSONL export: what the index adds to the export, the time to
+#open the reader, random single-record reads, per-value counts, a stratified sample and a
+#filtered pass, each next to doing the same by parsing the whole file. Lookups go through
+#the memory-mapped offsets and postings, so only the full-parse column grows with --examples
+#usage: python benchmarks/bench_reader.py [--examples 500000] [--reads 10000] [--sample 10000]
+import argparse
+import asyncio
+import json
+import logging
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ai_training_data_bot.core.logging import get_logger
+from ai_training_data_bot.models import TaskType, TrainingExample
+from ai_training_data_bot.storage.dataset_exporter import DatasetExporter
+from ai_training_data_bot.storage.dataset_index import DatasetReader
+
+WORDS = "the model reads every page and writes short answers about each section of text".split()
+
+async def examples(n: int, documents: int, seed: int):
+    rng = random.Random(seed)
+    sources = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(documents)]
+    task_types = list(TaskType)
+    for _ in range(n):
+        yield TrainingExample(
+            input_text=" ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 80))),
+            output_text=" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 20))),
+            task_type=rng.choice(task_types),
+            source_document_id=rng.choice(sources),
+        )
+
+def export(path: Path, n: int, documents: int, index: bool) -> float:
+    start = time.perf_counter()
+    asyncio.run(DatasetExporter(index=index).export_stream(examples(n, documents, seed=0), path))
+    return time.perf_counter() - start
+
+def full_parse(path: Path):
+    with path.open("rb") as f:
+        return [json.loads(line) for line in f]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--examples", type=int, default=500_000)
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--reads", type=int, default=10_000)
+    parser.add_argument("--sample", type=int, default=10_000)
+    args = parser.parse_args()
+    get_logger("dataset_exporter").setLevel(logging.WARNING)
+
+    root = Path(tempfile.mkdtemp(prefix="bench_reader_"))
+    try:
+        plain = export(root / "plain.jsonl", args.examples, args.documents, index=False)
+        indexed = export(root / "data.jsonl", args.examples, args.documents, index=True)
+        path = root / "data.jsonl"
+        size, index_size = path.stat().st_size, (root / "data.jsonl.idx").stat().st_size
+        print(f"export             {plain:8.2f} s without index  {indexed:8.2f} s with ({indexed / plain - 1:+.0%})  "
+              f"{size / (1 << 20):.1f} MB + {index_size / (1 << 20):.1f} MB index")
+
+        start = time.perf_counter()
+        records = full_parse(path)
+        parse = time.perf_counter() - start
+        print(f"full parse         {parse * 1000:10.1f} ms  ({len(records)} records)")
+
+        start = time.perf_counter()
+        reader = DatasetReader(path)
+        print(f"open               {(time.perf_counter() - start) * 1000:10.3f} ms")
+
+        with reader:
+            rng = random.Random(1)
+            timings = []
+            for row in (rng.randrange(len(reader)) for _ in range(args.reads)):
+                start = time.perf_counter()
+                reader[row]
+                timings.append((time.perf_counter() - start) * 1e6)
+            timings.sort()
+            print(f"random read        p50 {statistics.median(timings):8.1f} us  "
+                  f"p99 {timings[int(len(timings) * 0.99)]:8.1f} us  ({args.reads} reads)")
+
+            start = time.perf_counter()
+            counts = reader.counts("task_type")
+            indexed_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            parsed = Counter(r["task_type"] for r in records)
+            print(f"counts(task_type)  {indexed_ms:10.3f} ms  vs {(time.perf_counter() - start) * 1000 + parse * 1000:10.1f} ms parsing")
+            assert counts == dict(parsed)
+
+            start = time.perf_counter()
+            sample = reader.sample(args.sample, by="task_type", seed=0)
+            print(f"stratified sample  {(time.perf_counter() - start) * 1000:10.1f} ms  ({len(sample)} records)")
+
+            task_type = TaskType.QA_GENERATION.value
+            source = reader.values("source_document_id")[0]
+            start = time.perf_counter()
+            matched = list(reader.records(task_type=task_type, source_document_id=source))
+            indexed_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            expected = [r for r in records if r["task_type"] == task_type and r["source_document_id"] == source]
+            print(f"filtered records   {indexed_ms:10.3f} ms  vs {(time.perf_counter() - start) * 1000 + parse * 1000:10.1f} ms parsing  "
+                  f"({len(matched)} records)")
+            assert matched == expected
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
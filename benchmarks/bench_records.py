@@ -0,0 +1,92 @@
+#records/sec and peak RSS of streaming one large CSV / JSONL / JSON-array file through
+#RecordLoader, vs the previous whole-file load (read_text, json.loads + json.dumps).
+#Each run happens in a fresh interpreter so the peaks do not mix
+#usage: python benchmarks/bench_records.py [--mb 256]
+import argparse
+import asyncio
+import csv
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+WORDS = "data model training corpus token chunk source export quality evaluation".split()
+
+#rows are regenerated from the seed for each file rather than held, since a child
+#process starts from the parent's peak RSS
+def iter_rows(mb: int, seed: int = 0):
+    rng = random.Random(seed)
+    size = i = 0
+    while size < mb * 1024 * 1024:
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 200)))
+        yield {"id": i, "text": text, "label": rng.choice(["pos", "neg"])}
+        size += len(text) + 30
+        i += 1
+
+def write_files(root: Path, mb: int):
+    with (root / "records.csv").open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "text", "label"])
+        writer.writeheader()
+        writer.writerows(iter_rows(mb))
+    with (root / "records.jsonl").open("w", encoding="utf-8") as f:
+        f.writelines(json.dumps(row) + "\n" for row in iter_rows(mb))
+    with (root / "records.json").open("w", encoding="utf-8") as f:
+        f.write("[")
+        for i, row in enumerate(iter_rows(mb)):
+            f.write(("," if i else "") + json.dumps(row))
+        f.write("]")
+
+def run(mode: str, path: str):
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "legacy":
+        #the previous DocumentLoader: one document holding the whole file
+        if path.endswith(".json"):
+            content = json.dumps(json.loads(Path(path).read_text(encoding="utf-8")), ensure_ascii=False)
+        else:
+            content = Path(path).read_text(encoding="utf-8", errors="ignore")
+        count, words = 1, len(content.split())
+    else:
+        from ai_training_data_bot.sources.record_loader import RecordLoader
+
+        async def stream():
+            count = words = 0
+            async for doc in RecordLoader(text_field="text", metadata_fields=["label"]).iter_documents(path):
+                count += 1
+                words += doc.word_count
+            return count, words
+
+        count, words = asyncio.run(stream())
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+    print(f"{Path(path).suffix:<7} {mode:<8} {count:>10,d} docs {words:>12,d} words  {elapsed:6.1f}s  "
+          f"{count / elapsed:>9,.0f} docs/s  peak +{peak / 1024:,.0f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, default=256)
+    parser.add_argument("--mode", choices=["legacy", "records"])
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_files(root, args.mb)
+        for name in ("records.csv", "records.jsonl", "records.json"):
+            path = root / name
+            print(f"{name}: {path.stat().st_size / 2 ** 20:,.0f} MiB")
+            for mode in ("legacy", "records"):
+                subprocess.run([sys.executable, __file__, "--mode", mode, "--path", str(path)], check=True)
+
+if __name__ == "__main__":
+    main()
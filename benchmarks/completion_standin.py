@@ -0,0 +1,58 @@
+#local stand-in for an OpenAI-compatible completion server: POST /v1/completions answers
+#every prompt in the "prompt" list after `latency` seconds per request; every
+#`fail_every`-th request gets a 429 to exercise retries
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def complete(prompt: str) -> str:
+    words = prompt.split()
+    return " ".join(words[-12:-1]) if len(words) > 1 else prompt
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    #headers and body go out in one segment; otherwise Nagle + delayed ACK add ~40 ms per request
+    disable_nagle_algorithm = True
+    wbufsize = 1 << 16
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests += 1
+            n = self.server.requests
+        if self.server.fail_every and n % self.server.fail_every == 0:
+            self._send(429, {"error": "rate limited"}, {"Retry-After": "0"})
+            return
+
+        payload = json.loads(body)
+        prompts = payload["prompt"] if isinstance(payload["prompt"], list) else [payload["prompt"]]
+        time.sleep(self.server.latency)
+        self._send(200, {
+            "model": payload.get("model", ""),
+            "choices": [{"index": i, "text": complete(p), "finish_reason": "stop"} for i, p in enumerate(prompts)],
+        })
+
+    def _send(self, status: int, data, headers=None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+#start a server on a free port in a daemon thread; returns (server, base_url)
+def start_server(latency: float = 0.05, fail_every: int = 0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.latency = latency
+    server.fail_every = fail_every
+    server.requests = 0
+    server.lock = threading.Lock()
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
@@ -0,0 +1,132 @@
+#deterministic synthetic corpus for the benchmark suite: the same seed and scale always
+#write byte-identical txt/md/html/csv/json/jsonl files (pdfs too, given the same PyMuPDF)
+#usage: python benchmarks/corpus.py <dir> [--scale small|medium|large] [--seed 0]
+import argparse
+import csv
+import importlib.util
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_html import build_page
+
+WORDS = ("data model training corpus token chunk source export quality evaluation pipeline "
+         "the a of and to in is for with that on as by report result sample answer question").split()
+
+#files per format, words per text file, records per csv/json file, pages per pdf, web pages
+SCALES = {
+    "small": {"txt": 20, "md": 10, "html": 10, "csv": 2, "json": 2, "jsonl": 2, "pdf": 2,
+              "words": 2_000, "records": 500, "pages": 10, "urls": 20},
+    "medium": {"txt": 100, "md": 50, "html": 50, "csv": 4, "json": 4, "jsonl": 4, "pdf": 6,
+               "words": 8_000, "records": 5_000, "pages": 40, "urls": 100},
+    "large": {"txt": 400, "md": 200, "html": 200, "csv": 8, "json": 8, "jsonl": 8, "pdf": 12,
+              "words": 20_000, "records": 20_000, "pages": 100, "urls": 400},
+}
+
+def sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 24))).capitalize() + "."
+
+def paragraphs(rng: random.Random, words: int):
+    count = 0
+    while count < words:
+        text = " ".join(sentence(rng) for _ in range(rng.randint(3, 8)))
+        count += len(text.split())
+        yield text
+
+def write_text(path: Path, rng: random.Random, words: int):
+    path.write_text("\n\n".join(paragraphs(rng, words)) + "\n", encoding="utf-8")
+
+def write_markdown(path: Path, rng: random.Random, words: int):
+    parts = [f"# {sentence(rng)}"]
+    for i, text in enumerate(paragraphs(rng, words)):
+        if i % 5 == 0:
+            parts.append(f"## {sentence(rng)}")
+        if i % 7 == 3:
+            parts.append("\n".join(f"- {sentence(rng)}" for _ in range(3)))
+        parts.append(text)
+    path.write_text("\n\n".join(parts) + "\n", encoding="utf-8")
+
+def records(rng: random.Random, count: int):
+    for i in range(count):
+        yield {
+            "id": i,
+            "text": " ".join(sentence(rng) for _ in range(rng.randint(2, 6))),
+            "label": rng.choice(["positive", "negative", "neutral"]),
+            "score": round(rng.random(), 4),
+        }
+
+def write_csv(path: Path, rng: random.Random, count: int):
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "text", "label", "score"])
+        writer.writeheader()
+        writer.writerows(records(rng, count))
+
+def write_json(path: Path, rng: random.Random, count: int):
+    with path.open("w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i, record in enumerate(records(rng, count)):
+            f.write((",\n" if i else "") + json.dumps(record))
+        f.write("\n]\n")
+
+def write_jsonl(path: Path, rng: random.Random, count: int):
+    with path.open("w", encoding="utf-8") as f:
+        f.writelines(json.dumps(record) + "\n" for record in records(rng, count))
+
+def write_pdf(path: Path, rng: random.Random, pages: int):
+    import fitz
+
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(36, 36, 560, 800), " ".join(paragraphs(rng, 350)), fontsize=8)
+    #fixed metadata so the file does not embed the creation time
+    doc.set_metadata({"creationDate": "D:20000101000000", "modDate": "D:20000101000000", "producer": "bench"})
+    doc.save(path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+
+#writes the corpus under root and returns {format: [paths]}; every file gets its own rng
+#seeded from (seed, format, index), so scales share their first files
+def build_corpus(root: Path, scale: str = "small", seed: int = 0):
+    spec = SCALES[scale]
+    root.mkdir(parents=True, exist_ok=True)
+    writers = {
+        "txt": lambda path, rng: write_text(path, rng, spec["words"]),
+        "md": lambda path, rng: write_markdown(path, rng, spec["words"]),
+        "html": lambda path, rng: path.write_text(build_page(rng, spec["words"] // 30), encoding="utf-8"),
+        "csv": lambda path, rng: write_csv(path, rng, spec["records"]),
+        "json": lambda path, rng: write_json(path, rng, spec["records"]),
+        "jsonl": lambda path, rng: write_jsonl(path, rng, spec["records"]),
+        "pdf": lambda path, rng: write_pdf(path, rng, spec["pages"]),
+    }
+    if importlib.util.find_spec("fitz") is None:
+        print("PyMuPDF not installed; corpus has no pdfs", file=sys.stderr)
+        del writers["pdf"]
+
+    files = {}
+    for ext, write in writers.items():
+        directory = root / ext
+        directory.mkdir(exist_ok=True)
+        files[ext] = []
+        for i in range(spec[ext]):
+            path = directory / f"{ext}{i:04d}.{ext}"
+            write(path, random.Random(f"{seed}:{ext}:{i}"))
+            files[ext].append(path)
+    return files
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    files = build_corpus(args.root, args.scale, args.seed)
+    for ext, paths in files.items():
+        size = sum(p.stat().st_size for p in paths)
+        print(f"{ext:<6} {len(paths):5d} files {size / 2 ** 20:9.1f} MiB")
+
+if __name__ == "__main__":
+    main()
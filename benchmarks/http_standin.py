@@ -0,0 +1,52 @@
+#local stand-in HTTP server for fetch benchmarks: /page/<n> returns a generated html page
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = "crawl page index content article section market report data science".split()
+
+def render_page(n: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed * 1_000_003 + n)
+    paragraphs = "".join(
+        "<p>" + " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 80))) + "</p>"
+        for _ in range(rng.randint(3, 12))
+    )
+    return (
+        f"<html><head><title>Page {n}</title><style>p {{ margin: 0 }}</style></head>"
+        f"<body><nav><a href='/'>home</a></nav><article>{paragraphs}</article>"
+        f"<script>var n = {n};</script><footer>footer</footer></body></html>"
+    ).encode()
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        try:
+            n = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+        except ValueError:
+            n = 0
+        body = render_page(n, self.server.seed)
+        etag = f'"{self.server.seed}-{n}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+#start a server on a free port in a daemon thread; returns (server, base_url)
+def start_server(seed: int = 0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.seed = seed
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,271 @@
+#end-to-end benchmark suite over a seeded synthetic corpus (benchmarks/corpus.py). Each
+#stage runs in a fresh interpreter, `--warmup` untimed then `--repeat` timed times, and
+#reports its throughput, p50/p95 wall time per run and the process's peak RSS. Generation
+#uses an in-process mock backend and WebLoader fetches from the local HTTP stand-in, so
+#runs need no network.
+#Results are written as JSON; with --baseline, stages whose throughput fell or whose peak
+#RSS grew by more than --tolerance are flagged and the exit status is 1. Compare runs from
+#the same machine: run-to-run noise on a busy or single-core box can reach 15-20%
+#usage: python benchmarks/suite.py [--scale small] [--seed 0] [--repeat 3] [--warmup 1]
+#       [--stages load web chunk evaluate export quick_process]
+#       [--output results.json] [--baseline baseline.json] [--tolerance 0.15]
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from corpus import SCALES, build_corpus
+
+STAGES = ("load", "web", "chunk", "evaluate", "export", "quick_process")
+
+#current process peak RSS in MiB. VmHWM starts over at exec, unlike ru_maxrss, which a
+#child inherits from the parent
+def peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))] if values else 0.0
+
+#stands in for a model endpoint: fixed latency per request, deterministic completions
+def mock_backend(latency: float):
+    from completion_standin import complete
+    from ai_training_data_bot.tasks import GenerationBackend
+
+    class MockBackend(GenerationBackend):
+        model = "mock"
+
+        async def complete(self, prompts, params):
+            await asyncio.sleep(latency)
+            return [complete(p) for p in prompts]
+
+    return MockBackend()
+
+async def load_corpus(root: Path):
+    from ai_training_data_bot.sources.unified_loader import UnifiedLoader
+
+    loader = UnifiedLoader()
+    try:
+        return await loader.load(root)
+    finally:
+        await loader.close()
+
+def build_examples(documents):
+    from completion_standin import complete
+    from ai_training_data_bot.models import Dataset, TaskType, TrainingExample
+    from ai_training_data_bot.preprocessing.text_preprocessor import TextPreprocessor
+
+    preprocessor = TextPreprocessor()
+    examples = [
+        TrainingExample(
+            input_text=chunk.content,
+            output_text=complete(chunk.content),
+            task_type=TaskType.SUMMARIZATION,
+            source_document_id=chunk.document_id,
+            source_chunk_id=chunk.id
+        )
+        for doc in documents for chunk in preprocessor.chunk_document(doc)
+    ]
+    return Dataset(name="bench", examples=examples, total_examples=len(examples))
+
+#one timed run of a stage: returns (items, bytes of text handled, extra stats)
+async def run_once(stage: str, root: Path, scale: str, seed: int, state: dict, tmp: Path, latency: float):
+    if stage == "load":
+        docs = await load_corpus(root)
+        return len(docs), sum(doc.size() for doc in docs), {}
+
+    if stage == "web":
+        from http_standin import start_server
+        from ai_training_data_bot.core.http_pool import HttpClientPool
+        from ai_training_data_bot.sources.web_loader import WebLoader
+
+        if "server" not in state:
+            state["server"], state["base_url"] = start_server(seed)
+        http = HttpClientPool()
+        loader = WebLoader(http=http)
+        try:
+            urls = [f"{state['base_url']}/page/{n}" for n in range(SCALES[scale]["urls"])]
+            docs = await loader.load_many(urls)
+        finally:
+            await http.close()
+        return len(docs), sum(doc.size() for doc in docs), {}
+
+    if stage == "chunk":
+        from ai_training_data_bot.preprocessing.text_preprocessor import TextPreprocessor
+
+        if "documents" not in state:
+            state["documents"] = await load_corpus(root)
+        preprocessor = TextPreprocessor()
+        chunks = sum(len(preprocessor.chunk_document(doc)) for doc in state["documents"])
+        return chunks, sum(doc.size() for doc in state["documents"]), {}
+
+    if stage in ("evaluate", "export"):
+        if "dataset" not in state:
+            state["dataset"] = build_examples(await load_corpus(root))
+        dataset = state["dataset"]
+        size = sum(len(ex.input_text) + len(ex.output_text) for ex in dataset.examples)
+        if stage == "evaluate":
+            from ai_training_data_bot.evaluation import QualityEvaluator
+
+            evaluator = QualityEvaluator()
+            try:
+                report = await evaluator.evaluate(dataset)
+            finally:
+                await evaluator.close()
+            return len(dataset.examples), size, {"overall_score": report.overall_score}
+
+        from ai_training_data_bot.storage.dataset_exporter import DatasetExporter
+
+        await DatasetExporter().export(dataset, tmp / "export" / "dataset.jsonl")
+        return len(dataset.examples), size, {}
+
+    if stage == "quick_process":
+        from ai_training_data_bot.bot import TrainingDataBot
+
+        config = {"metrics": True, "generation_concurrency": 8}
+        async with TrainingDataBot(config, backend=mock_backend(latency)) as bot:
+            dataset = await bot.quick_process(root, tmp / "quick" / "dataset.jsonl")
+            stats = bot.get_statistics()
+        stages = {name: round(s["seconds"], 4) for name, s in stats["metrics"]["stages"].items()}
+        generation = stats["generation"]
+        return len(dataset.examples), sum(doc.size() for doc in bot.documents.values()), {
+            "stage_seconds": stages,
+            "generation_p50_latency": generation["p50_latency"],
+            "generation_p95_latency": generation["p95_latency"],
+        }
+
+    raise ValueError(f"Unknown stage: {stage}")
+
+#child process side: runs one stage and prints its result as a JSON line
+def run_stage(args):
+    logging.disable(logging.INFO)
+    root = Path(args.root)
+    seconds, result = [], None
+    with tempfile.TemporaryDirectory() as tmp:
+        state = {}
+
+        async def repeat():
+            nonlocal result
+            for i in range(args.warmup + args.repeat):
+                start = time.perf_counter()
+                result = await run_once(args.stage, root, args.scale, args.seed, state, Path(tmp), args.latency)
+                if i >= args.warmup:
+                    seconds.append(time.perf_counter() - start)
+
+        asyncio.run(repeat())
+        if "server" in state:
+            state["server"].shutdown()
+
+    items, size, extra = result
+    median = percentile(seconds, 0.5)
+    print(json.dumps({
+        "items": items,
+        "bytes": size,
+        "runs": len(seconds),
+        "seconds_p50": median,
+        "seconds_p95": percentile(seconds, 0.95),
+        "seconds_min": min(seconds),
+        "items_per_sec": items / median if median else 0.0,
+        "mb_per_sec": size / 2 ** 20 / median if median else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        **extra,
+    }))
+
+#(stage, metric, baseline, current, change) for every regression beyond tolerance
+def compare(results: dict, baseline: dict, tolerance: float):
+    regressions = []
+    for stage, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(stage)
+        if previous is None:
+            continue
+        if previous["items_per_sec"] and current["items_per_sec"] < previous["items_per_sec"] * (1 - tolerance):
+            change = current["items_per_sec"] / previous["items_per_sec"] - 1
+            regressions.append((stage, "items_per_sec", previous["items_per_sec"], current["items_per_sec"], change))
+        if previous["peak_rss_mb"] and current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + tolerance):
+            change = current["peak_rss_mb"] / previous["peak_rss_mb"] - 1
+            regressions.append((stage, "peak_rss_mb", previous["peak_rss_mb"], current["peak_rss_mb"], change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--latency", type=float, default=0.005, help="mock generation latency per request")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        run_stage(args)
+        return
+
+    results = {
+        "meta": {
+            "scale": args.scale,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "latency": args.latency,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "stages": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "corpus"
+        build_corpus(root, args.scale, args.seed)
+        for stage in args.stages:
+            out = subprocess.run(
+                [sys.executable, __file__, "--stage", stage, "--root", str(root), "--scale", args.scale,
+                 "--seed", str(args.seed), "--repeat", str(args.repeat), "--warmup", str(args.warmup),
+                 "--latency", str(args.latency)],
+                check=True, stdout=subprocess.PIPE, text=True
+            ).stdout
+            result = results["stages"][stage] = json.loads(out.strip().splitlines()[-1])
+            print(f"{stage:<14} {result['items']:>8,d} items  {result['items_per_sec']:>10,.1f} items/s  "
+                  f"{result['mb_per_sec']:>7.2f} MB/s  p50 {result['seconds_p50']:7.3f}s  "
+                  f"p95 {result['seconds_p95']:7.3f}s  peak {result['peak_rss_mb']:7.1f} MiB")
+
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        meta = baseline.get("meta", {})
+        if (meta.get("scale"), meta.get("seed")) != (args.scale, args.seed):
+            print(f"baseline was run at scale {meta.get('scale')} seed {meta.get('seed')}; not comparable")
+            sys.exit(2)
+        regressions = compare(results, baseline, args.tolerance)
+        for stage, metric, before, after, change in regressions:
+            print(f"REGRESSION {stage} {metric}: {before:,.2f} -> {after:,.2f} ({change:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
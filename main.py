@@ -1,7 +1,10 @@
+import argparse
 import asyncio
+import json
 from ai_training_data_bot.bot import TrainingDataBot
 from ai_training_data_bot.storage.dataset_exporter import DatasetExporter
-from ai_training_data_bot.models import ExportFormat
+from ai_training_data_bot.storage.sharding import merge_shards, parse_shard
+from ai_training_data_bot.models import ExportFormat, TaskType
 from pathlib import Path
 import logging
 
@@ -28,9 +31,62 @@ async def run_example():
     out = Path('output')
     out.mkdir(exist_ok=True)
     exporter = DatasetExporter()
-    await exporter.export(dataset, out / 'training_data.jsonl', format=ExportFormat.JSONL)
+    path = await exporter.export(dataset, out / 'training_data.jsonl', format=ExportFormat.JSONL)
 
-    print(f" Export complete: {out / 'training_data.jsonl'}")
+    print(f" Export complete: {path}")
+
+#one shard of a sharded run; --shard 0/1 (the default) processes everything
+async def run_shard(args):
+    logging.basicConfig(level=logging.INFO)
+    shard, num_shards = parse_shard(args.shard)
+    task_types = [TaskType(t) for t in args.task_types] if args.task_types else None
+    async with TrainingDataBot(checkpoint_config(args)) as bot:
+        manifest = await bot.run_shard(args.sources, args.output_dir, shard, num_shards, task_types=task_types)
+    print(f" Shard {shard}/{num_shards} complete: {manifest.examples} examples in {Path(args.output_dir) / manifest.output}")
+
+#continues a run that stopped, from its last checkpoint in the output directory
+async def resume_shard(args):
+    logging.basicConfig(level=logging.INFO)
+    shard, num_shards = parse_shard(args.shard)
+    async with TrainingDataBot(checkpoint_config(args)) as bot:
+        manifest = await bot.resume(args.output_dir, shard, num_shards)
+    print(f" Shard {shard}/{num_shards} complete: {manifest.examples} examples in {Path(args.output_dir) / manifest.output}")
+
+def checkpoint_config(args):
+    if args.checkpoint_interval is None:
+        return {}
+    #0 or less turns checkpointing off
+    return {"checkpoint_interval": args.checkpoint_interval if args.checkpoint_interval > 0 else None}
+
+def main():
+    parser = argparse.ArgumentParser(description="AI training data bot")
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="process sources, optionally as one shard of a multi-node run")
+    run.add_argument("sources", nargs="+")
+    run.add_argument("--output-dir", required=True, help="shared directory every shard writes to")
+    run.add_argument("--shard", default="0/1", help="i/N: process the i-th of N partitions (from 0)")
+    run.add_argument("--task-types", nargs="+", choices=[t.value for t in TaskType])
+    run.add_argument("--checkpoint-interval", type=float, help="seconds between checkpoints (default 60, 0 for none)")
+
+    resume = commands.add_parser("resume", help="continue a stopped run from its last checkpoint")
+    resume.add_argument("output_dir")
+    resume.add_argument("--shard", default="0/1", help="i/N: the shard to continue")
+    resume.add_argument("--checkpoint-interval", type=float, help="seconds between checkpoints (default 60, 0 for none)")
+
+    merge = commands.add_parser("merge", help="combine finished shards into one JSONL file")
+    merge.add_argument("output_dir")
+    merge.add_argument("--output", required=True)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        asyncio.run(run_shard(args))
+    elif args.command == "resume":
+        asyncio.run(resume_shard(args))
+    elif args.command == "merge":
+        print(json.dumps({k: v for k, v in merge_shards(args.output_dir, args.output).items() if k != "per_shard"}))
+    else:
+        asyncio.run(run_example())
 
 if __name__ == "__main__":
-    asyncio.run(run_example())
+    main()
@@ -0,0 +1,49 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ai_training_data_bot.bot import TrainingDataBot
+from ai_training_data_bot.tasks import GenerationBackend
+
+#answers every prompt with its last words, so tests run offline and deterministically
+class EchoBackend(GenerationBackend):
+    model = "echo"
+
+    def __init__(self):
+        self.calls = []
+
+    async def complete(self, prompts, params):
+        self.calls.append(len(prompts))
+        return [" ".join(p.split()[-12:-1]) or p for p in prompts]
+
+@pytest.fixture
+def backend():
+    return EchoBackend()
+
+#corpus(count, sentences, name) writes `count` text documents of `sentences` sentences each
+#to tmp_path/name and returns that directory
+@pytest.fixture
+def corpus(tmp_path):
+    def write(count=10, sentences=30, name="src"):
+        root = tmp_path / name
+        root.mkdir()
+        for i in range(count):
+            text = " ".join(f"Document {i} sentence {j} describes the mill, the river and the town." for j in range(sentences))
+            (root / f"doc{i:02d}.txt").write_text(text, encoding="utf-8")
+        return root
+    return write
+
+#run(body, config, backend) calls `await body(bot)` on a fresh bot and returns its result;
+#backend defaults to the test's EchoBackend
+@pytest.fixture
+def run(backend):
+    def run_bot(body, config=None, backend=backend):
+        async def main():
+            async with TrainingDataBot(config or {}, backend=backend) as bot:
+                return await body(bot)
+        return asyncio.run(main())
+    return run_bot
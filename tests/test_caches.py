@@ -0,0 +1,78 @@
+import asyncio
+import sqlite3
+import time
+
+from ai_training_data_bot.models import Document
+from ai_training_data_bot.storage.ingestion_cache import IngestionCache
+from ai_training_data_bot.storage.response_cache import ResponseCache
+from ai_training_data_bot.storage.sqlite_store import SqliteLRUStore
+
+def test_store_evicts_least_recently_used(tmp_path):
+    store = SqliteLRUStore(tmp_path / "kv.sqlite", max_bytes=30)
+    for key in "abc":
+        store.put(key, b"x" * 10, {"tag": key})
+        time.sleep(0.01)
+    assert store.get("a") == (b"x" * 10, {"tag": "a"})
+    store.put("d", b"x" * 10)
+    assert store.get("b") is None
+    assert set(store.get_many(["a", "c", "d"])) == {"a", "c", "d"}
+    assert store.stats() == {"entries": 3, "bytes": 30}
+    store.close()
+
+    reopened = SqliteLRUStore(tmp_path / "kv.sqlite", max_bytes=30)
+    assert reopened.stats() == {"entries": 3, "bytes": 30}
+    reopened.close()
+
+def test_store_expires_entries(tmp_path):
+    store = SqliteLRUStore(tmp_path / "kv.sqlite", ttl=0.01)
+    store.put("a", b"x")
+    time.sleep(0.05)
+    assert store.get("a") is None
+    assert store.stats() == {"entries": 0, "bytes": 0}
+
+#a cache file written with an older layout is emptied, not misread
+def test_store_drops_older_layouts(tmp_path):
+    db = sqlite3.connect(str(tmp_path / "kv.sqlite"))
+    db.execute("CREATE TABLE responses (key TEXT PRIMARY KEY, response TEXT)")
+    db.execute("INSERT INTO responses VALUES ('a', 'old')")
+    db.commit()
+    db.close()
+    store = SqliteLRUStore(tmp_path / "kv.sqlite")
+    assert store.get("a") is None
+    store.put("a", b"new")
+    assert store.get("a") == (b"new", None)
+
+def test_response_cache_round_trip(tmp_path):
+    async def run():
+        cache = ResponseCache(tmp_path / "responses.sqlite")
+        key = ResponseCache.key("qa", 1, "qa_generation", "m", {}, "chunk text")
+        assert await cache.get_many([key]) == {}
+        await cache.put_many({key: "réponse"})
+        found = await cache.get_many([key, "missing"])
+        await cache.close()
+        return found, cache.stats()
+
+    found, stats = asyncio.run(run())
+    assert list(found.values()) == ["réponse"]
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+def test_ingestion_cache_validates_files(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("first", encoding="utf-8")
+
+    async def run():
+        cache = IngestionCache(tmp_path / "ingest.sqlite")
+        await cache.put_file(path, [Document(title="doc", content="first", source=str(path))])
+        hit = await cache.get_file(path)
+        path.write_text("second version", encoding="utf-8")
+        miss = await cache.get_file(path)
+        await cache.put_url("https://example.com", [Document(content="page")], '"v1"', None)
+        cached = await cache.get_url("https://example.com")
+        await cache.close()
+        return hit, miss, cached
+
+    hit, miss, cached = asyncio.run(run())
+    assert [d.content for d in hit] == ["first"]
+    assert miss is None
+    assert cached.conditional_headers() == {"If-None-Match": '"v1"'}
+    assert cached.documents[0].content == "page"
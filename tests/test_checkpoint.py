@@ -0,0 +1,44 @@
+import pytest
+
+from ai_training_data_bot.core.exceptions import ConfigurationError
+from ai_training_data_bot.storage.checkpoint import RunCheckpoint
+
+from conftest import EchoBackend
+
+class Interrupted(BaseException):
+    pass
+
+#stops the run from inside generation after `after` requests, like a crash mid-run
+class InterruptingBackend(EchoBackend):
+    def __init__(self, after):
+        super().__init__()
+        self.after = after
+
+    async def complete(self, prompts, params):
+        if len(self.calls) >= self.after:
+            raise Interrupted()
+        return await super().complete(prompts, params)
+
+CONFIG = {"chunk_size": 60, "chunk_overlap": 10, "checkpoint_interval": 0.0, "generation_batch_size": 4, "generation_request_batch": 4}
+
+@pytest.mark.parametrize("after", [2, 9, 17])
+def test_resume_matches_an_uninterrupted_run(tmp_path, corpus, run, after):
+    root = corpus()
+    reference = run(lambda bot: bot.run_shard(str(root), tmp_path / "reference"), CONFIG)
+
+    with pytest.raises(Interrupted):
+        run(lambda bot: bot.run_shard(str(root), tmp_path / "out"), CONFIG, backend=InterruptingBackend(after))
+    assert RunCheckpoint.path(tmp_path / "out", 0, 1).exists()
+
+    resumed = run(lambda bot: bot.resume(tmp_path / "out"), CONFIG)
+    assert (tmp_path / "out" / resumed.output).read_bytes() == (tmp_path / "reference" / reference.output).read_bytes()
+    assert resumed.examples == reference.examples
+    assert resumed.stats["documents"] == 10
+    assert not RunCheckpoint.path(tmp_path / "out", 0, 1).exists()
+
+    #a finished shard resumes to its manifest
+    assert run(lambda bot: bot.resume(tmp_path / "out"), CONFIG).examples == reference.examples
+
+def test_resume_without_checkpoint_fails(tmp_path, run):
+    with pytest.raises(ConfigurationError):
+        run(lambda bot: bot.resume(tmp_path / "nothing"), CONFIG)
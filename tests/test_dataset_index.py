@@ -0,0 +1,127 @@
+import asyncio
+import json
+import uuid
+from collections import Counter
+
+import pytest
+
+from ai_training_data_bot.core.exceptions import ConfigurationError
+from ai_training_data_bot.models import TaskType, TrainingExample
+from ai_training_data_bot.storage.dataset_exporter import DatasetExporter
+from ai_training_data_bot.storage.dataset_index import DatasetReader, IndexBuilder, build_index, index_path
+
+SOURCES = [uuid.UUID(int=i + 1) for i in range(5)]
+TASKS = [TaskType.QA_GENERATION, TaskType.SUMMARIZATION, TaskType.CLASSIFICATION]
+
+def examples(start, count):
+    return [
+        TrainingExample(
+            input_text=f"input {i} é", output_text=f"output {i}",
+            task_type=TASKS[i % 3], source_document_id=SOURCES[i % 5] if i % 7 else None
+        )
+        for i in range(start, start + count)
+    ]
+
+def parsed(path):
+    return [json.loads(line) for line in path.read_bytes().splitlines()]
+
+def export(path, items, **kwargs):
+    async def items_():
+        for ex in items:
+            yield ex
+    asyncio.run(DatasetExporter(batch_size=16, **kwargs).export_stream(items_(), path))
+
+def test_reader_matches_the_file(tmp_path):
+    path = tmp_path / "data.jsonl"
+    export(path, examples(0, 100))
+    records = parsed(path)
+    with DatasetReader(path) as reader:
+        assert len(reader) == 100
+        assert [reader[i] for i in range(100)] == records
+        assert reader[-1] == records[-1]
+        assert reader.counts("task_type") == dict(Counter(r["task_type"] for r in records))
+        source = str(SOURCES[2])
+        assert list(reader.records(task_type="qa_generation", source_document_id=source)) == [
+            r for r in records if r["task_type"] == "qa_generation" and r["source_document_id"] == source
+        ]
+        assert reader.count(source_document_id="") == sum(r["source_document_id"] is None for r in records)
+        sample = reader.sample(30, by="task_type", seed=1)
+        assert Counter(r["task_type"] for r in sample) == {"qa_generation": 10, "summarization": 10, "classification": 10}
+        assert sample == reader.sample(30, by="task_type", seed=1)
+        with pytest.raises(IndexError):
+            reader[100]
+
+def test_stale_index_is_rejected(tmp_path):
+    path = tmp_path / "data.jsonl"
+    export(path, examples(0, 10))
+    with path.open("ab") as f:
+        f.write(b'{"id": "x"}\n')
+    with pytest.raises(ConfigurationError):
+        DatasetReader(path)
+
+#appending extends the index to what a full rebuild would produce
+def test_append_extends_the_index(tmp_path):
+    path = tmp_path / "data.jsonl"
+    exporter = DatasetExporter(batch_size=16)
+    asyncio.run(exporter.append_jsonl(path, examples(0, 40)))
+    asyncio.run(exporter.append_jsonl(path, examples(40, 25), tombstones=["gone"]))
+
+    records = [r for r in parsed(path) if not r.get("deleted")]
+    with DatasetReader(path) as reader:
+        assert len(reader) == len(records) == 65
+        assert reader.lines == 66
+        assert [reader[i] for i in range(len(reader))] == records
+        assert reader.count(task_type="summarization") == sum(r["task_type"] == "summarization" for r in records)
+    extended = index_path(path).read_bytes()
+    build_index(path)
+    assert index_path(path).read_bytes() == extended
+
+#tombstoned and superseded lines are not rows: len, counts, filters and samples skip them
+def test_tombstones_and_superseded_lines_are_skipped(tmp_path):
+    path = tmp_path / "data.jsonl"
+    exporter = DatasetExporter(batch_size=16)
+    first = examples(0, 30)
+    asyncio.run(exporter.append_jsonl(path, first))
+    deleted = {str(ex.id) for ex in first[:10]}
+    changed = [
+        TrainingExample(id=ex.id, input_text=ex.input_text, output_text="changed", task_type=ex.task_type)
+        for ex in first[10:15]
+    ]
+    asyncio.run(exporter.append_jsonl(path, changed, tombstones=sorted(deleted)))
+
+    live = {str(ex.id) for ex in first[10:]}
+    with DatasetReader(path) as reader:
+        assert (len(reader), reader.lines, reader.count()) == (20, 45, 20)
+        rows = [reader[i] for i in range(len(reader))]
+        assert {r["id"] for r in rows} == live
+        assert sum(r["output_text"] == "changed" for r in rows) == 5
+        assert sum(reader.counts("task_type").values()) == 20
+        assert reader.count(task_type="qa_generation") == sum(r["task_type"] == "qa_generation" for r in rows)
+        assert all(r["id"] in live for r in reader.records(task_type="summarization"))
+
+        sample = reader.sample(20, by="task_type", seed=0)
+        assert sorted(r["id"] for r in sample) == sorted(live)
+        assert not any(r.get("deleted") for r in sample)
+        assert [r for r in sample if r["id"] in {str(ex.id) for ex in changed}] == [
+            r for r in sample if r["output_text"] == "changed"
+        ]
+    extended = index_path(path).read_bytes()
+    build_index(path)
+    assert index_path(path).read_bytes() == extended
+
+def test_append_indexes_an_unindexed_file(tmp_path):
+    path = tmp_path / "data.jsonl"
+    export(path, examples(0, 20), index=False)
+    assert not index_path(path).exists()
+    asyncio.run(DatasetExporter().append_jsonl(path, examples(20, 5)))
+    with DatasetReader(path) as reader:
+        assert [reader[i] for i in range(len(reader))] == parsed(path)
+
+def test_spilled_index_matches(tmp_path):
+    path = tmp_path / "data.jsonl"
+    export(path, examples(0, 50))
+    expected = index_path(path).read_bytes()
+    builder = IndexBuilder.extend(path, spill_rows=7)
+    builder.finish(path.stat().st_size)
+    assert index_path(path).read_bytes() == expected
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,80 @@
+import asyncio
+import csv
+import json
+
+import pytest
+
+from ai_training_data_bot.bot import TrainingDataBot
+from ai_training_data_bot.core.exceptions import ConfigurationError
+from ai_training_data_bot.models import ExportFormat
+from ai_training_data_bot.preprocessing.dedup import NearDuplicateIndex, lsh_layout
+
+TEXT = "The old mill stood beside the river for two hundred years and ground wheat for the whole valley."
+
+def process(tmp_path, backend, config, format=ExportFormat.JSONL):
+    (tmp_path / "src").mkdir(exist_ok=True)
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / "src" / name).write_text(TEXT if name != "c.txt" else "A different page about bridges.", encoding="utf-8")
+
+    async def run():
+        async with TrainingDataBot({"dedup": True, **config}, backend=backend) as bot:
+            dataset = await bot.process_documents(await bot.load_documents(str(tmp_path / "src")))
+            return await bot.export_dataset(dataset, tmp_path / f"out.{format.value}", format=format, split_data=False)
+    return asyncio.run(run())
+
+def test_drop_removes_duplicates(tmp_path, backend):
+    out = process(tmp_path, backend, {"dedup_action": "drop"})
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 2
+    assert not any("duplicate_of" in r for r in records)
+
+#flagged duplicates are kept and must be distinguishable in the export
+def test_flag_is_exported(tmp_path, backend):
+    out = process(tmp_path, backend, {"dedup_action": "flag"})
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == 3
+    flagged = [r for r in records if "duplicate_of" in r]
+    assert len(flagged) == 1
+    assert flagged[0]["duplicate_similarity"] == 1.0
+
+def test_flag_is_a_csv_column(tmp_path, backend):
+    out = process(tmp_path, backend, {"dedup_action": "flag"}, format=ExportFormat.CSV)
+    with out.open(encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 3
+    assert sum(1 for r in rows if r["duplicate_of"]) == 1
+
+def test_flag_is_a_parquet_column(tmp_path, backend):
+    pq = pytest.importorskip("pyarrow.parquet")
+    out = process(tmp_path, backend, {"dedup_action": "flag"}, format=ExportFormat.PARQUET)
+    table = pq.read_table(out)
+    assert table.num_rows == 3
+    assert table.column("duplicate_of").null_count == 2
+
+#a lower threshold needs more, shorter bands to catch its pairs
+def test_layout_follows_the_threshold():
+    layouts = [lsh_layout(t, 128) for t in (0.5, 0.8, 0.9)]
+    assert [bands * rows for bands, rows in layouts] == [128] * 3
+    assert layouts[0][0] > layouts[1][0] > layouts[2][0]
+    assert NearDuplicateIndex(threshold=0.5).bands == layouts[0][0]
+    for threshold in (0.0, 1.0, 1.5):
+        with pytest.raises(ConfigurationError):
+            NearDuplicateIndex(threshold=threshold)
+
+def test_configured_threshold_overrides_a_saved_index(tmp_path, backend):
+    words = TEXT.split()
+    near = " ".join(words[:-1] + ["hills."])
+    saved = NearDuplicateIndex(threshold=0.95)
+    saved.add("a", TEXT)
+    saved.save(tmp_path / "dedup.npz")
+    assert saved.lookup_similar(saved.signature(near)) is None
+
+    async def run():
+        async with TrainingDataBot(
+            {"dedup": True, "dedup_threshold": 0.5, "dedup_index_path": str(tmp_path / "dedup.npz")}, backend=backend
+        ) as bot:
+            return bot.deduplicator.index
+    index = asyncio.run(run())
+    assert (index.threshold, index.bands) == (0.5, lsh_layout(0.5, 128)[0])
+    assert index.keys == ["a"]
+    assert index.lookup_similar(index.signature(near))[0] == "a"
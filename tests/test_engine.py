@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ai_training_data_bot.core.exceptions import GenerationError
+from ai_training_data_bot.core.http_pool import HttpClientPool
+from ai_training_data_bot.tasks import GenerationBackend
+from ai_training_data_bot.tasks.backends import HTTPCompletionBackend
+from ai_training_data_bot.tasks.engine import GenerationEngine
+
+def http_backend(statuses):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status = statuses[min(len(requests), len(statuses)) - 1]
+        if status != 200:
+            return httpx.Response(status, json={"error": "no"}, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"choices": [{"index": 0, "text": "ok"}]})
+
+    pool = HttpClientPool(retries=3, backoff=0)
+    pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return HTTPCompletionBackend("http://model.test/v1", "m", http=pool), requests
+
+def complete(engine, prompts=("p",)):
+    async def run():
+        try:
+            return await engine.complete(list(prompts), {})
+        finally:
+            await engine.backend.http.close()
+    return asyncio.run(run())
+
+def test_client_errors_are_not_retried():
+    backend, requests = http_backend([400])
+    with pytest.raises(GenerationError):
+        complete(GenerationEngine(backend, retries=3, backoff=0))
+    assert len(requests) == 1
+
+#the engine is the only retry layer: retries + 1 requests at most
+def test_server_errors_are_retried_once_per_attempt():
+    backend, requests = http_backend([503])
+    with pytest.raises(GenerationError):
+        complete(GenerationEngine(backend, retries=3, backoff=0))
+    assert len(requests) == 4
+
+    backend, requests = http_backend([429, 503, 200])
+    assert complete(GenerationEngine(backend, retries=3, backoff=0)) == ["ok"]
+    assert len(requests) == 3
+
+class FlakyBackend(GenerationBackend):
+    def __init__(self):
+        self.finished = []
+
+    async def complete(self, prompts, params):
+        if prompts == ["flaky"] and "flaky" not in self.finished:
+            self.finished.append("flaky")
+            raise GenerationError("busy", retry_after=0.2)
+        self.finished.append(prompts[0])
+        return prompts
+
+#a request backing off must not hold the only slot
+def test_backoff_releases_the_slot():
+    backend = FlakyBackend()
+    engine = GenerationEngine(backend, max_concurrency=1, retries=1)
+
+    async def run():
+        flaky = asyncio.ensure_future(engine.complete(["flaky"], {}))
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(engine.complete(["other"], {}), 0.1)
+        return await flaky
+
+    assert asyncio.run(run()) == ["flaky"]
+    assert backend.finished == ["flaky", "other", "flaky"]
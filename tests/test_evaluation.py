@@ -0,0 +1,25 @@
+import asyncio
+
+from ai_training_data_bot.evaluation import METRICS, QualityEvaluator, _score_batch
+from ai_training_data_bot.models import QualityMetric, TrainingExample
+
+COHERENCE = METRICS.index(QualityMetric.COHERENCE)
+
+CLEAN = "The model reads the data. The report is good and clear."
+
+def test_coherence_of_clean_text():
+    scores = _score_batch([CLEAN], ["The report is clear."], frozenset())
+    assert scores[0, COHERENCE] == 1.0
+
+#a score must not depend on what else is in its batch
+def test_scores_are_independent_of_batch():
+    alone = _score_batch([CLEAN], ["The report is clear."], frozenset())
+    batched = _score_batch(["Chapter 1 begins here.", CLEAN], ["Chapter 1.", "The report is clear."], frozenset())
+    assert (batched[1] == alone[0]).all()
+
+def test_batch_size_does_not_change_scores():
+    texts = [CLEAN, "Chapter 1 begins here.", "Page 42 of 100 lists 3 items.", "Short text with words."]
+    examples = [TrainingExample(input_text=t, output_text=t.split()[0]) for t in texts * 5]
+    whole = asyncio.run(QualityEvaluator(batch_size=len(examples)).score(examples))
+    split = asyncio.run(QualityEvaluator(batch_size=3).score(examples))
+    assert (whole[:, COHERENCE] == split[:, COHERENCE]).all()
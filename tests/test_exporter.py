@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from ai_training_data_bot.models import Dataset, TaskType, TrainingExample
+from ai_training_data_bot.storage import dataset_exporter, shard_writer
+from ai_training_data_bot.storage.dataset_exporter import DatasetExporter
+
+class WriteFailed(Exception):
+    pass
+
+def examples(count):
+    return [TrainingExample(input_text=f"input {i}", output_text=f"output {i}", task_type=TaskType.QA_GENERATION) for i in range(count)]
+
+#every FormatWriter opened, so the test can check its file was released
+@pytest.fixture
+def opened(monkeypatch):
+    writers, original = [], shard_writer.open_writer
+    def open_writer(*args, **kwargs):
+        writers.append(original(*args, **kwargs))
+        return writers[-1]
+    monkeypatch.setattr(dataset_exporter, "open_writer", open_writer)
+    monkeypatch.setattr(shard_writer, "open_writer", open_writer)
+    return writers
+
+def fail_after(monkeypatch, name, calls):
+    original = getattr(DatasetExporter, name)
+    seen = []
+    def method(self, *args):
+        seen.append(1)
+        if len(seen) > calls:
+            raise WriteFailed()
+        return original(self, *args)
+    monkeypatch.setattr(DatasetExporter, name, method)
+
+def assert_released(tmp_path, writers):
+    assert writers and all(w._file.closed for w in writers)
+    assert not list(tmp_path.glob("*.idx")) and not list(tmp_path.glob("*.tmp"))
+
+#the writer thread's error must not keep the file open or leave index files behind
+def test_export_stream_releases_the_writer_on_write_failure(tmp_path, monkeypatch, opened):
+    fail_after(monkeypatch, "_write_stream", 1)
+    async def items():
+        for ex in examples(50):
+            yield ex
+    with pytest.raises(WriteFailed):
+        asyncio.run(DatasetExporter(batch_size=10).export_stream(items(), tmp_path / "out.jsonl"))
+    assert_released(tmp_path, opened)
+
+def test_export_stream_releases_the_writer_when_the_source_fails(tmp_path, opened):
+    async def items():
+        for ex in examples(25):
+            yield ex
+        raise WriteFailed()
+    with pytest.raises(WriteFailed):
+        asyncio.run(DatasetExporter(batch_size=10).export_stream(items(), tmp_path / "out.jsonl"))
+    assert_released(tmp_path, opened)
+
+def test_export_releases_every_split_on_write_failure(tmp_path, monkeypatch, opened):
+    fail_after(monkeypatch, "_write_batch", 1)
+    dataset = Dataset(name="d", examples=examples(50))
+    with pytest.raises(WriteFailed):
+        asyncio.run(DatasetExporter(batch_size=10).export(dataset, tmp_path / "out.jsonl"))
+    assert_released(tmp_path, opened)
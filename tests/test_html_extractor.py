@@ -0,0 +1,29 @@
+import importlib.util
+
+import pytest
+
+from ai_training_data_bot.sources.html_extractor import extract_html
+
+BACKENDS = ["html.parser"] + (["lxml"] if importlib.util.find_spec("lxml") is not None else [])
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_body_text_without_closing_head(backend):
+    page = "<html><head><title>Mill</title><meta charset='utf-8'><body><p>The mill ground wheat.</p></body></html>"
+    extracted = extract_html(page, backend=backend)
+    assert extracted.title == "Mill"
+    assert extracted.text == "The mill ground wheat."
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_implicit_head_and_body(backend):
+    page = "<!doctype html><title>Mill</title><style>p {}</style><p>The mill ground wheat.<p>It closed in 1950."
+    extracted = extract_html(page, backend=backend)
+    assert extracted.title == "Mill"
+    assert extracted.text == "The mill ground wheat.\nIt closed in 1950."
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_head_scripts_and_boilerplate_are_dropped(backend):
+    page = (
+        "<html><head><title>Mill</title><script>var x = 1;</script></head>"
+        "<body><nav>Home | About</nav><p>The mill ground wheat.</p><footer>Contact</footer></body></html>"
+    )
+    assert extract_html(page, backend=backend).text == "The mill ground wheat."
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from ai_training_data_bot.bot import TrainingDataBot
+
+def write_records(path, count):
+    path.write_text("".join(
+        json.dumps({"text": f"Record {i} describes the river, the old mill and the bridge near the town."}) + "\n"
+        for i in range(count)
+    ), encoding="utf-8")
+
+def build(tmp_path, backend, config=None):
+    async def run():
+        async with TrainingDataBot(config or {}, backend=backend) as bot:
+            return await bot.build_incremental(str(tmp_path / "src"), tmp_path / "out.jsonl")
+    return asyncio.run(run())
+
+def live_ids(path):
+    live = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        record = json.loads(line)
+        if record.get("deleted"):
+            live.pop(record["id"], None)
+        else:
+            live[record["id"]] = record
+    return live
+
+#records are sourced "<file>#<index>"; a rerun on an unchanged file must not touch them
+def test_rerun_on_record_file_is_a_no_op(tmp_path, backend):
+    (tmp_path / "src").mkdir()
+    write_records(tmp_path / "src" / "records.jsonl", 5)
+
+    first = build(tmp_path, backend)
+    assert (first["added"], first["deleted"], first["tombstones"]) == (5, 0, 0)
+    lines = (tmp_path / "out.jsonl").read_text(encoding="utf-8")
+
+    second = build(tmp_path, backend)
+    assert (second["added"], second["unchanged"], second["deleted"], second["examples"]) == (0, 5, 0, 0)
+    assert (tmp_path / "out.jsonl").read_text(encoding="utf-8") == lines
+
+def test_records_dropped_from_a_file_are_deleted(tmp_path, backend):
+    (tmp_path / "src").mkdir()
+    write_records(tmp_path / "src" / "records.jsonl", 5)
+    build(tmp_path, backend)
+
+    write_records(tmp_path / "src" / "records.jsonl", 3)
+    stats = build(tmp_path, backend)
+    assert (stats["unchanged"], stats["deleted"]) == (3, 2)
+    assert len(live_ids(tmp_path / "out.jsonl")) == 3
+
+    (tmp_path / "src" / "records.jsonl").unlink()
+    stats = build(tmp_path, backend)
+    assert stats["deleted"] == 3
+    assert live_ids(tmp_path / "out.jsonl") == {}
+
+#records past the point where a file stopped parsing were not seen, so they are kept
+def test_records_after_a_parse_failure_are_kept(tmp_path, backend):
+    path = tmp_path / "src" / "records.json"
+    path.parent.mkdir()
+    records = [{"text": f"Record {i} describes the river, the old mill and the bridge near the town."} for i in range(5)]
+    content = json.dumps(records)
+    path.write_text(content, encoding="utf-8")
+    config = {"record_batch_size": 2}
+    assert build(tmp_path, backend, config)["added"] == 5
+    before = live_ids(tmp_path / "out.jsonl")
+
+    #truncated inside the fourth record: the first batch of two still loads
+    path.write_text(content[:content.index("Record 3") + 10], encoding="utf-8")
+    stats = build(tmp_path, backend, config)
+    assert (stats["unchanged"], stats["deleted"], stats["tombstones"]) == (2, 0, 0)
+    assert live_ids(tmp_path / "out.jsonl") == before
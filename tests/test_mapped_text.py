@@ -0,0 +1,59 @@
+import asyncio
+import gc
+
+from ai_training_data_bot.bot import TrainingDataBot
+from ai_training_data_bot.core.mapped_text import MappedText
+
+TEXT = "The mill stood by the river.\r\nIt ground wheat for the valley. " * 200
+
+def write(root, count=3):
+    root.mkdir()
+    for i in range(count):
+        (root / f"doc{i}.txt").write_text(TEXT, encoding="utf-8", newline="")
+    return root
+
+def test_mapping_is_released_when_collected(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT, encoding="utf-8", newline="")
+    mapped = MappedText(path, block_bytes=100)
+    assert mapped.read() == path.read_text(encoding="utf-8")
+    file = mapped._file
+    del mapped
+    gc.collect()
+    assert file.closed
+
+def test_close_is_idempotent(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    mapped = MappedText(path)
+    mapped.close()
+    mapped.close()
+    assert mapped.closed and mapped._file.closed
+
+#loaded documents are kept on the bot until cleanup
+def test_cleanup_closes_loaded_documents(tmp_path, backend):
+    root = write(tmp_path / "src")
+    async def run():
+        async with TrainingDataBot({"mmap_min_bytes": 1}, backend=backend) as bot:
+            documents = await bot.load_documents(str(root))
+            assert all(doc.mapped is not None and not doc.mapped.closed for doc in documents)
+        return documents
+    documents = asyncio.run(run())
+    assert all(doc.mapped.closed for doc in documents)
+
+#streamed documents are closed as soon as they are chunked
+def test_streamed_documents_are_closed_once_chunked(tmp_path, backend, monkeypatch):
+    root = write(tmp_path / "src")
+    mapped = []
+    original = MappedText.__init__
+    def init(self, *args, **kwargs):
+        original(self, *args, **kwargs)
+        mapped.append(self)
+    monkeypatch.setattr(MappedText, "__init__", init)
+
+    async def run():
+        async with TrainingDataBot({"mmap_min_bytes": 1}, backend=backend) as bot:
+            batches = [batch async for batch in bot.iter_examples(str(root))]
+            assert batches and len(mapped) == 3
+            assert all(m.closed for m in mapped)
+    asyncio.run(run())
@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+from ai_training_data_bot.models import Document, TextChunk, TrainingExample
+from ai_training_data_bot.pipeline import StreamingPipeline
+from ai_training_data_bot.storage.dataset_exporter import DatasetExporter
+
+class Scheduler:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def stream(self, sources):
+        for doc in self.documents:
+            await asyncio.sleep(0)
+            yield doc
+
+def chunk(doc):
+    return [TextChunk(document_id=doc.id, content=f"{doc.title} part {i}", chunk_index=i) for i in range(3)]
+
+#generation slower than chunking must still get full batches
+def test_batches_are_full_until_the_end(tmp_path):
+    sizes = []
+
+    async def generate(chunks):
+        sizes.append(len(chunks))
+        await asyncio.sleep(0.001)
+        return [TrainingExample(input_text=c.content, output_text="x", source_chunk_id=c.id) for c in chunks]
+
+    documents = [Document(title=f"doc {i}", content="text") for i in range(11)]
+    pipeline = StreamingPipeline(Scheduler(documents), chunk, generate, DatasetExporter(), batch_size=8, concurrency=2)
+    stats = asyncio.run(pipeline.run([], tmp_path / "out.jsonl"))
+
+    assert sizes == [8, 8, 8, 8, 1]
+    assert stats.examples == 33
+    lines = (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["input_text"] for line in lines] == [f"doc {i} part {j}" for i in range(11) for j in range(3)]
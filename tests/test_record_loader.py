@@ -0,0 +1,15 @@
+import asyncio
+import csv
+
+from ai_training_data_bot.sources.record_loader import RecordLoader
+
+#a row holding a whole document is longer than the csv module's default field limit
+def test_csv_fields_past_the_default_limit(tmp_path):
+    text = "word " * 60_000
+    path = tmp_path / "records.csv"
+    with path.open("w", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows([("title", "text"), ("long", text)])
+
+    docs = asyncio.run(RecordLoader(text_field="text", title_field="title").load(path))
+    assert [(doc.title, doc.content) for doc in docs] == [("long", text)]
+    assert csv.field_size_limit() > len(text)
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from ai_training_data_bot.core.exceptions import ConfigurationError
+from ai_training_data_bot.service.jobs import JobManager, JobStatus
+
+#run_manager(body, **kwargs) awaits body(manager) with a started JobManager on a fresh bot
+@pytest.fixture
+def run_manager(run):
+    def run_jobs(body, **kwargs):
+        async def with_manager(bot):
+            manager = JobManager(bot, workers=1, **kwargs)
+            manager.start()
+            try:
+                return await body(manager)
+            finally:
+                await manager.close()
+        return run(with_manager)
+    return run_jobs
+
+#results go to the job's spool file, and streaming reads them back
+def test_results_are_spooled_and_streamed(tmp_path, corpus, run_manager):
+    root = corpus(count=3, sentences=1, name="sources")
+
+    async def body(manager):
+        job = manager.submit([str(root)])
+        await job.wait()
+        lines = b"".join([data async for data in job.stream(block_size=64)]).splitlines()
+        return job, lines
+
+    job, lines = run_manager(body, source_roots=[str(tmp_path / "sources")], job_dir=str(tmp_path / "jobs"))
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.results_path.parent == tmp_path / "jobs" / job.id
+    assert job.results_path.stat().st_size == job.bytes
+    assert len(lines) == job.examples == 3
+    assert all(json.loads(line)["id"] for line in lines)
+
+def test_evicted_jobs_drop_their_results(tmp_path, corpus, run_manager):
+    root = corpus(count=1, sentences=1, name="sources")
+
+    async def body(manager):
+        first = manager.submit([str(root)])
+        await first.wait()
+        second = manager.submit([str(root)])
+        await second.wait()
+        return first, second
+
+    first, second = run_manager(body, source_roots=[str(root)], job_dir=str(tmp_path / "jobs"), max_jobs=1)
+    assert not (tmp_path / "jobs" / first.id).exists()
+    assert second.results_path.exists()
+
+def test_local_sources_are_restricted_by_default(tmp_path, corpus, run_manager):
+    root = corpus(count=1, sentences=1, name="sources")
+
+    async def body(manager):
+        with pytest.raises(ConfigurationError):
+            manager.submit([str(root)])
+        with pytest.raises(ConfigurationError):
+            manager.submit([str(root / ".." / ".." )])
+        return manager.submit(["https://example.com/page"])
+
+    assert run_manager(body, job_dir=str(tmp_path / "jobs")) is not None
+
+def test_allow_any_source_opts_in(corpus, run_manager):
+    root = corpus(count=1, sentences=1, name="anywhere")
+
+    async def body(manager):
+        job = manager.submit([str(root)])
+        await job.wait()
+        return job
+
+    assert run_manager(body, allow_any_source=True).examples == 1
@@ -0,0 +1,20 @@
+from ai_training_data_bot.storage.dataset_index import DatasetReader
+from ai_training_data_bot.storage.sharding import merge_shards
+
+#shards merged without a coordinator give the single-node output
+def test_merged_shards_match_a_single_run(tmp_path, corpus, run):
+    root = corpus(count=12)
+
+    async def body(bot):
+        single = await bot.run_shard(str(root), tmp_path / "single")
+        for shard in range(3):
+            await bot.run_shard(str(root), tmp_path / "sharded", shard=shard, num_shards=3)
+        return single
+
+    single = run(body, {"chunk_size": 400})
+    stats = merge_shards(tmp_path / "sharded", tmp_path / "merged.jsonl")
+    expected = (tmp_path / "single" / single.output).read_bytes()
+    assert (tmp_path / "merged.jsonl").read_bytes() == expected
+    assert stats["examples"] == single.examples and stats["documents"] == 12
+    with DatasetReader(tmp_path / "merged.jsonl") as reader:
+        assert len(reader) == single.examples